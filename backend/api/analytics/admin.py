@@ -1,6 +1,6 @@
 # evercoin/backend/api/analytics/admin.py
 from django.contrib import admin
-from .models import CachedAnalytics, ReportPreset
+from .models import CachedAnalytics, DailyOperationSummary, ReportPreset
 
 
 @admin.register(CachedAnalytics)
@@ -13,6 +13,7 @@ class CachedAnalyticsAdmin(admin.ModelAdmin):
         'cache_type', 
         'period_start', 
         'period_end',
+        'data_version',
         'expires_at',
         'created_at'
     ]
@@ -46,7 +47,7 @@ class CachedAnalyticsAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Срок действия', {
-            'fields': ('expires_at',)
+            'fields': ('data_version', 'expires_at')
         }),
         ('Системная информация', {
             'fields': (
@@ -64,6 +65,48 @@ class CachedAnalyticsAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('user')
 
 
+@admin.register(DailyOperationSummary)
+class DailyOperationSummaryAdmin(admin.ModelAdmin):
+    """
+    Админ-панель для дневной сводки операций
+    """
+    list_display = [
+        'user', 
+        'day', 
+        'operation_type', 
+        'wallet',
+        'category',
+        'total_amount',
+        'operation_count'
+    ]
+    
+    list_filter = [
+        'operation_type', 
+        'day'
+    ]
+    
+    search_fields = [
+        'user__email',
+        'user__username'
+    ]
+    
+    readonly_fields = [
+        'user', 
+        'wallet', 
+        'category', 
+        'operation_type', 
+        'day', 
+        'total_amount', 
+        'operation_count'
+    ]
+    
+    def get_queryset(self, request):
+        """
+        Оптимизация запроса для админки
+        """
+        return super().get_queryset(request).select_related('user', 'wallet', 'category')
+
+
 @admin.register(ReportPreset)
 class ReportPresetAdmin(admin.ModelAdmin):
     """
@@ -6,3 +6,18 @@ class CategoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api.analytics'
     verbose_name = 'Аналитика'
+    
+    def ready(self):
+        from django.db.models.signals import pre_delete
+        
+        pre_delete.connect(detach_category_summaries, sender='categories.Category')
+
+
+def detach_category_summaries(sender, instance, **kwargs):
+    """
+    Перенос дневной сводки удаляемой категории в строки без категории,
+    в том числе при удалении через queryset и админку
+    """
+    from .models import DailyOperationSummary
+    
+    DailyOperationSummary.detach_category(instance.pk)
@@ -0,0 +1,277 @@
+# evercoin/backend/api/analytics/cache.py
+import abc
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import CachedAnalytics
+
+
+class CacheTier(abc.ABC):
+    """
+    Базовый уровень кеша аналитики со счетчиками попаданий и промахов
+    """
+    name = 'base'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abc.abstractmethod
+    def get(self, key, user, cache_type, period_start, period_end, data_version):
+        """
+        Значение по ключу или None
+        """
+
+    @abc.abstractmethod
+    def set(self, key, value, user, cache_type, period_start, period_end, data_version):
+        """
+        Запись значения по ключу
+        """
+
+    @abc.abstractmethod
+    def clear(self):
+        """
+        Очистка записей уровня
+        """
+
+    def get_stats(self):
+        """
+        Статистика попаданий и промахов уровня
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class LocalMemoryTier(CacheTier):
+    """
+    Ограниченный LRU-кеш в памяти процесса
+    """
+    name = 'local'
+
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, *args):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value, *args):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCacheTier(CacheTier):
+    """
+    Уровень на бэкенде Django CACHES (файловый кеш, Redis и т.п.).
+    Крупные значения сжимаются zlib. Записи хранятся под версией поколения,
+    поэтому очистка не затрагивает чужие ключи общего бэкенда
+    """
+    name = 'shared'
+
+    # Префиксы формата хранимого значения
+    RAW_PREFIX = b'j'
+    COMPRESSED_PREFIX = b'z'
+
+    # Ключ счетчика поколений записей аналитики
+    GENERATION_KEY = 'analytics:generation'
+
+    def __init__(self, alias, timeout, compress_min_size):
+        super().__init__()
+        self.alias = alias
+        self.timeout = timeout
+        self.compress_min_size = compress_min_size
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get_generation(self):
+        """
+        Текущее поколение записей (используется как версия ключей бэкенда)
+        """
+        return self.backend.get_or_set(self.GENERATION_KEY, 1, None)
+
+    def get(self, key, *args):
+        payload = self.backend.get(key, version=self.get_generation())
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.decode(payload)
+
+    def set(self, key, value, *args):
+        self.backend.set(key, self.encode(value), self.timeout, version=self.get_generation())
+
+    def clear(self):
+        """
+        Очистка только записей аналитики: смена поколения делает старые ключи
+        недоступными, они вытесняются бэкендом по таймауту
+        """
+        try:
+            self.backend.incr(self.GENERATION_KEY)
+        except ValueError:
+            self.backend.set(self.GENERATION_KEY, 2, None)
+
+    def encode(self, value):
+        """
+        Сериализация в JSON со сжатием крупных значений
+        """
+        payload = json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+        if len(payload) >= self.compress_min_size:
+            return self.COMPRESSED_PREFIX + zlib.compress(payload)
+        return self.RAW_PREFIX + payload
+
+    def decode(self, payload):
+        """
+        Обратное преобразование значения из кеша
+        """
+        if payload[:1] == self.COMPRESSED_PREFIX:
+            payload = zlib.decompress(payload[1:])
+        else:
+            payload = payload[1:]
+        return json.loads(payload)
+
+
+class DatabaseTier(CacheTier):
+    """
+    Холодный уровень в таблице CachedAnalytics
+    """
+    name = 'database'
+
+    def get(self, key, user, cache_type, period_start, period_end, data_version):
+        value = CachedAnalytics.get_cached_data(
+            user, cache_type, period_start, period_end, data_version=data_version
+        )
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, user, cache_type, period_start, period_end, data_version):
+        CachedAnalytics.set_cached_data(
+            user, cache_type, period_start, period_end, value, data_version=data_version
+        )
+
+    def clear(self):
+        CachedAnalytics.objects.all().delete()
+
+
+class AnalyticsCache:
+    """
+    Многоуровневый кеш аналитики: LRU процесса -> Django CACHES -> таблица (опционально).
+    Ключ содержит версию данных пользователя, поэтому записи не устаревают
+    """
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+
+    @staticmethod
+    def get_scoped_cache_type(cache_type, wallet_ids=None):
+        """
+        Тип кеша с хешем отсортированного списка счетов фильтра:
+        длина не зависит от числа счетов и укладывается в CachedAnalytics.cache_type
+        """
+        if not wallet_ids:
+            return cache_type
+        wallets_key = ','.join(str(wallet_id) for wallet_id in sorted(set(wallet_ids)))
+        return f"{cache_type}_{hashlib.sha1(wallets_key.encode()).hexdigest()}"
+
+    @classmethod
+    def make_key(cls, user, cache_type, period_start, period_end, data_version, wallet_ids=None):
+        """
+        Ключ кеша с версией данных пользователя и фильтром по счетам
+        """
+        cache_type = cls.get_scoped_cache_type(cache_type, wallet_ids)
+        return f"analytics:{user.pk}:{data_version}:{cache_type}:{period_start}:{period_end}"
+
+    def get(self, user, cache_type, period_start, period_end, data_version, wallet_ids=None):
+        """
+        Поиск по уровням сверху вниз, найденное значение поднимается на верхние уровни
+        """
+        cache_type = self.get_scoped_cache_type(cache_type, wallet_ids)
+        key = self.make_key(user, cache_type, period_start, period_end, data_version)
+        args = (user, cache_type, period_start, period_end, data_version)
+
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key, *args)
+            if value is not None:
+                for upper_tier in self.tiers[:index]:
+                    upper_tier.set(key, value, *args)
+                return value
+
+        return None
+
+    def set(self, user, cache_type, period_start, period_end, value, data_version, wallet_ids=None):
+        """
+        Запись значения во все уровни
+        """
+        cache_type = self.get_scoped_cache_type(cache_type, wallet_ids)
+        key = self.make_key(user, cache_type, period_start, period_end, data_version)
+        args = (user, cache_type, period_start, period_end, data_version)
+
+        for tier in self.tiers:
+            tier.set(key, value, *args)
+
+    def clear(self):
+        """
+        Полная очистка всех уровней и сброс счетчиков
+        """
+        for tier in self.tiers:
+            tier.clear()
+            tier.hits = tier.misses = 0
+
+    def get_stats(self):
+        """
+        Статистика попаданий и промахов по уровням
+        """
+        return {tier.name: tier.get_stats() for tier in self.tiers}
+
+
+def build_analytics_cache():
+    """
+    Сборка кеша аналитики по настройкам ANALYTICS_CACHE
+    """
+    options = settings.ANALYTICS_CACHE
+
+    tiers = [
+        LocalMemoryTier(options['LOCAL_MAX_ENTRIES']),
+        DjangoCacheTier(
+            options['BACKEND'],
+            settings.ANALYTICS_CACHE_TTL,
+            options['COMPRESS_MIN_SIZE']
+        ),
+    ]
+    if options['USE_DATABASE_TIER']:
+        tiers.append(DatabaseTier())
+
+    return AnalyticsCache(tiers)
+
+
+analytics_cache = build_analytics_cache()
@@ -0,0 +1,36 @@
+# evercoin/backend/api/analytics/management/commands/rebuild_daily_summary.py
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from api.analytics.models import DailyOperationSummary
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Полный пересчет дневной сводки операций (первичное заполнение или восстановление)
+    """
+    help = 'Пересчитывает дневную сводку операций для аналитики'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID пользователя (можно указать несколько раз)'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all().order_by('pk')
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+
+        total_rows = 0
+        for user in users.iterator():
+            rows = DailyOperationSummary.rebuild_for_user(user)
+            total_rows += rows
+            self.stdout.write(f'{user}: {rows} строк сводки')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, всего строк сводки: {total_rows}'))
@@ -1,11 +1,16 @@
 # evercoin/backend/api/analytics/models.py
 from django.db import models
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 User = get_user_model()
 
+SUMMARY_CHUNK_SIZE = 500
+
 
 class CachedAnalytics(models.Model):
     """
@@ -27,7 +32,7 @@ class CachedAnalytics(models.Model):
     )
     
     cache_type = models.CharField(
-        max_length=20,
+        max_length=100,
         choices=CACHE_TYPES,
         verbose_name='Тип кеша'
     )
@@ -41,6 +46,7 @@ class CachedAnalytics(models.Model):
     )
     
     data = models.JSONField(
+        encoder=DjangoJSONEncoder,
         verbose_name='Данные аналитики'
     )
     
@@ -48,6 +54,11 @@ class CachedAnalytics(models.Model):
         verbose_name='Время истечения срока действия'
     )
     
+    data_version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия данных пользователя'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -68,21 +79,34 @@ class CachedAnalytics(models.Model):
         Устанавливаем время истечения срока действия при сохранении
         """
         if not self.expires_at:
-            self.expires_at = timezone.now() + timedelta(hours=1)  # Кеш на 1 час
+            self.expires_at = timezone.now() + self.get_ttl()
         super().save(*args, **kwargs)
     
+    @staticmethod
+    def get_ttl():
+        """
+        Время жизни кеша. Записи инвалидируются версией данных,
+        поэтому TTL может быть большим
+        """
+        return timedelta(seconds=settings.ANALYTICS_CACHE_TTL)
+    
     @classmethod
-    def get_cached_data(cls, user, cache_type, period_start, period_end):
+    def get_cached_data(cls, user, cache_type, period_start, period_end, data_version=None):
         """
-        Получение кешированных данных
+        Получение кешированных данных для текущей версии данных пользователя
         """
         now = timezone.now()
+        
+        if data_version is None:
+            data_version = AnalyticsDataVersion.get_version(user)
+        
         try:
             cached = cls.objects.get(
                 user=user,
                 cache_type=cache_type,
                 period_start=period_start,
                 period_end=period_end,
+                data_version=data_version,
                 expires_at__gt=now
             )
             return cached.data
@@ -90,12 +114,17 @@ class CachedAnalytics(models.Model):
             return None
     
     @classmethod
-    def set_cached_data(cls, user, cache_type, period_start, period_end, data):
+    def set_cached_data(cls, user, cache_type, period_start, period_end, data, data_version=None):
         """
-        Сохранение данных в кеш
+        Сохранение данных в кеш с версией данных пользователя.
+        Версию следует читать до расчета данных, иначе запись,
+        сделанная во время расчета, может остаться незамеченной
         """
         now = timezone.now()
-        expires_at = now + timedelta(hours=1)
+        expires_at = now + cls.get_ttl()
+        
+        if data_version is None:
+            data_version = AnalyticsDataVersion.get_version(user)
         
         cached, created = cls.objects.update_or_create(
             user=user,
@@ -104,12 +133,515 @@ class CachedAnalytics(models.Model):
             period_end=period_end,
             defaults={
                 'data': data,
+                'data_version': data_version,
                 'expires_at': expires_at
             }
         )
         return cached
 
 
+class AnalyticsDataVersion(models.Model):
+    """
+    Счетчик версии данных пользователя для инвалидации кеша аналитики.
+    Увеличивается при каждом изменении операций, счетов и категорий.
+    Заодно хранит поддерживаемое количество операций пользователя
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='analytics_data_version',
+        verbose_name='Пользователь'
+    )
+    
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия данных'
+    )
+    
+    operation_count = models.BigIntegerField(
+        default=0,
+        verbose_name='Количество операций'
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Версия данных аналитики'
+        verbose_name_plural = 'Версии данных аналитики'
+    
+    def __str__(self):
+        return f"{self.user} - {self.version}"
+    
+    @classmethod
+    def get_version(cls, user):
+        """
+        Текущая версия данных пользователя
+        """
+        version = cls.objects.filter(user=user).values_list('version', flat=True).first()
+        return version or 0
+    
+    @classmethod
+    def get_state(cls, user):
+        """
+        Версия данных и количество операций пользователя одним запросом
+        """
+        state = cls.objects.filter(user=user).values('version', 'operation_count').first()
+        if state is None:
+            return {'version': 0, 'operation_count': cls._count_operations(user.pk)}
+        return state
+    
+    @classmethod
+    def bump(cls, user_id, operation_delta=0):
+        """
+        Атомарное увеличение версии данных пользователя
+        и изменение счетчика операций на operation_delta
+        """
+        from django.db import IntegrityError, transaction
+        
+        updated = cls._apply_bump(user_id, operation_delta)
+        
+        if not updated:
+            try:
+                with transaction.atomic():
+                    # Сводка к этому моменту уже учитывает изменение
+                    cls.objects.create(
+                        user_id=user_id,
+                        version=1,
+                        operation_count=cls._count_operations(user_id)
+                    )
+            except IntegrityError:
+                # Запись успела создать параллельная транзакция
+                cls._apply_bump(user_id, operation_delta)
+    
+    @classmethod
+    def _apply_bump(cls, user_id, operation_delta):
+        return cls.objects.filter(user_id=user_id).update(
+            version=models.F('version') + 1,
+            operation_count=models.F('operation_count') + operation_delta,
+            updated_at=timezone.now()
+        )
+    
+    @classmethod
+    def reset_operation_count(cls, user_id):
+        """
+        Пересчет счетчика операций по дневной сводке
+        """
+        operation_count = cls._count_operations(user_id)
+        updated = cls.objects.filter(user_id=user_id).update(
+            version=models.F('version') + 1,
+            operation_count=operation_count,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.get_or_create(
+                user_id=user_id,
+                defaults={'version': 1, 'operation_count': operation_count}
+            )
+        return operation_count
+    
+    @staticmethod
+    def _count_operations(user_id):
+        """
+        Количество операций пользователя по дневной сводке
+        """
+        return DailyOperationSummary.objects.filter(user_id=user_id).aggregate(
+            total=models.Sum('operation_count')
+        )['total'] or 0
+
+
+class DailyOperationSummary(models.Model):
+    """
+    Дневная сводка операций пользователя (агрегат для аналитики).
+    Поддерживается инкрементально при каждом изменении операций,
+    поэтому аналитические запросы работают за O(дней), а не O(операций)
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_operation_summaries',
+        verbose_name='Пользователь'
+    )
+
+    wallet = models.ForeignKey(
+        'wallets.Wallet',
+        on_delete=models.CASCADE,
+        related_name='daily_operation_summaries',
+        verbose_name='Счет'
+    )
+
+    # Как и у операций, при удалении категории строки сводки
+    # переносятся в строки без категории (см. detach_category)
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='daily_operation_summaries',
+        verbose_name='Категория'
+    )
+
+    operation_type = models.CharField(
+        max_length=10,
+        verbose_name='Тип операции'
+    )
+
+    day = models.DateField(
+        verbose_name='День'
+    )
+
+    total_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        verbose_name='Сумма операций'
+    )
+
+    operation_count = models.IntegerField(
+        default=0,
+        verbose_name='Количество операций'
+    )
+
+    class Meta:
+        verbose_name = 'Дневная сводка операций'
+        verbose_name_plural = 'Дневные сводки операций'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'wallet', 'category', 'operation_type', 'day'],
+                name='analytics_summary_unique_key'
+            ),
+            # NULL не равен NULL, поэтому для строк без категории
+            # нужна отдельная проверка уникальности
+            models.UniqueConstraint(
+                fields=['user', 'wallet', 'operation_type', 'day'],
+                condition=models.Q(category__isnull=True),
+                name='analytics_summary_unique_key_without_category'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day']),
+            models.Index(fields=['user', 'operation_type', 'day']),
+            # История баланса счета
+            models.Index(fields=['wallet', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.operation_type}: {self.total_amount} ({self.operation_count})"
+
+    @staticmethod
+    def get_operation_day(value):
+        """
+        День операции в текущем часовом поясе (как у TruncDate)
+        """
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+
+    @classmethod
+    def get_operation_key(cls, operation):
+        """
+        Ключ строки сводки для операции
+        """
+        return (
+            operation.user_id,
+            operation.wallet_id,
+            operation.category_id,
+            operation.operation_type,
+            cls.get_operation_day(operation.operation_date),
+        )
+
+    @classmethod
+    def apply_operation_change(cls, old_operation=None, new_operation=None):
+        """
+        Применение изменения одной операции к сводке: старое состояние
+        вычитается, новое добавляется. Вызывается внутри транзакции сохранения
+        """
+        deltas = {}
+
+        if old_operation is not None:
+            key = cls.get_operation_key(old_operation)
+            amount, count = deltas.get(key, (0, 0))
+            deltas[key] = (amount - Decimal(str(old_operation.amount)), count - 1)
+
+        if new_operation is not None:
+            key = cls.get_operation_key(new_operation)
+            amount, count = deltas.get(key, (0, 0))
+            deltas[key] = (amount + Decimal(str(new_operation.amount)), count + 1)
+
+        for key, (amount, count) in deltas.items():
+            if amount or count:
+                cls._apply_delta(key, amount, count)
+
+    @classmethod
+    def apply_operations(cls, operations, sign=1):
+        """
+        Применение списка операций из памяти к сводке (после bulk_create):
+        операции группируются по ключу, по одному изменению на строку сводки
+        """
+        deltas = {}
+
+        for operation in operations:
+            key = cls.get_operation_key(operation)
+            amount, count = deltas.get(key, (0, 0))
+            deltas[key] = (amount + sign * Decimal(str(operation.amount)), count + sign)
+
+        cls._apply_deltas(deltas)
+
+    @classmethod
+    def apply_queryset(cls, queryset, sign=1):
+        """
+        Применение набора операций к сводке одним групповым запросом.
+        sign=1 добавляет операции, sign=-1 вычитает (перед массовым
+        удалением или изменением). Возвращает примененные группы
+        (ключ, сумма, количество)
+        """
+        groups = cls._get_queryset_groups(queryset)
+        cls._apply_deltas({key: (sign * total, sign * count) for key, total, count in groups})
+        return groups
+
+    @classmethod
+    def move_queryset(cls, queryset, wallet_id=None, category_id=None):
+        """
+        Перенос набора операций на другой счет и/или категорию в сводке.
+        Вызывается до массового update() операций
+        """
+        deltas = {}
+        for key, total, count in cls._get_queryset_groups(queryset):
+            user_id, old_wallet_id, old_category_id, operation_type, day = key
+            new_key = (
+                user_id,
+                wallet_id if wallet_id is not None else old_wallet_id,
+                category_id if category_id is not None else old_category_id,
+                operation_type,
+                day,
+            )
+            if new_key == key:
+                continue
+            cls._add_delta(deltas, key, -total, -count)
+            cls._add_delta(deltas, new_key, total, count)
+        cls._apply_deltas(deltas)
+
+    @classmethod
+    def detach_category(cls, category_id):
+        """
+        Перенос строк сводки удаляемой категории в строки без категории
+        (операции категории остаются без категории). Вызывается до удаления
+        """
+        rows = cls.objects.filter(category_id=category_id).values_list(
+            'user_id', 'wallet_id', 'operation_type', 'day', 'total_amount', 'operation_count'
+        )
+        deltas = {}
+        for user_id, wallet_id, operation_type, day, total, count in rows:
+            cls._add_delta(deltas, (user_id, wallet_id, category_id, operation_type, day), -total, -count)
+            cls._add_delta(deltas, (user_id, wallet_id, None, operation_type, day), total, count)
+        cls._apply_deltas(deltas)
+
+    @staticmethod
+    def _get_queryset_groups(queryset):
+        """
+        Группировка операций по ключу сводки: (ключ, сумма, количество)
+        """
+        from django.db.models import Sum, Count
+        from django.db.models.functions import TruncDate
+
+        groups = (
+            queryset.order_by()
+            .annotate(day=TruncDate('operation_date'))
+            .values('user_id', 'wallet_id', 'category_id', 'operation_type', 'day')
+            .annotate(total=Sum('amount'), count=Count('id'))
+        )
+
+        return [
+            (
+                (
+                    group['user_id'],
+                    group['wallet_id'],
+                    group['category_id'],
+                    group['operation_type'],
+                    group['day'],
+                ),
+                group['total'],
+                group['count'],
+            )
+            for group in groups
+        ]
+
+    @staticmethod
+    def _add_delta(deltas, key, amount, count):
+        """
+        Добавление изменения строки сводки к набору изменений
+        """
+        total, total_count = deltas.get(key, (0, 0))
+        deltas[key] = (total + amount, total_count + count)
+
+    @classmethod
+    def _apply_deltas(cls, deltas, chunk_size=SUMMARY_CHUNK_SIZE):
+        """
+        Применение набора изменений {ключ: (сумма, количество)} пачками:
+        на пачку - одно чтение строк, один bulk_update, один bulk_create
+        и один DELETE опустевших строк. Снимки баланса сдвигаются
+        один раз на счет и месяц
+        """
+        from django.db import IntegrityError, transaction
+        from api.wallets.models import WalletBalanceSnapshot
+
+        deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+        keys = list(deltas)
+
+        for start in range(0, len(keys), chunk_size):
+            chunk = {key: deltas[key] for key in keys[start:start + chunk_size]}
+            try:
+                with transaction.atomic():
+                    cls._write_chunk(chunk)
+            except IntegrityError:
+                # Строки пачки успела создать параллельная транзакция
+                for key, (amount, count) in chunk.items():
+                    cls._write_delta(key, amount, count)
+
+        balance_changes = {}
+        for (_, wallet_id, _, operation_type, day), (amount, _) in deltas.items():
+            month_key = (wallet_id, WalletBalanceSnapshot.get_month_end(day))
+            change = amount if operation_type == 'income' else -amount
+            balance_changes[month_key] = balance_changes.get(month_key, 0) + change
+        for (wallet_id, month_end), change in balance_changes.items():
+            WalletBalanceSnapshot.shift(wallet_id, month_end, change)
+
+    @classmethod
+    def _write_chunk(cls, deltas):
+        """
+        Запись пачки изменений сводки: существующие строки читаются одним
+        запросом с блокировкой, новые значения считаются в Python
+        """
+        rows = cls.objects.select_for_update().filter(
+            user_id__in={key[0] for key in deltas},
+            wallet_id__in={key[1] for key in deltas},
+            operation_type__in={key[3] for key in deltas},
+            day__in={key[4] for key in deltas},
+        )
+        existing = {
+            (row.user_id, row.wallet_id, row.category_id, row.operation_type, row.day): row
+            for row in rows
+        }
+
+        changed, created, emptied = [], [], []
+        for key, (amount, count) in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                if count > 0:
+                    user_id, wallet_id, category_id, operation_type, day = key
+                    created.append(cls(
+                        user_id=user_id,
+                        wallet_id=wallet_id,
+                        category_id=category_id,
+                        operation_type=operation_type,
+                        day=day,
+                        total_amount=amount,
+                        operation_count=count
+                    ))
+                continue
+            row.total_amount += amount
+            row.operation_count += count
+            (changed if row.operation_count > 0 else emptied).append(row)
+
+        if changed:
+            cls.objects.bulk_update(changed, ['total_amount', 'operation_count'])
+        if created:
+            cls.objects.bulk_create(created)
+        if emptied:
+            cls.objects.filter(pk__in=[row.pk for row in emptied]).delete()
+
+    @classmethod
+    def _apply_delta(cls, key, amount, count):
+        """
+        Изменение одной строки сводки и сдвиг снимков баланса счета
+        """
+        from api.wallets.models import WalletBalanceSnapshot
+
+        cls._write_delta(key, amount, count)
+
+        # Изменение прошлого месяца сдвигает снимки баланса счета
+        user_id, wallet_id, category_id, operation_type, day = key
+        WalletBalanceSnapshot.shift(wallet_id, day, amount if operation_type == 'income' else -amount)
+
+    @classmethod
+    def _write_delta(cls, key, amount, count):
+        """
+        Атомарное изменение строки сводки через F-выражения
+        """
+        from django.db import IntegrityError, transaction
+
+        user_id, wallet_id, category_id, operation_type, day = key
+        lookup = {
+            'user_id': user_id,
+            'wallet_id': wallet_id,
+            'category_id': category_id,
+            'operation_type': operation_type,
+            'day': day,
+        }
+
+        rows = cls.objects.filter(**lookup)
+        changes = {
+            'total_amount': models.F('total_amount') + amount,
+            'operation_count': models.F('operation_count') + count,
+        }
+
+        if count < 0:
+            # Строка с другими операциями уменьшается одним UPDATE,
+            # опустевшая удаляется; если строку успели пополнить
+            # между запросами, изменение применяется обычным UPDATE ниже
+            if rows.filter(operation_count__gt=-count).update(**changes):
+                return
+            deleted, _ = rows.filter(operation_count__lte=-count).delete()
+            if deleted:
+                return
+
+        if rows.update(**changes) or count <= 0:
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    total_amount=amount,
+                    operation_count=count,
+                    **lookup
+                )
+        except IntegrityError:
+            # Строку успела создать параллельная транзакция
+            rows.update(**changes)
+
+    @classmethod
+    def rebuild_for_user(cls, user):
+        """
+        Полный пересчет сводки пользователя по операциям
+        """
+        from django.db import transaction
+        from api.operations.models import Operation
+
+        groups = cls._get_queryset_groups(Operation.objects.filter(user=user))
+
+        with transaction.atomic():
+            cls.objects.filter(user=user).delete()
+            summaries = cls.objects.bulk_create(
+                [
+                    cls(
+                        user_id=user_id,
+                        wallet_id=wallet_id,
+                        category_id=category_id,
+                        operation_type=operation_type,
+                        day=day,
+                        total_amount=total,
+                        operation_count=count
+                    )
+                    for (user_id, wallet_id, category_id, operation_type, day), total, count in groups
+                ],
+                batch_size=1000
+            )
+            AnalyticsDataVersion.reset_operation_count(user.pk)
+
+        return len(summaries)
+
+
 class ReportPreset(models.Model):
     """
     Модель для сохранения пресетов отчетов
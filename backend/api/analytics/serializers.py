@@ -1,6 +1,89 @@
 # evercoin/backend/api/analytics/serializers.py
 from rest_framework import serializers
+from django.utils import timezone
+from datetime import timedelta
 from .models import CachedAnalytics, ReportPreset
+from .validators import validate_date_range, validate_wallet_ids
+
+
+class AnalyticsPeriodSerializer(serializers.Serializer):
+    """
+    Сериализатор для параметров периода аналитических запросов
+    """
+    # Максимальная длина произвольного периода в днях (None - без ограничения)
+    max_period_days = 365
+    
+    period = serializers.ChoiceField(
+        choices=[
+            ('day', 'День'),
+            ('week', 'Неделя'),
+            ('month', 'Месяц'),
+            ('year', 'Год'),
+            ('custom', 'Произвольный период')
+        ],
+        default='month'
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    wallet_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+    category_type = serializers.ChoiceField(
+        choices=[('income', 'Доход'), ('expense', 'Расход'), ('all', 'Все')],
+        default='all'
+    )
+    
+    def validate_wallet_ids(self, value):
+        """
+        Проверка, что счета принадлежат пользователю
+        """
+        request = self.context.get('request')
+        if request:
+            validate_wallet_ids(value, request.user)
+        return value
+    
+    def validate(self, data):
+        """
+        Валидация произвольного периода
+        """
+        if data.get('period') == 'custom':
+            if not data.get('start_date') or not data.get('end_date'):
+                raise serializers.ValidationError(
+                    'Для произвольного периода необходимо указать start_date и end_date'
+                )
+            validate_date_range(data['start_date'], data['end_date'], self.max_period_days)
+        
+        return data
+    
+    def get_date_range(self):
+        """
+        Получение границ периода (включительно)
+        """
+        period = self.validated_data.get('period', 'month')
+        today = timezone.now().date()
+        
+        if period == 'custom':
+            return self.validated_data['start_date'], self.validated_data['end_date']
+        if period == 'day':
+            return today, today
+        if period == 'week':
+            return today - timedelta(days=today.weekday()), today
+        if period == 'year':
+            return today.replace(month=1, day=1), today
+        
+        return today.replace(day=1), today
+
+
+class SummaryCategorySerializer(serializers.Serializer):
+    """
+    Сериализатор для категории в сводке за месяц
+    """
+    category_id = serializers.IntegerField()
+    category_name = serializers.CharField()
+    category_icon = serializers.CharField()
+    category_color = serializers.CharField()
+    total_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
 
 
 class MonthlySummarySerializer(serializers.Serializer):
@@ -11,8 +94,8 @@ class MonthlySummarySerializer(serializers.Serializer):
     total_income = serializers.DecimalField(max_digits=15, decimal_places=2)
     total_expense = serializers.DecimalField(max_digits=15, decimal_places=2)
     net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
-    income_categories = serializers.ListField()
-    expense_categories = serializers.ListField()
+    income_categories = SummaryCategorySerializer(many=True)
+    expense_categories = SummaryCategorySerializer(many=True)
 
 
 class CategoryStatsSerializer(serializers.Serializer):
@@ -29,19 +112,49 @@ class CategoryStatsSerializer(serializers.Serializer):
     category_type = serializers.CharField()
 
 
+class DailyStatsParametersSerializer(AnalyticsPeriodSerializer):
+    """
+    Параметры дневной статистики: период любой длины,
+    шаг выбирается автоматически или задается явно
+    """
+    max_period_days = None
+    
+    granularity = serializers.ChoiceField(
+        choices=[('day', 'День'), ('week', 'Неделя'), ('month', 'Месяц')],
+        required=False
+    )
+
+
 class DailyStatsSerializer(serializers.Serializer):
     """
-    Сериализатор для дневной статистики
+    Сериализатор для точки дневной статистики (начало интервала и его подпись)
     """
     date = serializers.DateField()
+    period = serializers.CharField()
     income = serializers.DecimalField(max_digits=15, decimal_places=2)
     expense = serializers.DecimalField(max_digits=15, decimal_places=2)
     net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
 
 
-class TrendsSerializer(serializers.Serializer):
+class TrendsParametersSerializer(serializers.Serializer):
     """
-    Сериализатор для трендов за 6 месяцев
+    Сериализатор для параметров трендов
+    """
+    months = serializers.IntegerField(min_value=1, max_value=120, default=6)
+    granularity = serializers.ChoiceField(
+        choices=[
+            ('week', 'Неделя'),
+            ('month', 'Месяц'),
+            ('quarter', 'Квартал'),
+            ('year', 'Год')
+        ],
+        default='month'
+    )
+
+
+class MonthlyTrendsSerializer(serializers.Serializer):
+    """
+    Сериализатор для трендов
     """
     period = serializers.CharField()
     income = serializers.DecimalField(max_digits=15, decimal_places=2)
@@ -49,6 +162,22 @@ class TrendsSerializer(serializers.Serializer):
     net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
 
 
+class WalletStatsSerializer(serializers.Serializer):
+    """
+    Сериализатор для статистики по счетам
+    """
+    wallet_id = serializers.IntegerField()
+    wallet_name = serializers.CharField()
+    wallet_currency = serializers.CharField()
+    wallet_icon = serializers.CharField()
+    wallet_color = serializers.CharField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+    income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=15, decimal_places=2)
+    net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
+    operation_count = serializers.IntegerField()
+
+
 class AnalyticsFilterSerializer(serializers.Serializer):
     """
     Сериализатор для параметров фильтрации аналитики
@@ -141,10 +270,14 @@ class AnalyticsOverviewSerializer(serializers.Serializer):
     """
     Сериализатор для общего обзора аналитики
     """
+    current_month_income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    current_month_expense = serializers.DecimalField(max_digits=15, decimal_places=2)
+    current_month_net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
+    previous_month_income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    previous_month_expense = serializers.DecimalField(max_digits=15, decimal_places=2)
+    previous_month_net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
+    income_change_percentage = serializers.FloatField()
+    expense_change_percentage = serializers.FloatField()
     total_balance = serializers.DecimalField(max_digits=15, decimal_places=2)
-    monthly_income = serializers.DecimalField(max_digits=15, decimal_places=2)
-    monthly_expense = serializers.DecimalField(max_digits=15, decimal_places=2)
-    monthly_net_flow = serializers.DecimalField(max_digits=15, decimal_places=2)
-    top_categories = serializers.ListField()
-    recent_operations = serializers.ListField()
-    wallet_distribution = serializers.ListField()
\ No newline at end of file
+    active_wallets_count = serializers.IntegerField()
+    total_operations_count = serializers.IntegerField()
\ No newline at end of file
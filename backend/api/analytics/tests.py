@@ -1 +1,626 @@
 # evercoin/backend/api/analytics/tests.py
+import pytest
+from decimal import Decimal
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.analytics.cache import AnalyticsCache, DjangoCacheTier, LocalMemoryTier, analytics_cache
+from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+from api.categories.models import Category
+from api.operations.models import Operation
+from api.wallets.models import Wallet
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_analytics_cache():
+    """Очистка уровней кеша аналитики между тестами."""
+    analytics_cache.clear()
+    yield
+    analytics_cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    """Фикстура для API клиента."""
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_user(api_client):
+    """Фикстура для аутентифицированного пользователя."""
+    user = User.objects.create_user(
+        email='test@example.com',
+        username='testuser',
+        password='TestPassword123!'
+    )
+    refresh = RefreshToken.for_user(user)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    return user
+
+
+@pytest.fixture
+def wallet(authenticated_user):
+    """Фикстура для создания счета."""
+    return Wallet.objects.create(
+        user=authenticated_user,
+        name='Основной счет',
+        balance=Decimal('10000.00')
+    )
+
+
+@pytest.fixture
+def category(authenticated_user):
+    """Фикстура для создания категории расходов."""
+    return Category.objects.create(
+        user=authenticated_user,
+        name='Продукты',
+        icon='food',
+        color='#00B894',
+        category_type='expense'
+    )
+
+
+@pytest.fixture
+def create_operation(authenticated_user, wallet):
+    """Фикстура для создания операции."""
+    def _create_operation(amount='100.00', operation_type='expense', **kwargs):
+        kwargs.setdefault('wallet', wallet)
+        return Operation.objects.create(
+            user=authenticated_user,
+            title='Операция',
+            amount=Decimal(amount),
+            operation_type=operation_type,
+            **kwargs
+        )
+    return _create_operation
+
+
+def count_summary_queries(context):
+    """Количество запросов к таблице дневной сводки."""
+    table = DailyOperationSummary._meta.db_table
+    return sum(1 for query in context.captured_queries if table in query['sql'])
+
+
+def get_summary(user, **filters):
+    """Сумма и количество операций пользователя по дневной сводке."""
+    rows = DailyOperationSummary.objects.filter(user=user, **filters)
+    return (
+        sum((row.total_amount for row in rows), Decimal('0')),
+        sum(row.operation_count for row in rows)
+    )
+
+
+@pytest.mark.django_db
+class TestDailyOperationSummary:
+    """Тесты инкрементального обновления дневной сводки."""
+
+    def test_create_operation_updates_summary(self, authenticated_user, create_operation, category):
+        """Создание операций добавляет их в сводку."""
+        create_operation('100.00', category=category)
+        create_operation('50.00', category=category)
+
+        assert get_summary(authenticated_user, operation_type='expense') == (Decimal('150.00'), 2)
+        assert DailyOperationSummary.objects.filter(user=authenticated_user).count() == 1
+
+    def test_update_operation_moves_summary(self, authenticated_user, create_operation, category):
+        """Изменение суммы, типа и даты переносит операцию в сводке."""
+        operation = create_operation('100.00', category=category)
+
+        operation.amount = Decimal('70.00')
+        operation.operation_type = 'income'
+        operation.operation_date = timezone.now() - timedelta(days=3)
+        operation.save()
+
+        assert get_summary(authenticated_user, operation_type='expense') == (Decimal('0'), 0)
+        assert get_summary(authenticated_user, operation_type='income') == (Decimal('70.00'), 1)
+        assert DailyOperationSummary.objects.get(user=authenticated_user).day == (
+            timezone.localdate(operation.operation_date)
+        )
+
+    def test_delete_operation_removes_summary_row(self, authenticated_user, create_operation):
+        """Удаление последней операции дня удаляет строку сводки."""
+        operation = create_operation('100.00')
+        operation.delete()
+
+        assert not DailyOperationSummary.objects.filter(user=authenticated_user).exists()
+
+    def test_bulk_delete_updates_summary(self, api_client, authenticated_user, create_operation):
+        """Массовое удаление вычитает операции из сводки."""
+        first = create_operation('100.00')
+        second = create_operation('40.00')
+        create_operation('10.00')
+
+        url = reverse('operations:operation-bulk-delete')
+        response = api_client.post(url, {'operation_ids': [first.id, second.id]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_summary(authenticated_user) == (Decimal('10.00'), 1)
+
+    def test_rebuild_matches_incremental(self, authenticated_user, create_operation, category):
+        """Полный пересчет совпадает с инкрементальной сводкой."""
+        create_operation('100.00', category=category)
+        create_operation('200.00', operation_type='income')
+        create_operation('30.00', operation_date=timezone.now() - timedelta(days=40))
+        incremental = get_summary(authenticated_user)
+
+        DailyOperationSummary.rebuild_for_user(authenticated_user)
+
+        assert get_summary(authenticated_user) == incremental
+
+    def test_delete_category_moves_summary_to_uncategorized(
+        self, authenticated_user, create_operation, category
+    ):
+        """Удаление категории переносит ее строки сводки в строку без категории."""
+        operation = create_operation('100.00', category=category)
+        create_operation('40.00')
+
+        Category.objects.filter(pk=category.pk).delete()
+
+        operation.refresh_from_db()
+        assert operation.category is None
+        row = DailyOperationSummary.objects.get(user=authenticated_user)
+        assert row.category_id is None
+        assert (row.total_amount, row.operation_count) == (Decimal('140.00'), 2)
+
+    def test_uncategorized_rows_are_unique(self, authenticated_user, create_operation):
+        """Строка сводки без категории не может появиться дважды."""
+        from django.db import IntegrityError, transaction
+
+        create_operation('100.00')
+        row = DailyOperationSummary.objects.get(user=authenticated_user)
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            DailyOperationSummary.objects.create(
+                user=authenticated_user, wallet=row.wallet, category=None,
+                operation_type=row.operation_type, day=row.day, total_amount=1, operation_count=1
+            )
+
+    def test_delete_operation_summary_queries(self, authenticated_user, create_operation):
+        """Удаление операции меняет строку сводки одним запросом."""
+        first = create_operation('100.00')
+        second = create_operation('40.00')
+
+        with CaptureQueriesContext(connection) as context:
+            first.delete()
+        assert count_summary_queries(context) == 1
+        assert get_summary(authenticated_user) == (Decimal('40.00'), 1)
+
+        with CaptureQueriesContext(connection) as context:
+            second.delete()
+        assert count_summary_queries(context) == 2
+        assert not DailyOperationSummary.objects.filter(user=authenticated_user).exists()
+
+    def test_bulk_summary_writes_do_not_grow_with_days(self, authenticated_user, wallet):
+        """Применение набора операций к сводке не делает запросов на каждый день."""
+        from api.wallets.models import WalletBalanceSnapshot
+
+        now = timezone.now()
+        operations = [
+            Operation(
+                user=authenticated_user, wallet=wallet, title='Операция', amount=Decimal('10.00'),
+                operation_type='expense' if index % 2 else 'income',
+                operation_date=now - timedelta(days=index % 365)
+            )
+            for index in range(2000)
+        ]
+        months = {
+            WalletBalanceSnapshot.get_month_end(DailyOperationSummary.get_operation_day(operation.operation_date))
+            for operation in operations
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            DailyOperationSummary.apply_operations(operations)
+
+        # Чтение, bulk_update и bulk_create на пачку и сдвиг снимков на месяц
+        assert count_summary_queries(context) <= 8
+        assert len(context) <= 20 + len(months)
+        assert get_summary(authenticated_user) == (Decimal('20000.00'), 2000)
+
+        with CaptureQueriesContext(connection) as context:
+            DailyOperationSummary.apply_operations(operations, sign=-1)
+
+        assert len(context) <= 20 + len(months)
+        assert not DailyOperationSummary.objects.filter(user=authenticated_user).exists()
+
+
+@pytest.mark.django_db
+class TestMonthlySummaryView:
+    """Тесты сводки за месяц."""
+
+    def test_monthly_summary_totals(self, api_client, authenticated_user, create_operation, category):
+        """Сводка за месяц считается по дневной сводке."""
+        create_operation('100.00', category=category)
+        create_operation('250.00', operation_type='income')
+
+        url = reverse('analytics:monthly-summary')
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Decimal(response.data['total_income']) == Decimal('250.00')
+        assert Decimal(response.data['total_expense']) == Decimal('100.00')
+        assert response.data['expense_categories'][0]['category_id'] == category.id
+
+    def test_monthly_summary_single_query(self, api_client, authenticated_user, create_operation, category):
+        """Итоги и разбивка по категориям получаются одним запросом."""
+        income_category = Category.objects.create(
+            user=authenticated_user,
+            name='Зарплата',
+            icon='salary',
+            color='#00B894',
+            category_type='income'
+        )
+        create_operation('100.00', category=category)
+        create_operation('30.00')
+        create_operation('250.00', operation_type='income', category=income_category)
+
+        url = reverse('analytics:monthly-summary')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert count_summary_queries(context) == 1
+        assert Decimal(response.data['total_expense']) == Decimal('130.00')
+        assert len(response.data['income_categories']) == 1
+        assert len(response.data['expense_categories']) == 1
+
+    def test_monthly_summary_cached_per_wallet_filter(
+        self, api_client, authenticated_user, wallet, create_operation
+    ):
+        """Сводка с фильтром по счетам кешируется отдельно от общей."""
+        other_wallet = Wallet.objects.create(user=authenticated_user, name='Второй счет')
+        create_operation('100.00')
+        create_operation('40.00', wallet=other_wallet)
+
+        url = reverse('analytics:monthly-summary')
+        total = api_client.get(url)
+        filtered = api_client.get(url, {'wallet_ids': [other_wallet.id]})
+
+        assert Decimal(total.data['total_expense']) == Decimal('140.00')
+        assert Decimal(filtered.data['total_expense']) == Decimal('40.00')
+
+
+@pytest.mark.django_db
+class TestMonthlyTrendsView:
+    """Тесты трендов."""
+
+    def test_trends_zero_filled_months(self, api_client, authenticated_user, create_operation):
+        """Месяцы без операций заполняются нулями, данные собираются одним запросом."""
+        create_operation('100.00')
+        create_operation('40.00', operation_type='income')
+
+        url = reverse('analytics:trends')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {'months': 12})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert count_summary_queries(context) == 1
+        assert len(response.data) == 12
+        assert response.data[-1]['period'] == timezone.now().strftime('%Y-%m')
+        assert Decimal(response.data[-1]['expense']) == Decimal('100.00')
+        assert Decimal(response.data[0]['expense']) == Decimal('0')
+
+    @pytest.mark.parametrize('granularity, prefix', [('week', '-W'), ('quarter', '-Q'), ('year', '')])
+    def test_trends_granularity(self, api_client, authenticated_user, create_operation, granularity, prefix):
+        """Группировка по неделям, кварталам и годам."""
+        create_operation('100.00')
+
+        url = reverse('analytics:trends')
+        response = api_client.get(url, {'months': 24, 'granularity': granularity})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert prefix in response.data[-1]['period']
+        assert Decimal(response.data[-1]['expense']) == Decimal('100.00')
+
+    def test_trends_months_limit(self, api_client, authenticated_user):
+        """Период ограничен 120 месяцами."""
+        url = reverse('analytics:trends')
+        response = api_client.get(url, {'months': 121})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestWalletAnalyticsView:
+    """Тесты статистики по счетам."""
+
+    def test_wallet_stats_single_query_sorted_paginated(self, api_client, authenticated_user, create_operation):
+        """Статистика по счетам собирается одним запросом, сортируется и пагинируется."""
+        wallets = [
+            Wallet.objects.create(user=authenticated_user, name=f'Счет {i}', balance=Decimal('1000.00'))
+            for i in range(3)
+        ]
+        create_operation('10.00', wallet=wallets[0])
+        create_operation('20.00', wallet=wallets[1])
+        create_operation('30.00', wallet=wallets[1])
+
+        url = reverse('analytics:wallet-stats')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {'ordering': '-expense', 'limit': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert count_summary_queries(context) == 1
+        assert response.data['count'] == 4
+        assert [item['wallet_id'] for item in response.data['results']] == [wallets[1].id, wallets[0].id]
+        assert response.data['results'][0]['operation_count'] == 2
+
+    def test_wallet_stats_invalid_ordering(self, api_client, authenticated_user):
+        """Недопустимое поле сортировки."""
+        url = reverse('analytics:wallet-stats')
+        response = api_client.get(url, {'ordering': 'password'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestAnalyticsCacheInvalidation:
+    """Тесты инвалидации кеша аналитики по версии данных."""
+
+    def test_operation_write_invalidates_cache(self, api_client, authenticated_user, create_operation):
+        """Кеш не отдает устаревшие данные после изменения операций."""
+        url = reverse('analytics:monthly-summary')
+        create_operation('100.00')
+        assert Decimal(api_client.get(url).data['total_expense']) == Decimal('100.00')
+
+        operation = create_operation('50.00')
+        assert Decimal(api_client.get(url).data['total_expense']) == Decimal('150.00')
+
+        operation.delete()
+        assert Decimal(api_client.get(url).data['total_expense']) == Decimal('100.00')
+
+    def test_cache_hit_without_writes(self, api_client, authenticated_user, create_operation):
+        """Без изменений данные берутся из кеша."""
+        url = reverse('analytics:monthly-summary')
+        create_operation('100.00')
+        api_client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert count_summary_queries(context) == 0
+
+    def test_wallet_and_category_writes_bump_version(self, authenticated_user, wallet, category):
+        """Изменение счета или категории увеличивает версию данных."""
+        version = AnalyticsDataVersion.get_version(authenticated_user)
+
+        wallet.name = 'Новое название'
+        wallet.save()
+        category.color = '#FF6B6B'
+        category.save()
+
+        assert AnalyticsDataVersion.get_version(authenticated_user) == version + 2
+
+
+@pytest.mark.django_db
+class TestTieredAnalyticsCache:
+    """Тесты многоуровневого кеша аналитики."""
+
+    def test_shared_tier_hit_promotes_to_local(self, authenticated_user):
+        """Попадание в общий уровень поднимает значение в LRU процесса."""
+        local_tier = LocalMemoryTier(max_entries=10)
+        shared_tier = DjangoCacheTier('analytics', timeout=60, compress_min_size=4096)
+        cache = AnalyticsCache([local_tier, shared_tier])
+        start, end = timezone.localdate(), timezone.localdate()
+
+        cache.set(authenticated_user, 'monthly_summary', start, end, {'total': '1.00'}, data_version=1)
+        local_tier.clear()
+
+        assert cache.get(authenticated_user, 'monthly_summary', start, end, data_version=1) == {'total': '1.00'}
+        assert cache.get(authenticated_user, 'monthly_summary', start, end, data_version=1) == {'total': '1.00'}
+        assert cache.get(authenticated_user, 'monthly_summary', start, end, data_version=2) is None
+        assert cache.get_stats()['local'] == {'hits': 1, 'misses': 2, 'hit_rate': 0.3333}
+        assert cache.get_stats()['shared']['hits'] == 1
+
+    def test_large_payload_compressed(self):
+        """Крупные значения хранятся в сжатом виде."""
+        tier = DjangoCacheTier('analytics', timeout=60, compress_min_size=100)
+        value = [{'period': f'2024-{i:02d}', 'income': '100.00', 'expense': '50.00'} for i in range(1, 13)]
+
+        payload = tier.encode(value)
+
+        assert payload[:1] == DjangoCacheTier.COMPRESSED_PREFIX
+        assert tier.decode(payload) == value
+        assert tier.decode(tier.encode({'a': 1})) == {'a': 1}
+
+    def test_shared_tier_clear_keeps_foreign_keys(self, authenticated_user):
+        """Очистка общего уровня не удаляет чужие ключи бэкенда."""
+        tier = DjangoCacheTier('analytics', timeout=60, compress_min_size=4096)
+        tier.backend.set('foreign-key', 'value')
+        tier.set('analytics:key', {'total': '1.00'})
+
+        tier.clear()
+
+        assert tier.get('analytics:key') is None
+        assert tier.backend.get('foreign-key') == 'value'
+
+    def test_empty_cached_value_is_hit(self, authenticated_user):
+        """Пустое значение в кеше считается попаданием."""
+        cache = AnalyticsCache([LocalMemoryTier(max_entries=10)])
+        start, end = timezone.localdate(), timezone.localdate()
+
+        cache.set(authenticated_user, 'category_stats_all', start, end, [], data_version=1)
+
+        assert cache.get(authenticated_user, 'category_stats_all', start, end, data_version=1) == []
+        assert cache.get(
+            authenticated_user, 'category_stats_all', start, end, data_version=1, wallet_ids=[1]
+        ) is None
+
+    def test_many_wallets_fit_database_tier(self, authenticated_user):
+        """Фильтр по множеству счетов не превышает длину типа кеша в таблице."""
+        from api.analytics.cache import CacheTier, DatabaseTier
+        from api.analytics.models import CachedAnalytics
+
+        cache = AnalyticsCache([DatabaseTier()])
+        start, end = timezone.localdate(), timezone.localdate()
+        wallet_ids = list(range(1000, 1100))
+
+        cache.set(authenticated_user, 'category_stats_all', start, end, [1], data_version=1, wallet_ids=wallet_ids)
+
+        assert cache.get(
+            authenticated_user, 'category_stats_all', start, end, data_version=1,
+            wallet_ids=list(reversed(wallet_ids))
+        ) == [1]
+        max_length = CachedAnalytics._meta.get_field('cache_type').max_length
+        assert len(CachedAnalytics.objects.get().cache_type) <= max_length
+        with pytest.raises(TypeError):
+            CacheTier()
+
+    def test_cache_stats_admin_only(self, api_client, authenticated_user):
+        """Статистика кеша доступна только администраторам."""
+        url = reverse('analytics:cache-stats')
+
+        assert api_client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+        authenticated_user.is_staff = True
+        authenticated_user.save()
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    def test_local_tier_evicts_least_recently_used(self):
+        """LRU процесса ограничен по числу записей."""
+        tier = LocalMemoryTier(max_entries=2)
+        tier.set('a', 1)
+        tier.set('b', 2)
+        tier.get('a')
+        tier.set('c', 3)
+
+        assert tier.get('b') is None
+        assert tier.get('a') == 1
+        assert tier.get('c') == 3
+
+
+@pytest.mark.django_db
+class TestOperationJournalView:
+    """Тесты журнала операций с курсорной пагинацией."""
+
+    def test_cursor_pages_cover_all_operations(self, api_client, authenticated_user, create_operation):
+        """Курсор проходит все операции без пропусков и повторов, включая равные даты."""
+        operation_date = timezone.now()
+        created = [create_operation('10.00', operation_date=operation_date) for _ in range(5)]
+
+        url = reverse('analytics:operation-journal')
+        response = api_client.get(url, {'limit': 2})
+        seen = [item['id'] for item in response.data['operations']]
+        assert response.data['total_count'] == 5
+
+        while response.data['has_more']:
+            response = api_client.get(url, {'limit': 2, 'cursor': response.data['next_cursor']})
+            seen.extend(item['id'] for item in response.data['operations'])
+
+        assert seen == sorted((operation.id for operation in created), reverse=True)
+
+    def test_total_count_cached_between_pages(self, api_client, authenticated_user, create_operation):
+        """Общее количество не пересчитывается при листании."""
+        for _ in range(3):
+            create_operation('10.00')
+
+        url = reverse('analytics:operation-journal')
+        first_page = api_client.get(url, {'limit': 1})
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {'limit': 1, 'cursor': first_page.data['next_cursor']})
+
+        assert response.data['total_count'] == 3
+        assert not any('COUNT(' in query['sql'] for query in context.captured_queries)
+
+    def test_invalid_cursor(self, api_client, authenticated_user):
+        """Некорректный курсор."""
+        url = reverse('analytics:operation-journal')
+        response = api_client.get(url, {'cursor': 'not-a-cursor'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestDailyStatsView:
+    """Тесты дневной статистики с автоматическим укрупнением шага."""
+
+    @pytest.mark.parametrize('days, granularity', [(30, 'day'), (365, 'week'), (5 * 365, 'month')])
+    def test_granularity_by_period_length(self, api_client, authenticated_user, create_operation, days, granularity):
+        """Шаг выбирается по длине периода, период не усекается."""
+        create_operation('100.00')
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=days)
+
+        url = reverse('analytics:daily-stats')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {
+                'period': 'custom',
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+            })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert count_summary_queries(context) == 1
+        assert response.data['granularity'] == granularity
+        assert response.data['start_date'] == start_date
+        assert Decimal(response.data['stats'][-1]['expense']) == Decimal('100.00')
+        assert sum(Decimal(item['expense']) for item in response.data['stats']) == Decimal('100.00')
+
+    def test_points_limit(self, api_client, authenticated_user):
+        """Слишком подробный шаг для длинного периода отклоняется."""
+        end_date = timezone.localdate()
+
+        url = reverse('analytics:daily-stats')
+        response = api_client.get(url, {
+            'period': 'custom',
+            'start_date': (end_date - timedelta(days=730)).isoformat(),
+            'end_date': end_date.isoformat(),
+            'granularity': 'day',
+        })
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestAnalyticsOverviewView:
+    """Тесты общего обзора."""
+
+    def test_overview_totals(self, api_client, authenticated_user, wallet, create_operation):
+        """Сравнение месяцев, счета и счетчик операций."""
+        create_operation('100.00')
+        create_operation('300.00', operation_type='income')
+        create_operation('50.00', operation_date=timezone.now().replace(day=1) - timedelta(days=1))
+
+        url = reverse('analytics:overview')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(context.captured_queries) <= 4
+        assert count_summary_queries(context) == 1
+        assert Decimal(response.data['current_month_expense']) == Decimal('100.00')
+        assert Decimal(response.data['previous_month_expense']) == Decimal('50.00')
+        assert response.data['expense_change_percentage'] == 100.0
+        assert response.data['active_wallets_count'] == 1
+        assert response.data['total_operations_count'] == 3
+
+    def test_operation_counter_maintained(self, api_client, authenticated_user, create_operation):
+        """Счетчик операций следует за созданием, удалением и массовым удалением."""
+        operations = [create_operation('10.00') for _ in range(4)]
+        operations[0].delete()
+
+        url = reverse('operations:operation-bulk-delete')
+        api_client.post(url, {'operation_ids': [operations[1].id, operations[2].id]}, format='json')
+
+        assert AnalyticsDataVersion.get_state(authenticated_user)['operation_count'] == 1
+        assert Operation.objects.filter(user=authenticated_user).count() == 1
+
+    def test_overview_cached(self, api_client, authenticated_user, create_operation):
+        """Повторный запрос без изменений обходится одним запросом версии."""
+        create_operation('100.00')
+        url = reverse('analytics:overview')
+        api_client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+
+        assert response.data['total_operations_count'] == 1
+        assert count_summary_queries(context) == 0
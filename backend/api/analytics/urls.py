@@ -8,8 +8,8 @@ urlpatterns = [
     # Сводка за месяц
     path('analytics/monthly-summary/', views.MonthlySummaryView.as_view(), name='monthly-summary'),
     
-    # Тренды за 6 месяцев
-    path('analytics/trends/', views.TrendsView.as_view(), name='trends'),
+    # Тренды (months=N, granularity=week|month|quarter|year)
+    path('analytics/trends/', views.MonthlyTrendsView.as_view(), name='trends'),
     
     # Статистика по категориям
     path('analytics/category-stats/', views.CategoryAnalyticsView.as_view(), name='category-stats'),
@@ -17,6 +17,9 @@ urlpatterns = [
     # Дневная статистика
     path('analytics/daily-stats/', views.DailyStatsView.as_view(), name='daily-stats'),
     
+    # Статистика по счетам
+    path('analytics/wallet-stats/', views.WalletAnalyticsView.as_view(), name='wallet-stats'),
+    
     # Журнал операций
     path('analytics/operation-journal/', views.OperationJournalView.as_view(), name='operation-journal'),
     
@@ -37,4 +40,7 @@ urlpatterns = [
     
     # Очистка кеша
     path('analytics/clear-cache/', views.clear_analytics_cache, name='clear-cache'),
+    
+    # Статистика кеша
+    path('analytics/cache-stats/', views.analytics_cache_stats, name='cache-stats'),
 ]
\ No newline at end of file
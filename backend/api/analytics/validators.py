@@ -3,15 +3,15 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 
-def validate_date_range(start_date, end_date):
+def validate_date_range(start_date, end_date, max_days=365):
     """
-    Валидация диапазона дат
+    Валидация диапазона дат (max_days=None снимает ограничение длины)
     """
     if start_date and end_date and start_date > end_date:
         raise ValidationError(_('Дата начала не может быть позже даты окончания'))
     
-    if start_date and end_date and (end_date - start_date).days > 365:
-        raise ValidationError(_('Период не может превышать 1 год'))
+    if max_days is not None and start_date and end_date and (end_date - start_date).days > max_days:
+        raise ValidationError(_('Период не может превышать %(days)s дней') % {'days': max_days})
 
 
 def validate_period_value(value):
@@ -1,30 +1,51 @@
 # evercoin/backend/api/analytics/views.py
 from rest_framework import generics, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.exceptions import ValidationError
 from django.db import models
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, F
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncQuarter, TruncYear
 from django.utils import timezone
 from datetime import datetime, timedelta
+from decimal import Decimal
+import base64
+import json
 from dateutil.relativedelta import relativedelta
 
-from .models import CachedAnalytics
+from .models import CachedAnalytics, AnalyticsDataVersion, DailyOperationSummary, ReportPreset
 from .serializers import (
     AnalyticsPeriodSerializer,
     MonthlySummarySerializer,
     CategoryStatsSerializer,
     MonthlyTrendsSerializer,
+    TrendsParametersSerializer,
+    DailyStatsParametersSerializer,
     DailyStatsSerializer,
     WalletStatsSerializer,
     OperationJournalSerializer,
-    ReportScheduleSerializer,
+    ReportPresetSerializer,
+    ReportPresetCreateSerializer,
+    ReportPresetUpdateSerializer,
     AnalyticsOverviewSerializer
 )
+from .filters import ReportPresetFilter
+from .cache import analytics_cache
 from api.operations.models import Operation
 from api.wallets.models import Wallet
 from api.categories.models import Category
 
+# Функции усечения дня до начала интервала группировки
+GRANULARITY_TRUNC_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+
 
 class AnalyticsBaseView(generics.GenericAPIView):
     """
@@ -32,13 +53,85 @@ class AnalyticsBaseView(generics.GenericAPIView):
     """
     permission_classes = [IsAuthenticated]
     
+    def get_bucket_start(self, value, granularity):
+        """
+        Начало интервала группировки, в который попадает дата
+        """
+        if granularity == 'week':
+            return value - timedelta(days=value.weekday())
+        if granularity == 'month':
+            return value.replace(day=1)
+        if granularity == 'quarter':
+            return value.replace(month=(value.month - 1) // 3 * 3 + 1, day=1)
+        if granularity == 'year':
+            return value.replace(month=1, day=1)
+        return value
+    
+    def get_next_bucket(self, value, granularity):
+        """
+        Начало следующего интервала группировки
+        """
+        if granularity == 'week':
+            return value + timedelta(weeks=1)
+        if granularity == 'month':
+            return value + relativedelta(months=1)
+        if granularity == 'quarter':
+            return value + relativedelta(months=3)
+        if granularity == 'year':
+            return value + relativedelta(years=1)
+        return value + timedelta(days=1)
+    
+    def format_bucket(self, value, granularity):
+        """
+        Подпись интервала группировки
+        """
+        if granularity == 'week':
+            year, week, _ = value.isocalendar()
+            return f"{year}-W{week:02d}"
+        if granularity == 'month':
+            return value.strftime('%Y-%m')
+        if granularity == 'quarter':
+            return f"{value.year}-Q{(value.month - 1) // 3 + 1}"
+        if granularity == 'year':
+            return str(value.year)
+        return value.isoformat()
+    
+    def get_bucketed_totals(self, summaries, granularity, start_date, end_date):
+        """
+        Доходы и расходы по интервалам одним групповым запросом.
+        Интервалы без операций заполняются нулями
+        """
+        bucket_totals = (
+            summaries.annotate(bucket=GRANULARITY_TRUNC_FUNCTIONS[granularity]('day'))
+            .values('bucket')
+            .annotate(
+                income=Sum('total_amount', filter=Q(operation_type='income')),
+                expense=Sum('total_amount', filter=Q(operation_type='expense'))
+            )
+            .order_by('bucket')
+        )
+        totals_by_bucket = {item['bucket']: item for item in bucket_totals}
+        
+        result = []
+        bucket = self.get_bucket_start(start_date, granularity)
+        while bucket <= end_date:
+            item = totals_by_bucket.get(bucket, {})
+            result.append({
+                'bucket': bucket,
+                'income': item.get('income') or 0,
+                'expense': item.get('expense') or 0,
+            })
+            bucket = self.get_next_bucket(bucket, granularity)
+        
+        return result
+    
     def get_user_operations_queryset(self, user, start_date, end_date, wallet_ids=None):
         """
         Базовый queryset для операций пользователя с фильтрацией
         """
         queryset = Operation.objects.filter(
             user=user,
-            operation_date__date__range=[start_date, end_date]
+            **Operation.get_date_range_lookup(start_date, end_date)
         ).select_related('wallet', 'category')
         
         if wallet_ids:
@@ -46,11 +139,30 @@ class AnalyticsBaseView(generics.GenericAPIView):
         
         return queryset
     
+    def get_user_summary_queryset(self, user, start_date, end_date, wallet_ids=None):
+        """
+        Базовый queryset дневной сводки пользователя с фильтрацией
+        """
+        queryset = DailyOperationSummary.objects.filter(
+            user=user,
+            day__range=[start_date, end_date]
+        )
+        
+        if wallet_ids:
+            queryset = queryset.filter(wallet_id__in=wallet_ids)
+        
+        return queryset
+    
+    period_serializer_class = AnalyticsPeriodSerializer
+    
     def get_period_parameters(self, request):
         """
         Получение параметров периода из запроса
         """
-        serializer = AnalyticsPeriodSerializer(data=request.query_params)
+        serializer = self.period_serializer_class(
+            data=request.query_params,
+            context={'request': request}
+        )
         serializer.is_valid(raise_exception=True)
         return serializer
 
@@ -67,72 +179,65 @@ class MonthlySummaryView(AnalyticsBaseView):
         period_serializer = self.get_period_parameters(request)
         start_date, end_date = period_serializer.get_date_range()
         
-        # Проверяем кеш
-        cached_data = CachedAnalytics.get_cached_data(
+        # Проверяем кеш (версия данных читается до расчета)
+        data_version = AnalyticsDataVersion.get_version(request.user)
+        wallet_ids = period_serializer.validated_data.get('wallet_ids')
+        cached_data = analytics_cache.get(
             request.user, 
             'monthly_summary', 
             start_date, 
-            end_date
+            end_date,
+            data_version=data_version,
+            wallet_ids=wallet_ids
         )
         
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
         
-        # Получаем операции за период
-        operations = self.get_user_operations_queryset(
-            request.user, start_date, end_date,
-            period_serializer.validated_data.get('wallet_ids')
-        )
-        
-        # Общие суммы
-        total_income = operations.filter(operation_type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        total_expense = operations.filter(operation_type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        net_flow = total_income - total_expense
+        # Получаем дневную сводку за период
+        summaries = self.get_user_summary_queryset(request.user, start_date, end_date, wallet_ids)
         
-        # Категории доходов
-        income_categories = (
-            operations.filter(operation_type='income', category__isnull=False)
+        # Один групповой запрос: суммы доходов и расходов по каждой категории
+        # (строка без категории тоже участвует в общих суммах)
+        category_totals = (
+            summaries.filter(operation_type__in=['income', 'expense'])
             .values('category__id', 'category__name', 'category__icon', 'category__color')
-            .annotate(total_amount=Sum('amount'))
-            .order_by('-total_amount')
+            .annotate(
+                income=Sum('total_amount', filter=Q(operation_type='income')),
+                expense=Sum('total_amount', filter=Q(operation_type='expense'))
+            )
+            .order_by()
         )
         
-        # Категории расходов
-        expense_categories = (
-            operations.filter(operation_type='expense', category__isnull=False)
-            .values('category__id', 'category__name', 'category__icon', 'category__color')
-            .annotate(total_amount=Sum('amount'))
-            .order_by('-total_amount')
-        )
+        total_income = 0
+        total_expense = 0
+        income_categories_data = []
+        expense_categories_data = []
         
-        # Форматируем данные
-        income_categories_data = [
-            {
+        for item in category_totals:
+            income = item['income'] or 0
+            expense = item['expense'] or 0
+            total_income += income
+            total_expense += expense
+            
+            if item['category__id'] is None:
+                continue
+            
+            category_data = {
                 'category_id': item['category__id'],
                 'category_name': item['category__name'],
                 'category_icon': item['category__icon'],
                 'category_color': item['category__color'],
-                'total_amount': item['total_amount']
             }
-            for item in income_categories
-        ]
+            if income:
+                income_categories_data.append({**category_data, 'total_amount': income})
+            if expense:
+                expense_categories_data.append({**category_data, 'total_amount': expense})
         
-        expense_categories_data = [
-            {
-                'category_id': item['category__id'],
-                'category_name': item['category__name'],
-                'category_icon': item['category__icon'],
-                'category_color': item['category__color'],
-                'total_amount': item['total_amount']
-            }
-            for item in expense_categories
-        ]
+        income_categories_data.sort(key=lambda x: x['total_amount'], reverse=True)
+        expense_categories_data.sort(key=lambda x: x['total_amount'], reverse=True)
+        
+        net_flow = total_income - total_expense
         
         result = {
             'period': f"{start_date.strftime('%Y-%m')}",
@@ -143,86 +248,81 @@ class MonthlySummaryView(AnalyticsBaseView):
             'expense_categories': expense_categories_data
         }
         
+        serializer = MonthlySummarySerializer(result)
+        
         # Кешируем результат
-        CachedAnalytics.set_cached_data(
+        analytics_cache.set(
             request.user, 
             'monthly_summary', 
             start_date, 
             end_date, 
-            result
+            serializer.data,
+            data_version=data_version,
+            wallet_ids=wallet_ids
         )
         
-        serializer = MonthlySummarySerializer(result)
         return Response(serializer.data)
 
 
 class MonthlyTrendsView(AnalyticsBaseView):
     """
-    API endpoint для получения трендов за 6 месяцев
+    API endpoint для получения трендов за настраиваемый период
     """
     
     def get(self, request, *args, **kwargs):
         """
-        Получение финансовых трендов за последние 6 месяцев
+        Получение финансовых трендов за последние N месяцев
+        с группировкой по неделям, месяцам, кварталам или годам
         """
+        parameters = TrendsParametersSerializer(data=request.query_params)
+        parameters.is_valid(raise_exception=True)
+        months = parameters.validated_data['months']
+        granularity = parameters.validated_data['granularity']
+        
         end_date = timezone.now().date()
-        start_date = end_date - relativedelta(months=5)
-        start_date = start_date.replace(day=1)
+        start_date = (end_date - relativedelta(months=months - 1)).replace(day=1)
+        start_date = self.get_bucket_start(start_date, granularity)
         
-        # Проверяем кеш
-        cached_data = CachedAnalytics.get_cached_data(
+        # Проверяем кеш (версия данных читается до расчета)
+        data_version = AnalyticsDataVersion.get_version(request.user)
+        cache_key = f"trends_{granularity}"
+        cached_data = analytics_cache.get(
             request.user, 
-            'monthly_trends', 
+            cache_key, 
             start_date, 
-            end_date
+            end_date,
+            data_version=data_version
         )
         
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
         
-        trends_data = []
-        current_date = start_date
+        # Один групповой запрос по интервалам, пустые интервалы заполняются нулями
+        summaries = self.get_user_summary_queryset(request.user, start_date, end_date)
+        buckets = self.get_bucketed_totals(summaries, granularity, start_date, end_date)
         
-        while current_date <= end_date:
-            month_start = current_date.replace(day=1)
-            next_month = month_start + relativedelta(months=1)
-            month_end = next_month - timedelta(days=1)
-            
-            # Получаем операции за месяц
-            operations = Operation.objects.filter(
-                user=request.user,
-                operation_date__date__range=[month_start, month_end]
-            )
-            
-            income = operations.filter(operation_type='income').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            expense = operations.filter(operation_type='expense').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            net_flow = income - expense
-            
-            trends_data.append({
-                'period': month_start.strftime('%Y-%m'),
-                'income': income,
-                'expense': expense,
-                'net_flow': net_flow
-            })
-            
-            current_date = next_month
+        trends_data = [
+            {
+                'period': self.format_bucket(item['bucket'], granularity),
+                'income': item['income'],
+                'expense': item['expense'],
+                'net_flow': item['income'] - item['expense']
+            }
+            for item in buckets
+        ]
+        
+        serializer = MonthlyTrendsSerializer(trends_data, many=True)
         
         # Кешируем результат
-        CachedAnalytics.set_cached_data(
+        analytics_cache.set(
             request.user, 
-            'monthly_trends', 
+            cache_key, 
             start_date, 
             end_date, 
-            trends_data
+            serializer.data,
+            data_version=data_version
         )
         
-        serializer = MonthlyTrendsSerializer(trends_data, many=True)
         return Response(serializer.data)
 
 
@@ -239,31 +339,32 @@ class CategoryAnalyticsView(AnalyticsBaseView):
         start_date, end_date = period_serializer.get_date_range()
         category_type = period_serializer.validated_data.get('category_type', 'all')
         
-        # Проверяем кеш
+        # Проверяем кеш (версия данных читается до расчета)
+        data_version = AnalyticsDataVersion.get_version(request.user)
         cache_key = f"category_stats_{category_type}"
-        cached_data = CachedAnalytics.get_cached_data(
+        wallet_ids = period_serializer.validated_data.get('wallet_ids')
+        cached_data = analytics_cache.get(
             request.user, 
             cache_key, 
             start_date, 
-            end_date
+            end_date,
+            data_version=data_version,
+            wallet_ids=wallet_ids
         )
         
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
         
-        # Получаем операции за период
-        operations = self.get_user_operations_queryset(
-            request.user, start_date, end_date,
-            period_serializer.validated_data.get('wallet_ids')
-        )
+        # Получаем дневную сводку за период
+        summaries = self.get_user_summary_queryset(request.user, start_date, end_date, wallet_ids)
         
         # Фильтруем по типу категории
         if category_type != 'all':
-            operations = operations.filter(operation_type=category_type)
+            summaries = summaries.filter(operation_type=category_type)
         
         # Группируем по категориям
         category_stats = (
-            operations.filter(category__isnull=False)
+            summaries.filter(category__isnull=False)
             .values(
                 'category__id', 
                 'category__name', 
@@ -272,8 +373,8 @@ class CategoryAnalyticsView(AnalyticsBaseView):
                 'category__category_type'
             )
             .annotate(
-                total_amount=Sum('amount'),
-                operation_count=Count('id')
+                total_amount=Sum('total_amount'),
+                operation_count=Sum('operation_count')
             )
             .order_by('-total_amount')
         )
@@ -297,133 +398,227 @@ class CategoryAnalyticsView(AnalyticsBaseView):
                 'percentage': round(percentage, 2)
             })
         
+        serializer = CategoryStatsSerializer(result, many=True)
+        
         # Кешируем результат
-        CachedAnalytics.set_cached_data(
+        analytics_cache.set(
             request.user, 
             cache_key, 
             start_date, 
             end_date, 
-            result
+            serializer.data,
+            data_version=data_version,
+            wallet_ids=wallet_ids
         )
         
-        serializer = CategoryStatsSerializer(result, many=True)
         return Response(serializer.data)
 
 
 class DailyStatsView(AnalyticsBaseView):
     """
-    API endpoint для дневной статистики
+    API endpoint для дневной статистики.
+    Длинные периоды автоматически укрупняются: по дням до 3 месяцев,
+    по неделям до 2 лет, дальше по месяцам
     """
+    period_serializer_class = DailyStatsParametersSerializer
+    
+    # Пороги автоматического выбора шага (в днях)
+    DAILY_MAX_DAYS = 92
+    WEEKLY_MAX_DAYS = 731
+    
+    # Максимальное количество точек в ответе
+    MAX_POINTS = 400
     
     def get(self, request, *args, **kwargs):
         """
-        Получение дневной статистики за период
+        Получение статистики за период с шагом по дням, неделям или месяцам
         """
         period_serializer = self.get_period_parameters(request)
         start_date, end_date = period_serializer.get_date_range()
+        granularity = (
+            period_serializer.validated_data.get('granularity')
+            or self.get_granularity(start_date, end_date)
+        )
+        self.check_points_count(start_date, end_date, granularity)
         
-        # Ограничиваем период 90 днями для производительности
-        if (end_date - start_date).days > 90:
-            start_date = end_date - timedelta(days=90)
-        
-        # Проверяем кеш
-        cached_data = CachedAnalytics.get_cached_data(
+        # Проверяем кеш (версия данных читается до расчета)
+        data_version = AnalyticsDataVersion.get_version(request.user)
+        cache_type = f"daily_stats_{granularity}"
+        cached_data = analytics_cache.get(
             request.user, 
-            'daily_stats', 
+            cache_type, 
             start_date, 
-            end_date
+            end_date,
+            data_version=data_version
         )
         
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
         
-        # Получаем ежедневную статистику
-        daily_stats = (
-            Operation.objects.filter(
-                user=request.user,
-                operation_date__date__range=[start_date, end_date]
-            )
-            .extra({'date': "date(operation_date)"})
-            .values('date')
-            .annotate(
-                income=Sum('amount', filter=Q(operation_type='income')),
-                expense=Sum('amount', filter=Q(operation_type='expense'))
-            )
-            .order_by('date')
-        )
+        # Доходы и расходы по интервалам одним групповым запросом
+        summaries = self.get_user_summary_queryset(request.user, start_date, end_date)
+        buckets = self.get_bucketed_totals(summaries, granularity, start_date, end_date)
         
         # Форматируем данные
         result = []
-        for day in daily_stats:
-            income = day['income'] or 0
-            expense = day['expense'] or 0
-            net_flow = income - expense
-            
+        for item in buckets:
             result.append({
-                'date': day['date'],
-                'income': income,
-                'expense': expense,
-                'net_flow': net_flow
+                'date': item['bucket'],
+                'period': self.format_bucket(item['bucket'], granularity),
+                'income': item['income'],
+                'expense': item['expense'],
+                'net_flow': item['income'] - item['expense']
             })
         
+        serializer = DailyStatsSerializer(result, many=True)
+        data = {
+            'granularity': granularity,
+            'start_date': start_date,
+            'end_date': end_date,
+            'stats': serializer.data
+        }
+        
         # Кешируем результат
-        CachedAnalytics.set_cached_data(
+        analytics_cache.set(
             request.user, 
-            'daily_stats', 
+            cache_type, 
             start_date, 
             end_date, 
-            result
+            data,
+            data_version=data_version
         )
         
-        serializer = DailyStatsSerializer(result, many=True)
-        return Response(serializer.data)
+        return Response(data)
+    
+    def get_granularity(self, start_date, end_date):
+        """
+        Автоматический выбор шага по длине периода
+        """
+        days = (end_date - start_date).days
+        if days <= self.DAILY_MAX_DAYS:
+            return 'day'
+        if days <= self.WEEKLY_MAX_DAYS:
+            return 'week'
+        return 'month'
+    
+    def check_points_count(self, start_date, end_date, granularity):
+        """
+        Ограничение размера ответа вместо молчаливого усечения периода
+        """
+        points = 0
+        bucket = self.get_bucket_start(start_date, granularity)
+        while bucket <= end_date:
+            points += 1
+            if points > self.MAX_POINTS:
+                raise ValidationError({
+                    'granularity': (
+                        f'Слишком много точек для шага {granularity}: '
+                        f'максимум {self.MAX_POINTS}, укрупните шаг или сократите период'
+                    )
+                })
+            bucket = self.get_next_bucket(bucket, granularity)
+
+
+class WalletAnalyticsPagination(LimitOffsetPagination):
+    """
+    Пагинация статистики по счетам
+    """
+    default_limit = 20
+    max_limit = 100
 
 
 class WalletAnalyticsView(AnalyticsBaseView):
     """
     API endpoint для аналитики по счетам
     """
+    pagination_class = WalletAnalyticsPagination
+    ordering_fields = [
+        'operation_count', 'income', 'expense', 'net_flow', 'balance', 'wallet_name'
+    ]
     
     def get(self, request, *args, **kwargs):
         """
-        Получение статистики по всем счетам
+        Получение статистики по всем счетам с сортировкой и пагинацией
         """
         period_serializer = self.get_period_parameters(request)
         start_date, end_date = period_serializer.get_date_range()
+        wallet_ids = period_serializer.validated_data.get('wallet_ids')
+        ordering = self.get_ordering(request)
         
-        # Проверяем кеш
-        cached_data = CachedAnalytics.get_cached_data(
+        # Проверяем кеш (версия данных читается до расчета)
+        data_version = AnalyticsDataVersion.get_version(request.user)
+        wallet_stats = analytics_cache.get(
             request.user, 
             'wallet_stats', 
             start_date, 
-            end_date
+            end_date,
+            data_version=data_version
         )
         
-        if cached_data:
-            return Response(cached_data)
+        if wallet_stats is None:
+            wallet_stats = self.get_wallet_stats(request.user, start_date, end_date)
+            
+            # Кешируем результат
+            analytics_cache.set(
+                request.user, 
+                'wallet_stats', 
+                start_date, 
+                end_date, 
+                wallet_stats,
+                data_version=data_version
+            )
+        
+        if wallet_ids:
+            wallet_stats = [item for item in wallet_stats if item['wallet_id'] in wallet_ids]
+        
+        # Сортируем на сервере
+        field = ordering.lstrip('-')
+        if field == 'wallet_name':
+            sort_key = lambda x: x[field].lower()
+        else:
+            sort_key = lambda x: Decimal(str(x[field]))
+        wallet_stats = sorted(wallet_stats, key=sort_key, reverse=ordering.startswith('-'))
+        
+        page = self.paginate_queryset(wallet_stats)
+        return self.get_paginated_response(page)
+    
+    def get_ordering(self, request):
+        """
+        Поле сортировки из параметра ordering (по умолчанию -operation_count)
+        """
+        ordering = request.query_params.get('ordering', '-operation_count')
+        if ordering.lstrip('-') not in self.ordering_fields:
+            raise ValidationError({
+                'ordering': f'Допустимые значения: {", ".join(self.ordering_fields)}'
+            })
+        return ordering
+    
+    def get_wallet_stats(self, user, start_date, end_date):
+        """
+        Статистика всех счетов: один групповой запрос по сводке
+        и один запрос метаданных счетов, объединение в памяти
+        """
+        wallet_totals = (
+            self.get_user_summary_queryset(user, start_date, end_date)
+            .values('wallet_id')
+            .annotate(
+                income=Sum('total_amount', filter=Q(operation_type='income')),
+                expense=Sum('total_amount', filter=Q(operation_type='expense')),
+                operation_count=Sum('operation_count')
+            )
+            .order_by()
+        )
+        totals_by_wallet = {item['wallet_id']: item for item in wallet_totals}
         
-        # Получаем все счета пользователя
-        wallets = Wallet.objects.filter(user=request.user, is_active=True)
+        wallets = Wallet.objects.filter(user=user).only(
+            'id', 'name', 'currency', 'icon', 'color', 'balance'
+        )
         
         wallet_stats = []
         for wallet in wallets:
-            # Операции по счету за период
-            operations = Operation.objects.filter(
-                user=request.user,
-                wallet=wallet,
-                operation_date__date__range=[start_date, end_date]
-            )
-            
-            income = operations.filter(operation_type='income').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            expense = operations.filter(operation_type='expense').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            net_flow = income - expense
-            operation_count = operations.count()
+            totals = totals_by_wallet.get(wallet.id, {})
+            income = totals.get('income') or 0
+            expense = totals.get('expense') or 0
             
             wallet_stats.append({
                 'wallet_id': wallet.id,
@@ -434,42 +629,105 @@ class WalletAnalyticsView(AnalyticsBaseView):
                 'balance': wallet.balance,
                 'income': income,
                 'expense': expense,
-                'net_flow': net_flow,
-                'operation_count': operation_count
+                'net_flow': income - expense,
+                'operation_count': totals.get('operation_count') or 0
             })
         
-        # Сортируем по количеству операций
-        wallet_stats.sort(key=lambda x: x['operation_count'], reverse=True)
-        
-        # Кешируем результат
-        CachedAnalytics.set_cached_data(
-            request.user, 
-            'wallet_stats', 
-            start_date, 
-            end_date, 
-            wallet_stats
-        )
-        
-        serializer = WalletStatsSerializer(wallet_stats, many=True)
-        return Response(serializer.data)
+        return WalletStatsSerializer(wallet_stats, many=True).data
+
+
+class OperationJournalPagination(BasePagination):
+    """
+    Keyset-пагинация журнала операций по (operation_date, id).
+    Курсор непрозрачный: base64 от даты и id последней записи страницы
+    """
+    default_limit = 100
+    max_limit = 500
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if cursor:
+            operation_date, operation_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(operation_date__lt=operation_date) |
+                Q(operation_date=operation_date, id__lt=operation_id)
+            )
+
+        # Берем на одну запись больше, чтобы узнать о наличии следующей страницы
+        rows = list(queryset.order_by('-operation_date', '-id')[:self.limit + 1])
+        self.has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+
+        self.next_cursor = None
+        if self.has_more:
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor(last['operation_date'], last['id'])
+
+        return rows
+
+    def get_paginated_response(self, data, total_count=None):
+        return Response({
+            'operations': data,
+            'total_count': total_count,
+            'limit': self.limit,
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+        })
+
+    def get_limit(self, request):
+        """
+        Размер страницы из параметра limit
+        """
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, self.default_limit))
+        except (TypeError, ValueError):
+            raise ValidationError({'limit': 'Ожидается целое число'})
+        if limit < 1:
+            raise ValidationError({'limit': 'Значение должно быть положительным'})
+        return min(limit, self.max_limit)
+
+    @staticmethod
+    def encode_cursor(operation_date, operation_id):
+        """
+        Кодирование позиции в курсор
+        """
+        payload = json.dumps([operation_date.isoformat(), operation_id]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Декодирование курсора в позицию (дата операции, id)
+        """
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            operation_date, operation_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return datetime.fromisoformat(operation_date), int(operation_id)
+        except (TypeError, ValueError):
+            raise ValidationError({'cursor': 'Некорректный курсор'})
 
 
 class OperationJournalView(AnalyticsBaseView):
     """
     API endpoint для журнала операций с фильтрацией
     """
+    pagination_class = OperationJournalPagination
     
     def get(self, request, *args, **kwargs):
         """
-        Получение журнала операций с фильтрацией и пагинацией
+        Получение журнала операций с фильтрацией и курсорной пагинацией
         """
         period_serializer = self.get_period_parameters(request)
         start_date, end_date = period_serializer.get_date_range()
+        wallet_ids = period_serializer.validated_data.get('wallet_ids')
         
         # Получаем операции с фильтрацией
         operations = self.get_user_operations_queryset(
-            request.user, start_date, end_date,
-            period_serializer.validated_data.get('wallet_ids')
+            request.user, start_date, end_date, wallet_ids
         )
         
         # Фильтрация по типу операции
@@ -477,35 +735,42 @@ class OperationJournalView(AnalyticsBaseView):
         if category_type and category_type != 'all':
             operations = operations.filter(operation_type=category_type)
         
-        # Пагинация
-        limit = min(int(request.query_params.get('limit', 100)), 500)  # Максимум 500 записей
-        offset = int(request.query_params.get('offset', 0))
-        
-        operations = operations.order_by('-operation_date')[offset:offset + limit]
+        # Только нужные поля, без создания моделей
+        operations = operations.values(
+            'id', 'title', 'amount', 'operation_type', 'operation_date',
+            wallet_name=F('wallet__name'),
+            wallet_currency=F('wallet__currency'),
+            category_name=F('category__name'),
+            category_icon=F('category__icon'),
+            category_color=F('category__color'),
+        )
         
-        # Форматируем данные
-        result = []
-        for operation in operations:
-            result.append({
-                'operation_id': operation.id,
-                'title': operation.title,
-                'amount': operation.amount,
-                'operation_type': operation.operation_type,
-                'operation_date': operation.operation_date,
-                'wallet_name': operation.wallet.name,
-                'wallet_currency': operation.wallet.currency,
-                'category_name': operation.category.name if operation.category else None,
-                'category_icon': operation.category.icon if operation.category else None,
-                'category_color': operation.category.color if operation.category else None,
-            })
+        page = self.paginate_queryset(operations)
+        serializer = OperationJournalSerializer(page, many=True)
+        total_count = self.get_total_count(
+            request.user, operations, start_date, end_date, category_type, wallet_ids
+        )
+        return self.paginator.get_paginated_response(serializer.data, total_count=total_count)
+    
+    def get_total_count(self, user, operations, start_date, end_date, category_type, wallet_ids):
+        """
+        Общее количество операций по фильтру. Считается отдельным запросом
+        и кешируется под версией данных, поэтому при листании не пересчитывается
+        """
+        cache_type = f"journal_count_{category_type or 'all'}"
+        data_version = AnalyticsDataVersion.get_version(user)
         
-        serializer = OperationJournalSerializer(result, many=True)
-        return Response({
-            'operations': serializer.data,
-            'total_count': operations.count(),
-            'limit': limit,
-            'offset': offset
-        })
+        total_count = analytics_cache.get(
+            user, cache_type, start_date, end_date,
+            data_version=data_version, wallet_ids=wallet_ids
+        )
+        if total_count is None:
+            total_count = operations.order_by().count()
+            analytics_cache.set(
+                user, cache_type, start_date, end_date, total_count,
+                data_version=data_version, wallet_ids=wallet_ids
+            )
+        return total_count
 
 
 class AnalyticsOverviewView(AnalyticsBaseView):
@@ -520,38 +785,39 @@ class AnalyticsOverviewView(AnalyticsBaseView):
         today = timezone.now().date()
         current_month_start = today.replace(day=1)
         previous_month_start = (current_month_start - relativedelta(months=1)).replace(day=1)
-        previous_month_end = current_month_start - timedelta(days=1)
         
-        # Текущий месяц
-        current_month_ops = Operation.objects.filter(
-            user=request.user,
-            operation_date__date__range=[current_month_start, today]
+        # Проверяем кеш (версия данных и счетчик операций читаются одним запросом)
+        data_state = AnalyticsDataVersion.get_state(request.user)
+        data_version = data_state['version']
+        cached_data = analytics_cache.get(
+            request.user,
+            'overview',
+            current_month_start,
+            today,
+            data_version=data_version
         )
         
-        current_month_income = current_month_ops.filter(operation_type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        current_month_expense = current_month_ops.filter(operation_type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        current_month_net_flow = current_month_income - current_month_expense
+        if cached_data is not None:
+            return Response(cached_data)
         
-        # Предыдущий месяц
-        previous_month_ops = Operation.objects.filter(
-            user=request.user,
-            operation_date__date__range=[previous_month_start, previous_month_end]
+        # Доходы и расходы за текущий и предыдущий месяц одним запросом
+        current_month = Q(day__gte=current_month_start)
+        previous_month = Q(day__lt=current_month_start)
+        month_totals = self.get_user_summary_queryset(
+            request.user, previous_month_start, today
+        ).aggregate(
+            current_month_income=Sum('total_amount', filter=current_month & Q(operation_type='income')),
+            current_month_expense=Sum('total_amount', filter=current_month & Q(operation_type='expense')),
+            previous_month_income=Sum('total_amount', filter=previous_month & Q(operation_type='income')),
+            previous_month_expense=Sum('total_amount', filter=previous_month & Q(operation_type='expense')),
         )
         
-        previous_month_income = previous_month_ops.filter(operation_type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        previous_month_expense = previous_month_ops.filter(operation_type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        current_month_income = month_totals['current_month_income'] or 0
+        current_month_expense = month_totals['current_month_expense'] or 0
+        current_month_net_flow = current_month_income - current_month_expense
         
+        previous_month_income = month_totals['previous_month_income'] or 0
+        previous_month_expense = month_totals['previous_month_expense'] or 0
         previous_month_net_flow = previous_month_income - previous_month_expense
         
         # Процентные изменения
@@ -562,18 +828,11 @@ class AnalyticsOverviewView(AnalyticsBaseView):
             previous_month_expense, current_month_expense
         )
         
-        # Общая статистика
-        total_balance = Wallet.objects.filter(
-            user=request.user, 
-            is_hidden=False
-        ).aggregate(total=Sum('balance'))['total'] or 0
-        
-        active_wallets_count = Wallet.objects.filter(
-            user=request.user, 
-            is_active=True
-        ).count()
-        
-        total_operations_count = Operation.objects.filter(user=request.user).count()
+        # Баланс и количество счетов одним запросом
+        wallet_totals = Wallet.objects.filter(user=request.user).aggregate(
+            total_balance=Sum('balance', filter=Q(is_hidden=False)),
+            active_wallets_count=Count('id')
+        )
         
         result = {
             'current_month_income': current_month_income,
@@ -584,12 +843,24 @@ class AnalyticsOverviewView(AnalyticsBaseView):
             'previous_month_net_flow': previous_month_net_flow,
             'income_change_percentage': income_change_percentage,
             'expense_change_percentage': expense_change_percentage,
-            'total_balance': total_balance,
-            'active_wallets_count': active_wallets_count,
-            'total_operations_count': total_operations_count
+            'total_balance': wallet_totals['total_balance'] or 0,
+            'active_wallets_count': wallet_totals['active_wallets_count'],
+            # Поддерживаемый счетчик вместо COUNT(*) по всей истории
+            'total_operations_count': data_state['operation_count']
         }
         
         serializer = AnalyticsOverviewSerializer(result)
+        
+        # Кешируем результат
+        analytics_cache.set(
+            request.user,
+            'overview',
+            current_month_start,
+            today,
+            serializer.data,
+            data_version=data_version
+        )
+        
         return Response(serializer.data)
     
     def _calculate_percentage_change(self, old_value, new_value):
@@ -602,6 +873,56 @@ class AnalyticsOverviewView(AnalyticsBaseView):
         return ((new_value - old_value) / old_value) * 100
 
 
+class ReportPresetListView(generics.ListAPIView):
+    """
+    API endpoint для получения списка пресетов отчетов
+    """
+    serializer_class = ReportPresetSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_class = ReportPresetFilter
+    
+    def get_queryset(self):
+        """
+        Возвращает пресеты только текущего пользователя
+        """
+        return ReportPreset.objects.filter(user=self.request.user)
+
+
+class ReportPresetCreateView(generics.CreateAPIView):
+    """
+    API endpoint для создания пресета отчета
+    """
+    serializer_class = ReportPresetCreateSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class ReportPresetUpdateView(generics.UpdateAPIView):
+    """
+    API endpoint для обновления пресета отчета
+    """
+    serializer_class = ReportPresetUpdateSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """
+        Возвращает пресеты только текущего пользователя
+        """
+        return ReportPreset.objects.filter(user=self.request.user)
+
+
+class ReportPresetDeleteView(generics.DestroyAPIView):
+    """
+    API endpoint для удаления пресета отчета
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """
+        Возвращает пресеты только текущего пользователя
+        """
+        return ReportPreset.objects.filter(user=self.request.user)
+
+
 @api_view(['POST'])
 def clear_analytics_cache(request):
     """
@@ -609,6 +930,7 @@ def clear_analytics_cache(request):
     """
     try:
         deleted_count, _ = CachedAnalytics.objects.filter(user=request.user).delete()
+        AnalyticsDataVersion.bump(request.user.id)
         
         return Response({
             'message': f'Кеш аналитики очищен',
@@ -619,4 +941,12 @@ def clear_analytics_cache(request):
         return Response(
             {'error': f'Ошибка при очистке кеша: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def analytics_cache_stats(request):
+    """
+    API endpoint для статистики попаданий в кеш аналитики по уровням (в рамках процесса)
+    """
+    return Response(analytics_cache.get_stats(), status=status.HTTP_200_OK)
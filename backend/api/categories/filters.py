@@ -52,9 +52,14 @@ class CategoryFilter(django_filters.FilterSet):
     
     def filter_has_operations(self, queryset, name, value):
         """
-        Фильтр по наличию операций
+        Фильтр по наличию операций. Подзапрос EXISTS вместо JOIN,
+        чтобы не искажать аннотированные количество и сумму операций
         """
+        from django.db.models import Exists, OuterRef
+        from api.operations.models import Operation
+        
+        has_operations = Exists(Operation.objects.filter(category=OuterRef('pk')))
         if value:
-            return queryset.filter(operations__isnull=False).distinct()
+            return queryset.filter(has_operations)
         else:
-            return queryset.filter(operations__isnull=True)
\ No newline at end of file
+            return queryset.filter(~has_operations)
\ No newline at end of file
@@ -67,6 +67,12 @@ class Category(models.Model):
         verbose_name='Активная категория'
     )
     
+    # Номер последнего изменения для дельта-синхронизации
+    sync_seq = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер изменения'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -79,6 +85,7 @@ class Category(models.Model):
             models.Index(fields=['user', 'category_type']),
             models.Index(fields=['user', 'is_active']),
             models.Index(fields=['category_type']),
+            models.Index(fields=['user', 'sync_seq']),
         ]
     
     def __str__(self):
@@ -88,8 +95,17 @@ class Category(models.Model):
         """
         Переопределение сохранения для валидации данных
         """
+        from django.db import transaction
+        from api.sync.models import SyncSequence
+        
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            self.sync_seq = SyncSequence.next_value(self.user_id)
+            super().save(*args, **kwargs)
+        
+        # Инвалидируем кеш аналитики пользователя
+        from api.analytics.models import AnalyticsDataVersion
+        AnalyticsDataVersion.bump(self.user_id)
     
     def delete(self, *args, **kwargs):
         """
@@ -114,31 +130,76 @@ class Category(models.Model):
             self.save()
             return
         
+        # Удаление записывается для синхронизации в api.sync (pre_delete)
         super().delete(*args, **kwargs)
+        
+        # Инвалидируем кеш аналитики пользователя
+        from api.analytics.models import AnalyticsDataVersion
+        AnalyticsDataVersion.bump(self.user_id)
+    
+    # Значения из аннотаций queryset (см. annotate_operation_stats),
+    # без них свойства выполняют отдельный запрос
+    _operation_count = None
+    _total_amount = None
     
     @property
     def operation_count(self):
         """
         Количество операций в этой категории
         """
+        if self._operation_count is not None:
+            return self._operation_count
         return self.operations.count()
     
+    @operation_count.setter
+    def operation_count(self, value):
+        self._operation_count = value
+    
     @property
     def total_amount(self):
         """
         Общая сумма операций в этой категории
         """
+        if self._total_amount is not None:
+            return self._total_amount
+        
         from django.db.models import Sum
         result = self.operations.aggregate(
             total=Sum('amount')
         )['total'] or 0
         return result
     
+    @total_amount.setter
+    def total_amount(self, value):
+        self._total_amount = value
+    
+    @staticmethod
+    def annotate_operation_stats(queryset):
+        """
+        Количество и сумма операций категорий в том же запросе, что и список:
+        заполняет operation_count и total_amount и позволяет сортировать по ним в SQL
+        """
+        from decimal import Decimal
+        from django.db.models import Count, Sum, Value, DecimalField
+        from django.db.models.functions import Coalesce
+        
+        return queryset.annotate(
+            operation_count=Count('operations'),
+            total_amount=Coalesce(
+                Sum('operations__amount'),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=15, decimal_places=2)
+            )
+        )
+    
     @classmethod
     def create_default_categories(cls, user):
         """
         Создание стандартных категорий для нового пользователя
         """
+        from api.sync.models import SyncSequence
+        
+        sync_seq = SyncSequence.next_value(user.pk)
         categories = []
         for category_data in DEFAULT_CATEGORIES:
             category = cls(
@@ -148,8 +209,12 @@ class Category(models.Model):
                 color=category_data['color'],
                 category_type=category_data['category_type'],
                 is_default=True,
-                is_active=True
+                is_active=True,
+                sync_seq=sync_seq
             )
+            # У новой категории нет операций
+            category.operation_count = 0
+            category.total_amount = 0
             categories.append(category)
         
         cls.objects.bulk_create(categories)
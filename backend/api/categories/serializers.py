@@ -2,6 +2,8 @@
 from rest_framework import serializers
 from django.db import transaction
 from .models import Category, CategoryMerge
+from api.analytics.models import DailyOperationSummary
+from api.sync.models import SyncSequence
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -206,7 +208,14 @@ class CategoryMergeSerializer(serializers.ModelSerializer):
             
             # Переносим операции
             operation_count = from_category.operations.count()
-            from_category.operations.update(category=to_category)
+            DailyOperationSummary.move_queryset(
+                from_category.operations.all(),
+                category_id=to_category.id
+            )
+            from_category.operations.update(
+                category=to_category,
+                sync_seq=SyncSequence.next_value(from_category.user_id)
+            )
             
             # Создаем запись о слиянии
             validated_data['operation_count'] = operation_count
@@ -280,6 +289,7 @@ class CategoryBulkCreateSerializer(serializers.Serializer):
         user = request.user if request else None
         
         categories_data = validated_data['categories']
+        sync_seq = SyncSequence.next_value(user.id)
         categories = []
         
         for category_data in categories_data:
@@ -291,7 +301,8 @@ class CategoryBulkCreateSerializer(serializers.Serializer):
                 category_type=category_data['category_type'],
                 description=category_data.get('description', ''),
                 is_default=False,
-                is_active=True
+                is_active=True,
+                sync_seq=sync_seq
             )
             categories.append(category)
         
@@ -19,6 +19,8 @@ from .serializers import (
     CategoryBulkCreateSerializer
 )
 from .filters import CategoryFilter
+from api.analytics.models import DailyOperationSummary
+from api.sync.models import SyncSequence
 
 
 class CategoryListView(generics.ListAPIView):
@@ -29,15 +31,18 @@ class CategoryListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_class = CategoryFilter
-    ordering_fields = ['name', 'operation_count', 'created_at']
+    ordering_fields = ['name', 'operation_count', 'total_amount', 'created_at']
     ordering = ['category_type', 'name']
     search_fields = ['name', 'description']
     
     def get_queryset(self):
         """
         Возвращает категории только текущего пользователя
+        со статистикой операций
         """
-        return Category.objects.filter(user=self.request.user, is_active=True)
+        return Category.annotate_operation_stats(
+            Category.objects.filter(user=self.request.user, is_active=True)
+        )
 
 
 class CategoryDetailView(generics.RetrieveAPIView):
@@ -130,7 +135,7 @@ class CategoryDeleteView(generics.DestroyAPIView):
                 
                 if delete_operations:
                     # Удаляем все операции категории
-                    category.operations.all().delete()
+                    Operation.bulk_delete(category.operations.all())
                     category.delete()
                     return Response(
                         {'message': f'Категория и {operation_count} операций успешно удалены'}, 
@@ -145,7 +150,14 @@ class CategoryDeleteView(generics.DestroyAPIView):
                     )
                     
                     # Обновляем операции
-                    Operation.objects.filter(category=category).update(category=merge_with_category)
+                    DailyOperationSummary.move_queryset(
+                        Operation.objects.filter(category=category),
+                        category_id=merge_with_category.id
+                    )
+                    Operation.objects.filter(category=category).update(
+                        category=merge_with_category,
+                        sync_seq=SyncSequence.next_value(category.user_id)
+                    )
                     
                     # Создаем запись о слиянии
                     CategoryMerge.objects.create(
@@ -212,10 +224,12 @@ class CategoryByTypeView(generics.ListAPIView):
         if category_type not in ['income', 'expense']:
             return Category.objects.none()
         
-        return Category.objects.filter(
-            user=self.request.user, 
-            category_type=category_type,
-            is_active=True
+        return Category.annotate_operation_stats(
+            Category.objects.filter(
+                user=self.request.user, 
+                category_type=category_type,
+                is_active=True
+            )
         )
 
 
@@ -255,8 +269,11 @@ class CategoryDefaultListView(generics.ListAPIView):
     def get_queryset(self):
         """
         Возвращает системные категории для текущего пользователя
+        со статистикой операций
         """
-        return Category.objects.filter(user=self.request.user, is_default=True, is_active=True)
+        return Category.annotate_operation_stats(
+            Category.objects.filter(user=self.request.user, is_default=True, is_active=True)
+        )
 
 
 @api_view(['POST'])
@@ -0,0 +1,85 @@
+# evercoin/backend/api/core/renderers.py
+from decimal import Decimal
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack необязателен
+    msgpack = None
+
+# Кодировщик DRF для остальных типов (даты, ленивые строки, queryset и т.д.)
+_drf_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    """
+    Кодирование типов, которые orjson и msgpack не поддерживают:
+    Decimal - строкой без потери точности (как DecimalField сериализаторов),
+    остальное - так же, как стандартный JSONRenderer
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    return _drf_encoder.default(obj)
+
+
+class DecimalJSONEncoder(JSONEncoder):
+    """
+    Кодировщик DRF с Decimal строкой: ответ без orjson совпадает с ответом orjson
+    """
+    
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON через orjson: сериализация в C без промежуточной строки Python.
+    Decimal и даты кодируются так же, как в сериализаторах DRF.
+    Без установленного orjson работает как стандартный JSONRenderer
+    """
+    encoder_class = DecimalJSONEncoder
+    
+    # Ключи-числа (ошибки массовых операций по индексу) и даты в формате DRF
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if data is None:
+            return b''
+        
+        options = self.options
+        # orjson поддерживает только отступ в 2 пробела
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        
+        ret = orjson.dumps(data, default=encode_default, option=options)
+        
+        # Как и JSONRenderer, экранируем \u2028 и \u2029 для совместимости с JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Ответ в MessagePack (Accept: application/msgpack) для мобильных клиентов
+    и массовой выгрузки. Подключается в настройках, если установлен msgpack
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
@@ -6,3 +6,17 @@ class OperationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api.operations'
     verbose_name = 'Финансовые операции'
+    
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        
+        post_migrate.connect(create_search_index, sender=self)
+
+
+def create_search_index(sender, using='default', **kwargs):
+    """
+    Создание полнотекстового индекса операций после migrate
+    """
+    from .search import setup_search_index
+    
+    setup_search_index(using=using)
@@ -0,0 +1,102 @@
+# evercoin/backend/api/operations/export.py
+import csv
+import io
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Колонки выгрузки: имя в файле -> поле для values_list
+EXPORT_FIELDS = [
+    ('id', 'id'),
+    ('operation_date', 'operation_date'),
+    ('operation_type', 'operation_type'),
+    ('title', 'title'),
+    ('amount', 'amount'),
+    ('description', 'description'),
+    ('wallet', 'wallet__name'),
+    ('currency', 'wallet__currency'),
+    ('category', 'category__name'),
+    ('transfer_to_wallet', 'transfer_to_wallet__name'),
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Количество строк, читаемых из базы и отдаваемых клиенту за раз
+EXPORT_CHUNK_SIZE = 2000
+
+
+def get_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Построчное чтение операций серверным курсором без создания моделей
+    """
+    return queryset.values_list(
+        *(field for _, field in EXPORT_FIELDS)
+    ).order_by('-operation_date', '-id').iterator(chunk_size=chunk_size)
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    CSV с заголовком, по одному куску текста на пачку строк
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for batch in _batched(rows, chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    JSON Lines: один объект операции на строку
+    """
+    names = [name for name, _ in EXPORT_FIELDS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    for batch in _batched(rows, chunk_size):
+        yield ''.join(encoder.encode(dict(zip(names, row))) + '\n' for row in batch)
+
+
+def iter_gzip(chunks):
+    """
+    Сжатие потока gzip на лету
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_operations(queryset, export_format, compress=False):
+    """
+    Генератор содержимого файла выгрузки
+    """
+    rows = get_export_rows(queryset)
+    chunks = iter_csv(rows) if export_format == 'csv' else iter_jsonl(rows)
+
+    if compress:
+        return iter_gzip(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
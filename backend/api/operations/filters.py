@@ -1,6 +1,6 @@
 # evercoin/backend/api/operations/filters.py
 import django_filters
-from django.db import models
+from rest_framework.filters import OrderingFilter
 from .models import Operation
 
 
@@ -10,15 +10,13 @@ class OperationFilter(django_filters.FilterSet):
     """
     
     date_from = django_filters.DateFilter(
-        field_name='operation_date', 
-        lookup_expr='gte',
+        method='filter_date_from',
         label='Дата от'
     )
     
     date_to = django_filters.DateFilter(
-        field_name='operation_date', 
-        lookup_expr='lte',
-        label='Дата до'
+        method='filter_date_to',
+        label='Дата до (включительно)'
     )
     
     amount_min = django_filters.NumberFilter(
@@ -66,11 +64,35 @@ class OperationFilter(django_filters.FilterSet):
             'search'
         ]
     
+    def filter_date_from(self, queryset, name, value):
+        """
+        Операции начиная с начала дня value
+        """
+        return queryset.filter(**Operation.get_date_range_lookup(start_date=value))
+    
+    def filter_date_to(self, queryset, name, value):
+        """
+        Операции до конца дня value включительно
+        """
+        return queryset.filter(**Operation.get_date_range_lookup(end_date=value))
+    
     def filter_search(self, queryset, name, value):
         """
-        Поиск по названию и описанию операции
+        Полнотекстовый поиск по названию и описанию операции
+        (префиксное совпадение слов, сортировка по релевантности)
         """
-        return queryset.filter(
-            models.Q(title__icontains=value) |
-            models.Q(description__icontains=value)
-        )
+        from .search import search_operations
+        
+        return search_operations(queryset, value)
+
+
+class OperationOrderingFilter(OrderingFilter):
+    """
+    Сортировка списка операций: при поиске без явного ordering
+    сохраняется сортировка по релевантности
+    """
+    
+    def get_default_ordering(self, view):
+        if view.request.query_params.get('search'):
+            return None
+        return super().get_default_ordering(view)
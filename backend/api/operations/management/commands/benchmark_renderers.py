@@ -0,0 +1,89 @@
+# evercoin/backend/api/operations/management/commands/benchmark_renderers.py
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from api.operations.serializers import OperationValuesSerializer
+
+
+class Command(BaseCommand):
+    """
+    Сравнение времени рендеринга страницы журнала операций:
+    стандартный JSONRenderer, orjson и MessagePack (если установлены)
+    """
+    help = 'Замеряет время рендеринга страницы списка операций разными рендерерами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Количество операций на странице')
+        parser.add_argument('--repeat', type=int, default=50, help='Количество повторов для замера времени')
+
+    def handle(self, *args, **options):
+        page = self.build_page(options['rows'])
+
+        renderers = [('JSONRenderer', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('ORJSONRenderer', ORJSONRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('orjson не установлен, ORJSONRenderer не замеряется'))
+        if msgpack is not None:
+            renderers.append(('MessagePackRenderer', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack не установлен, MessagePackRenderer не замеряется'))
+
+        baseline = None
+        for title, renderer in renderers:
+            elapsed, size = self.measure(renderer, page, options['repeat'])
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f'{title:<20} {elapsed:8.3f} мс  {size / 1024:8.1f} КБ  x{baseline / elapsed:.1f}'
+            )
+
+    def build_page(self, rows):
+        """
+        Страница списка операций в формате OperationListView
+        (поля по умолчанию, вложенные счет и категория)
+        """
+        serializer = OperationValuesSerializer()
+        now = timezone.now()
+        values = [
+            {
+                'id': index,
+                'title': f'Операция {index}',
+                'amount': Decimal(f'{index % 5000}.{index % 100:02d}'),
+                'operation_type': 'expense' if index % 3 else 'income',
+                'operation_date': now - timedelta(minutes=index * 37),
+                'wallet_id': 1 + index % 3,
+                'wallet__name': 'Основной счет',
+                'wallet__balance': Decimal('125000.50'),
+                'wallet__currency': 'RUB',
+                'wallet__icon': 'wallet',
+                'wallet__color': '#3B82F6',
+                'category_id': 1 + index % 12,
+                'category__name': 'Продукты',
+                'category__icon': 'shopping',
+                'category__color': '#4ECDC4',
+                'category__category_type': 'expense',
+            }
+            for index in range(rows)
+        ]
+        return {
+            'count': rows,
+            'next': None,
+            'previous': None,
+            'results': serializer.to_representation(values),
+        }
+
+    def measure(self, renderer, data, repeat):
+        """
+        Среднее время рендеринга (мс) и размер ответа (байты)
+        """
+        content = renderer.render(data)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            renderer.render(data)
+        return (time.perf_counter() - started) * 1000 / repeat, len(content)
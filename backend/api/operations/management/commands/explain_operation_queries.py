@@ -0,0 +1,73 @@
+# evercoin/backend/api/operations/management/commands/explain_operation_queries.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from api.operations.models import Operation
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Сравнение планов и времени запросов операций по периоду:
+    прежняя форма operation_date__date__range и полуоткрытый диапазон datetime
+    """
+    help = 'Выводит EXPLAIN и время типовых запросов операций до и после переписывания фильтра дат'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='ID пользователя (по умолчанию первый с операциями)')
+        parser.add_argument('--days', type=int, default=30, help='Длина периода в днях')
+        parser.add_argument('--repeat', type=int, default=20, help='Количество повторов для замера времени')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user_id'])
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=options['days'])
+
+        sample = Operation.objects.filter(user=user).values('wallet_id', 'category_id').first() or {}
+        patterns = [
+            ('Период', {}),
+            ('Тип + период', {'operation_type': 'expense'}),
+            ('Счет + период', {'wallet_id': sample.get('wallet_id')}),
+            ('Категория + период', {'category_id': sample.get('category_id')}),
+        ]
+
+        for title, filters in patterns:
+            base = Operation.objects.filter(user=user, **filters)
+            before = base.filter(operation_date__date__range=[start_date, end_date])
+            after = base.filter(**Operation.get_date_range_lookup(start_date, end_date))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            for label, queryset in (('до', before), ('после', after)):
+                self.stdout.write(f'  [{label}] {self.measure(queryset, options["repeat"]):.3f} мс')
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f'      {line}')
+
+    def get_user(self, user_id):
+        """
+        Пользователь для замеров
+        """
+        users = User.objects.all()
+        if user_id:
+            users = users.filter(pk=user_id)
+        else:
+            users = users.filter(operations__isnull=False).distinct()
+
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('Не найден пользователь с операциями')
+        return user
+
+    @staticmethod
+    def measure(queryset, repeat):
+        """
+        Среднее время выполнения запроса в миллисекундах
+        """
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.values_list('id', 'amount'))
+        return (time.perf_counter() - started) * 1000 / repeat
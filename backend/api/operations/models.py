@@ -3,10 +3,14 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from api.core.constants.currencies import CURRENCIES
+from decimal import Decimal
+from types import SimpleNamespace
 
 User = get_user_model()
 
+# Количество id в одном IN при массовом удалении и изменении операций
+BULK_CHUNK_SIZE = 500
+
 
 class Operation(models.Model):
     """
@@ -81,6 +85,23 @@ class Operation(models.Model):
         verbose_name='Счет назначения (для переводов)'
     )
     
+    # Перевод, к которому относится операция: связывает исходящую
+    # и входящую операции одного перевода
+    transfer = models.ForeignKey(
+        'wallets.WalletTransfer',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='operations',
+        verbose_name='Перевод между счетами'
+    )
+    
+    # Номер последнего изменения для дельта-синхронизации
+    sync_seq = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер изменения'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -88,106 +109,381 @@ class Operation(models.Model):
         verbose_name = 'Операция'
         verbose_name_plural = 'Операции'
         ordering = ['-operation_date', '-created_at']
+        # Составные индексы под фильтры списка операций и аналитики:
+        # пользователь + условие равенства + диапазон дат
+        # (отдельные индексы счета и категории создает ForeignKey)
         indexes = [
             models.Index(fields=['user', 'operation_date']),
-            models.Index(fields=['operation_type']),
-            models.Index(fields=['wallet']),
-            models.Index(fields=['category']),
+            models.Index(fields=['user', 'operation_type', 'operation_date']),
+            models.Index(fields=['user', 'wallet', 'operation_date']),
+            models.Index(fields=['user', 'category', 'operation_date']),
+            models.Index(fields=['user', 'sync_seq']),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.amount} ({self.operation_type})"
     
+    # Поля, влияющие на балансы и аналитику: их значения из базы
+    # запоминаются при загрузке и после сохранения
+    TRACKED_FIELDS = (
+        'user_id', 'wallet_id', 'category_id', 'transfer_to_wallet_id',
+        'operation_type', 'operation_date', 'amount',
+    )
+    
+    # Поля массового изменения: не влияющие на сводку и балансы,
+    # и влияющие на балансы и счетчики счетов
+    BULK_PLAIN_FIELDS = {'title', 'description', 'updated_at', 'sync_seq'}
+    BULK_BALANCE_FIELDS = {'amount', 'operation_type', 'wallet_id'}
+    
+    @staticmethod
+    def get_date_range_lookup(start_date=None, end_date=None):
+        """
+        Условия фильтра по дням [start_date, end_date] в виде полуоткрытого
+        диапазона datetime в текущем часовом поясе. В отличие от
+        operation_date__date__range не оборачивает колонку в date()
+        и позволяет использовать индексы по operation_date
+        """
+        from datetime import datetime, time, timedelta
+        
+        lookup = {}
+        if start_date is not None:
+            lookup['operation_date__gte'] = timezone.make_aware(datetime.combine(start_date, time.min))
+        if end_date is not None:
+            lookup['operation_date__lt'] = timezone.make_aware(
+                datetime.combine(end_date + timedelta(days=1), time.min)
+            )
+        return lookup
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Загрузка из базы с запоминанием исходного состояния операции
+        """
+        instance = super().from_db(db, field_names, values)
+        if all(field in instance.__dict__ for field in cls.TRACKED_FIELDS):
+            instance._snapshot = instance._make_snapshot()
+        return instance
+    
+    def refresh_from_db(self, *args, **kwargs):
+        """
+        Перечитывание из базы с обновлением снимка
+        """
+        super().refresh_from_db(*args, **kwargs)
+        if all(field in self.__dict__ for field in self.TRACKED_FIELDS):
+            self._snapshot = self._make_snapshot()
+    
+    def _make_snapshot(self):
+        """
+        Снимок отслеживаемых полей операции
+        """
+        return SimpleNamespace(**{field: getattr(self, field) for field in self.TRACKED_FIELDS})
+    
+    def _get_old_operation(self):
+        """
+        Состояние операции в базе до сохранения: снимок из памяти,
+        а для экземпляров без снимка - чтение из базы
+        """
+        if not self.pk:
+            return None
+        
+        snapshot = getattr(self, '_snapshot', None)
+        if snapshot is not None and not self._state.adding:
+            return snapshot
+        
+        values = Operation.objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first()
+        return SimpleNamespace(**values) if values else None
+    
     def save(self, *args, **kwargs):
         """
         Переопределение сохранения для обновления баланса счета
         """
         from django.db import transaction
+        from api.sync.models import SyncSequence
+        
+        # Новый перевод создается парой операций через запись перевода
+        if self._state.adding and self.operation_type == 'transfer' and self.transfer_to_wallet_id and not self.transfer_id:
+            return self._create_transfer()
         
         with transaction.atomic():
-            # Получаем старую операцию для сравнения
-            old_operation = None
-            if self.pk:
-                try:
-                    old_operation = Operation.objects.get(pk=self.pk)
-                except Operation.DoesNotExist:
-                    pass
+            # Старое состояние берем из снимка, без повторного чтения
+            old_operation = self._get_old_operation()
             
-            # Сохраняем операцию
+            # Сохраняем операцию с новым номером изменения
+            self.sync_seq = SyncSequence.next_value(self.user_id)
             super().save(*args, **kwargs)
             
             # Обновляем баланс счета
             self._update_wallet_balance(old_operation)
+            
+            # Обновляем дневную сводку и версию данных аналитики
+            self._update_analytics_data(old_operation)
+            
+            self._snapshot = self._make_snapshot()
     
     def delete(self, *args, **kwargs):
         """
         Переопределение удаления для обновления баланса счета
         """
         from django.db import transaction
+        from api.sync.models import SyncTombstone
+        
+        # Операции перевода удаляются только парой
+        if self.transfer_id:
+            return self.transfer.delete()
         
         with transaction.atomic():
-            # Сохраняем данные для обновления баланса
-            wallet = self.wallet
-            amount = self.amount
-            operation_type = self.operation_type
+            old_operation = self._get_old_operation() or self._make_snapshot()
+            
+            # Запоминаем удаление для синхронизации
+            SyncTombstone.record('operation', [(self.pk, old_operation.user_id)])
+            
+            # Вычитаем операцию из дневной сводки аналитики
+            self._update_analytics_data(old_operation=old_operation, deleted=True)
             
             # Удаляем операцию
-            super().delete(*args, **kwargs)
+            result = super().delete(*args, **kwargs)
             
-            # Обновляем баланс счета
-            if operation_type == 'income':
-                wallet.balance -= amount
-            elif operation_type == 'expense':
-                wallet.balance += amount
-            # Для переводов баланс уже обновлен в операции назначения
+            # Откатываем операцию в балансе и счетчиках счета
+            self._apply_wallet_deltas(self.get_wallet_deltas(old_operation, sign=-1))
+            
+            self._snapshot = None
+            return result
+    
+    @staticmethod
+    def get_wallet_deltas(operation, sign=1, count=1):
+        """
+        Изменения баланса и счетчиков счета от операции (или группы из count
+        операций одного типа с суммой amount): {wallet_id: {поле: изменение}}.
+        sign=-1 дает изменения для отката операции
+        """
+        amount = sign * Decimal(str(operation.amount))
+        fields = {'operation_count': sign * count}
+        if operation.operation_type == 'income':
+            fields.update(balance=amount, income_total=amount)
+        elif operation.operation_type == 'expense':
+            fields.update(balance=-amount, expense_total=amount)
+        else:
+            # Исходящий перевод списывает средства со счета отправителя
+            fields.update(balance=-amount)
+        return {operation.wallet_id: fields}
+    
+    @classmethod
+    def bulk_delete(cls, queryset, ids=None, chunk_size=BULK_CHUNK_SIZE, delete_transfers=True):
+        """
+        Массовое удаление операций с корректными балансами без вызова delete()
+        для каждой операции. Операции удаляются пачками по chunk_size id:
+        на пачку один групповой запрос (он же вычитает пачку из дневной сводки)
+        и один DELETE, затем один UPDATE балансов всех счетов. Вместе
+        с операцией перевода удаляются вторая операция и запись перевода
+        (delete_transfers=False - запись удаляет вызывающий, WalletTransfer.delete).
+        Возвращает количество удаленных операций
+        """
+        from django.db import transaction
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+        from api.sync.models import SyncTombstone
+        from api.wallets.models import Wallet, WalletTransfer
+        
+        if ids is None:
+            ids = list(queryset.values_list('id', flat=True))
+        ids = list(dict.fromkeys(ids))
+        
+        wallet_deltas = {}
+        operation_counts = {}
+        deleted_rows = []
+        transfer_ids = set()
+        deleted_count = 0
+        
+        with transaction.atomic():
+            batches = [(queryset, ids)]
+            while batches:
+                source, batch_ids = batches.pop()
+                pair_ids = []
+                
+                for start in range(0, len(batch_ids), chunk_size):
+                    chunk = source.filter(id__in=batch_ids[start:start + chunk_size])
+                    rows = list(chunk.values_list('id', 'user_id', 'transfer_id'))
+                    deleted_rows.extend((operation_id, user_id) for operation_id, user_id, _ in rows)
+                    chunk_transfer_ids = {transfer_id for _, _, transfer_id in rows if transfer_id} - transfer_ids
+                    transfer_ids.update(chunk_transfer_ids)
+                    
+                    groups = DailyOperationSummary.apply_queryset(chunk, sign=-1)
+                    for (user_id, wallet_id, _, operation_type, _), total, count in groups:
+                        snapshot = SimpleNamespace(wallet_id=wallet_id, operation_type=operation_type, amount=total)
+                        Wallet.add_deltas(wallet_deltas, cls.get_wallet_deltas(snapshot, sign=-1, count=count))
+                        operation_counts[user_id] = operation_counts.get(user_id, 0) + count
+                    
+                    _, deleted_by_model = chunk.delete()
+                    deleted_count += deleted_by_model.get(cls._meta.label, 0)
+                    
+                    # Вторые операции удаленных переводов
+                    if chunk_transfer_ids:
+                        pair_ids.extend(
+                            cls.objects.filter(transfer_id__in=chunk_transfer_ids).values_list('id', flat=True)
+                        )
+                
+                if pair_ids:
+                    batches.append((cls.objects.all(), pair_ids))
+            
+            if delete_transfers:
+                transfer_ids = list(transfer_ids)
+                for start in range(0, len(transfer_ids), chunk_size):
+                    WalletTransfer.objects.filter(pk__in=transfer_ids[start:start + chunk_size]).delete()
+            
+            # Номера изменений выдаются до обновления балансов:
+            # счета получают тот же номер, что и записи об удалении
+            SyncTombstone.record('operation', deleted_rows)
+            Wallet.apply_deltas(wallet_deltas)
+            for user_id, count in operation_counts.items():
+                AnalyticsDataVersion.bump(user_id, operation_delta=-count)
+        
+        return deleted_count
+    
+    @classmethod
+    def bulk_patch(cls, queryset, changes, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Массовое изменение операций без save() для каждой операции.
+        Название и комментарий меняются одним UPDATE. При изменении категории,
+        даты, суммы, типа или счета операции обрабатываются пачками id:
+        пачка вычитается из дневной сводки, обновляется одним UPDATE и
+        добавляется обратно, а изменения балансов суммируются по счетам
+        и применяются одним UPDATE на счет. Возвращает количество операций
+        """
+        from django.core.exceptions import ValidationError
+        from django.db import transaction
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+        from api.sync.models import SyncSequence
+        from api.wallets.models import Wallet
+        
+        changes = dict(
+            changes,
+            updated_at=timezone.now(),
+            sync_seq=SyncSequence.current_value_expression()
+        )
+        
+        with transaction.atomic():
+            rows = list(queryset.values_list('id', 'user_id'))
+            user_ids = {user_id for _, user_id in rows}
+            
+            # Один номер изменения на пользователя для всех его операций
+            for user_id in user_ids:
+                SyncSequence.next_value(user_id)
+            
+            if set(changes) <= cls.BULK_PLAIN_FIELDS:
+                updated_count = queryset.update(**changes)
+            else:
+                ids = [operation_id for operation_id, _ in rows]
+                affects_wallets = bool(set(changes) & cls.BULK_BALANCE_FIELDS)
+                wallet_deltas = {}
+                updated_count = 0
+                
+                for start in range(0, len(ids), chunk_size):
+                    chunk = cls.objects.filter(id__in=ids[start:start + chunk_size])
+                    
+                    old_groups = DailyOperationSummary.apply_queryset(chunk, sign=-1)
+                    updated_count += chunk.update(**changes)
+                    new_groups = DailyOperationSummary.apply_queryset(chunk, sign=1)
+                    
+                    for groups, sign in ((old_groups, -1), (new_groups, 1)):
+                        for (user_id, wallet_id, _, operation_type, _), total, count in groups:
+                            if not affects_wallets:
+                                continue
+                            snapshot = SimpleNamespace(wallet_id=wallet_id, operation_type=operation_type, amount=total)
+                            Wallet.add_deltas(wallet_deltas, cls.get_wallet_deltas(snapshot, sign=sign, count=count))
+                
+                Wallet.apply_deltas(wallet_deltas)
+                
+                # Счета, с которых списали средства, не должны уйти в минус
+                decreased_wallet_ids = [
+                    wallet_id for wallet_id, fields in wallet_deltas.items() if fields.get('balance', 0) < 0
+                ]
+                if Wallet.objects.filter(pk__in=decreased_wallet_ids, balance__lt=0).exists():
+                    raise ValidationError({'amount': 'На счету недостаточно средств'})
             
-            wallet.save()
+            for user_id in user_ids:
+                AnalyticsDataVersion.bump(user_id)
+        
+        return updated_count
+    
+    def _apply_wallet_deltas(self, deltas):
+        """
+        Атомарное изменение балансов и счетчиков в базе
+        и синхронизация загруженного счета
+        """
+        from api.wallets.models import Wallet
+        
+        Wallet.apply_deltas(deltas)
+        self._sync_cached_wallets(deltas)
+    
+    def _sync_cached_wallets(self, deltas):
+        """
+        Перенос изменений балансов и счетчиков на загруженные счета операции
+        """
+        for field_name in ('wallet', 'transfer_to_wallet'):
+            wallet = self._state.fields_cache.get(field_name)
+            if wallet is None or wallet.pk not in deltas:
+                continue
+            for field, delta in deltas[wallet.pk].items():
+                value = getattr(wallet, field)
+                if field != 'operation_count':
+                    value = Decimal(str(value))
+                setattr(wallet, field, value + delta)
     
     def _update_wallet_balance(self, old_operation=None):
         """
-        Внутренний метод для обновления баланса счета
+        Внутренний метод для обновления баланса и счетчиков счета: откат старого
+        состояния и применение нового одним UPDATE на каждый затронутый счет
         """
-        wallet = self.wallet
+        from api.wallets.models import Wallet
         
+        deltas = {}
         if old_operation:
-            # Откатываем старую операцию
-            old_amount = old_operation.amount
-            old_type = old_operation.operation_type
-            
-            if old_type == 'income':
-                wallet.balance -= old_amount
-            elif old_type == 'expense':
-                wallet.balance += old_amount
-        
-        # Применяем новую операцию
-        if self.operation_type == 'income':
-            wallet.balance += self.amount
-        elif self.operation_type == 'expense':
-            wallet.balance -= self.amount
-        
-        wallet.save()
-        
-        # Для переводов создаем вторую операцию
-        if self.operation_type == 'transfer' and self.transfer_to_wallet:
-            self._create_transfer_operation()
-    
-    def _create_transfer_operation(self):
-        """
-        Создание парной операции для перевода между счетами
-        """
-        # Проверяем, не создана ли уже парная операция
-        if not hasattr(self, 'paired_transfer'):
-            Operation.objects.create(
-                user=self.user,
-                title=f"Перевод: {self.title}",
-                amount=self.amount,
-                description=self.description,
-                operation_type='income',  # Для счета назначения это доход
-                operation_date=self.operation_date,
-                wallet=self.transfer_to_wallet,
-                category=None,
-                transfer_to_wallet=None  # Избегаем рекурсии
-            )
+            Wallet.add_deltas(deltas, self.get_wallet_deltas(old_operation, sign=-1))
+        Wallet.add_deltas(deltas, self.get_wallet_deltas(self))
+        
+        self._apply_wallet_deltas(deltas)
+    
+    def _update_analytics_data(self, old_operation=None, deleted=False):
+        """
+        Внутренний метод для обновления дневной сводки аналитики
+        и инвалидации кеша аналитики пользователя
+        """
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+        
+        DailyOperationSummary.apply_operation_change(
+            old_operation=old_operation,
+            new_operation=None if deleted else self
+        )
+        
+        if deleted:
+            operation_delta = -1
+        else:
+            operation_delta = 0 if old_operation else 1
+        AnalyticsDataVersion.bump(self.user_id, operation_delta=operation_delta)
+    
+    def _create_transfer(self):
+        """
+        Создание записи перевода для новой операции перевода, созданной
+        напрямую (а не через WalletTransfer): операция становится исходящей
+        операцией пары, доход на счете получателя создает WalletTransfer
+        """
+        from api.wallets.models import Wallet, WalletTransfer
+        
+        transfer = WalletTransfer(
+            user_id=self.user_id,
+            from_wallet=self.wallet,
+            to_wallet=self.transfer_to_wallet,
+            amount=self.amount,
+            description=self.description,
+            transfer_date=self.operation_date
+        )
+        transfer.save(outgoing_operation=self)
+        
+        # Исходящая операция и доход на счете получателя
+        incoming = SimpleNamespace(wallet_id=self.transfer_to_wallet_id, operation_type='income', amount=self.amount)
+        deltas = self.get_wallet_deltas(self)
+        Wallet.add_deltas(deltas, self.get_wallet_deltas(incoming))
+        self._sync_cached_wallets(deltas)
+        self._snapshot = self._make_snapshot()
     
     def clean(self):
         """
@@ -0,0 +1,142 @@
+# evercoin/backend/api/operations/search.py
+import re
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+from .models import Operation
+
+OPERATION_TABLE = Operation._meta.db_table
+
+# Полнотекстовый индекс SQLite (FTS5 с внешним содержимым, синхронизируется триггерами)
+SQLITE_FTS_TABLE = f'{OPERATION_TABLE}_fts'
+
+SQLITE_SETUP_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, description,
+        content='{OPERATION_TABLE}', content_rowid='id',
+        tokenize='unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON {OPERATION_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON {OPERATION_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF title, description ON {OPERATION_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+# Заполнение индекса уже существующими операциями, только при создании таблицы
+SQLITE_REBUILD_SQL = f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+
+# Конфигурация словаря PostgreSQL: без стемминга, как unicode61 в SQLite
+POSTGRES_SEARCH_CONFIG = 'simple'
+
+# Выражение индекса совпадает с SQL, который строит SearchVector('title', 'description'),
+# иначе планировщик не использует GIN-индекс
+POSTGRES_SETUP_SQL = [
+    f"""
+    CREATE INDEX IF NOT EXISTS {OPERATION_TABLE}_search_gin ON {OPERATION_TABLE}
+    USING gin ((to_tsvector('{POSTGRES_SEARCH_CONFIG}'::regconfig,
+        COALESCE(title, '') || ' ' || COALESCE(description, ''))))
+    """,
+]
+
+
+def get_search_terms(text):
+    """
+    Слова поискового запроса в нижнем регистре
+    """
+    return re.findall(r'\w+', text.lower())
+
+
+def setup_search_index(using='default'):
+    """
+    Создание полнотекстового индекса для текущей базы данных.
+    Миграции в репозиторий не входят, поэтому индекс создается
+    после migrate (сигнал post_migrate) и идемпотентен
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        statements = SQLITE_SETUP_SQL
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_SETUP_SQL
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        created = (
+            connection.vendor == 'sqlite'
+            and SQLITE_FTS_TABLE not in connection.introspection.table_names(cursor)
+        )
+        for statement in statements:
+            cursor.execute(statement)
+        # Полная переиндексация нужна только новой таблице,
+        # дальше индекс поддерживается триггерами
+        if created:
+            cursor.execute(SQLITE_REBUILD_SQL)
+
+
+def search_operations(queryset, text):
+    """
+    Поиск операций по названию и комментарию с префиксным совпадением слов.
+    Добавляет аннотацию search_rank (больше - релевантнее) и сортирует по ней.
+    На базах без полнотекстового индекса используется icontains
+    """
+    terms = get_search_terms(text)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # bm25 возвращает отрицательные значения, лучшие совпадения - минимальные
+        rank = RawSQL(
+            f"SELECT -bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND {SQLITE_FTS_TABLE}.rowid = {OPERATION_TABLE}.id",
+            (match,),
+            output_field=models.FloatField()
+        )
+        matched_ids = RawSQL(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s",
+            (match,)
+        )
+        return queryset.filter(id__in=matched_ids).annotate(
+            search_rank=rank
+        ).order_by('-search_rank', '-operation_date')
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector('title', 'description', config=POSTGRES_SEARCH_CONFIG)
+        query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=POSTGRES_SEARCH_CONFIG
+        )
+        return queryset.alias(search_document=vector).filter(
+            search_document=query
+        ).annotate(
+            search_rank=SearchRank(vector, query)
+        ).order_by('-search_rank', '-operation_date')
+
+    query = models.Q()
+    for term in terms:
+        query &= models.Q(title__icontains=term) | models.Q(description__icontains=term)
+    return queryset.filter(query)
@@ -1,7 +1,11 @@
 # evercoin/backend/api/operations/serializers.py
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from decimal import Decimal
 from .models import Operation
-from api.wallets.models import Wallet
+from api.wallets.models import Wallet, WalletTransfer
 from api.categories.models import Category
 
 
@@ -29,9 +33,10 @@ class OperationSerializer(serializers.ModelSerializer):
             'category',
             'category_data',
             'transfer_to_wallet',
-            'transfer_to_wallet_data'
+            'transfer_to_wallet_data',
+            'transfer'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'user']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'user', 'transfer']
     
     def get_wallet_data(self, obj):
         """
@@ -104,11 +109,34 @@ class OperationSerializer(serializers.ModelSerializer):
             if wallet == transfer_to_wallet:
                 raise serializers.ValidationError({'transfer_to_wallet': 'Нельзя переводить на тот же счет'})
         
-        # Проверка баланса для расходов
-        if (data.get('operation_type') == 'expense' and 
-            wallet and 
-            data.get('amount') > wallet.balance):
-            raise serializers.ValidationError({'amount': 'На счету недостаточно средств'})
+        # Проверка баланса для расходов и переводов. При частичном изменении
+        # недостающие поля берутся из операции, ее текущее списание со счета
+        # возвращается в доступный остаток
+        operation_type = data.get('operation_type', getattr(self.instance, 'operation_type', None))
+        amount = data.get('amount', getattr(self.instance, 'amount', None))
+        if self.instance is not None and 'wallet' not in data:
+            wallet = self.instance.wallet
+        if operation_type in ('expense', 'transfer') and wallet and amount is not None:
+            available = wallet.balance
+            if (self.instance is not None
+                    and self.instance.operation_type != 'income'
+                    and self.instance.wallet_id == wallet.pk):
+                available += self.instance.amount
+            if amount > available:
+                raise serializers.ValidationError({'amount': 'На счету недостаточно средств'})
+        
+        # Операции перевода меняются только вместе с переводом
+        if self.instance is not None and self.instance.transfer_id:
+            pair_fields = ('amount', 'operation_type', 'wallet', 'transfer_to_wallet', 'operation_date')
+            changed = [
+                field for field in pair_fields
+                if field in data and data[field] != getattr(self.instance, field)
+            ]
+            if changed:
+                raise serializers.ValidationError({
+                    field: 'Операция относится к переводу между счетами, измените перевод'
+                    for field in changed
+                })
         
         return data
 
@@ -163,3 +191,410 @@ class OperationListSerializer(OperationSerializer):
             'wallet_data',
             'category_data'
         ]
+
+
+class OperationValuesSerializer:
+    """
+    Быстрый сериализатор списка операций по строкам values(): без создания
+    моделей и полей DRF на каждую строку. Поддерживает выбор полей (fields)
+    и вложенные данные связанных объектов (expand), которые выбираются
+    тем же запросом через JOIN. Без параметров формирует тот же ответ,
+    что и OperationListSerializer
+    """
+    
+    # Поле ответа -> поле values()
+    FIELDS = {
+        'id': 'id',
+        'title': 'title',
+        'amount': 'amount',
+        'description': 'description',
+        'operation_type': 'operation_type',
+        'operation_date': 'operation_date',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'wallet': 'wallet_id',
+        'category': 'category_id',
+        'transfer_to_wallet': 'transfer_to_wallet_id',
+        'transfer': 'transfer_id',
+    }
+    
+    # Связь -> поля вложенных данных (как в OperationSerializer.get_*_data)
+    EXPANSIONS = {
+        'wallet': ['name', 'balance', 'currency', 'icon', 'color'],
+        'category': ['name', 'icon', 'color', 'category_type'],
+        'transfer_to_wallet': ['name', 'balance', 'currency', 'icon', 'color'],
+    }
+    
+    DEFAULT_FIELDS = ['id', 'title', 'amount', 'operation_type', 'operation_date']
+    DEFAULT_EXPAND = ['wallet', 'category']
+    
+    amount_field = serializers.DecimalField(max_digits=12, decimal_places=2)
+    datetime_field = serializers.DateTimeField()
+    
+    def __init__(self, fields=None, expand=None):
+        self.fields = list(self.DEFAULT_FIELDS if fields is None else fields)
+        if expand is None:
+            expand = self.DEFAULT_EXPAND if fields is None else []
+        self.expand = list(expand)
+        
+        formatters = {
+            'amount': self.amount_field.to_representation,
+            'operation_date': self.datetime_field.to_representation,
+            'created_at': self.datetime_field.to_representation,
+            'updated_at': self.datetime_field.to_representation,
+        }
+        self.formatters = [
+            (field, self.FIELDS[field], formatters.get(field))
+            for field in self.fields
+        ]
+    
+    @classmethod
+    def from_query_params(cls, query_params):
+        """
+        Сериализатор по параметрам запроса ?fields=a,b и ?expand=wallet,category.
+        Поля вида wallet_data в fields равносильны expand=wallet
+        """
+        fields = cls._get_list(query_params, 'fields')
+        expand = cls._get_list(query_params, 'expand')
+        
+        if fields is not None:
+            data_fields = [field[:-len('_data')] for field in fields if field.endswith('_data')]
+            fields = [field for field in fields if not field.endswith('_data')]
+            if data_fields:
+                expand = (expand or []) + [field for field in data_fields if field not in (expand or [])]
+            
+            unknown = [field for field in fields if field not in cls.FIELDS]
+            if unknown:
+                raise serializers.ValidationError({
+                    'fields': f'Неизвестные поля: {", ".join(unknown)}. '
+                              f'Доступны: {", ".join(cls.FIELDS)}'
+                })
+        
+        if expand is not None:
+            unknown = [name for name in expand if name not in cls.EXPANSIONS]
+            if unknown:
+                raise serializers.ValidationError({
+                    'expand': f'Неизвестные связи: {", ".join(unknown)}. '
+                              f'Доступны: {", ".join(cls.EXPANSIONS)}'
+                })
+        
+        return cls(fields=fields, expand=expand)
+    
+    @staticmethod
+    def _get_list(query_params, name):
+        """
+        Список значений параметра через запятую (None, если параметр не передан)
+        """
+        if name not in query_params:
+            return None
+        values = []
+        for value in query_params.get(name).split(','):
+            value = value.strip()
+            if value and value not in values:
+                values.append(value)
+        return values
+    
+    def get_values(self):
+        """
+        Поля для queryset.values()
+        """
+        values = [self.FIELDS[field] for field in self.fields]
+        for name in self.expand:
+            values.append(f'{name}_id')
+            values.extend(f'{name}__{field}' for field in self.EXPANSIONS[name])
+        return list(dict.fromkeys(values))
+    
+    def to_representation(self, rows):
+        """
+        Список словарей ответа по строкам values()
+        """
+        expansions = [
+            (f'{name}_data', f'{name}_id', [(field, f'{name}__{field}') for field in self.EXPANSIONS[name]])
+            for name in self.expand
+        ]
+        
+        data = []
+        for row in rows:
+            item = {}
+            for field, lookup, formatter in self.formatters:
+                value = row[lookup]
+                item[field] = formatter(value) if formatter is not None and value is not None else value
+            
+            for key, id_lookup, related_fields in expansions:
+                related_id = row[id_lookup]
+                if related_id is None:
+                    item[key] = None
+                else:
+                    related = {'id': related_id}
+                    for field, lookup in related_fields:
+                        related[field] = row[lookup]
+                    item[key] = related
+            
+            data.append(item)
+        
+        return data
+
+
+class OperationBulkItemSerializer(serializers.Serializer):
+    """
+    Сериализатор одной операции в массовом создании.
+    Счета и категории передаются ID и проверяются общим запросом
+    """
+    title = serializers.CharField(max_length=200)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    operation_type = serializers.ChoiceField(choices=Operation.OPERATION_TYPES)
+    operation_date = serializers.DateTimeField(required=False)
+    wallet = serializers.IntegerField()
+    category = serializers.IntegerField(required=False, allow_null=True)
+    transfer_to_wallet = serializers.IntegerField(required=False, allow_null=True)
+
+
+class OperationBulkCreateSerializer(serializers.Serializer):
+    """
+    Сериализатор для массового создания операций
+    """
+    MAX_OPERATIONS = 10000
+    
+    operations = OperationBulkItemSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=MAX_OPERATIONS,
+        help_text="Список операций для создания"
+    )
+    
+    def validate_operations(self, value):
+        """
+        Проверка владения счетами и категориями одним запросом на таблицу
+        и достаточности средств по итогам всего набора
+        """
+        user = self.context['request'].user
+        
+        wallet_ids = {item['wallet'] for item in value}
+        wallet_ids.update(item['transfer_to_wallet'] for item in value if item.get('transfer_to_wallet'))
+        category_ids = {item['category'] for item in value if item.get('category')}
+        
+        wallets = Wallet.objects.filter(user=user, pk__in=wallet_ids).only('id', 'name', 'balance').in_bulk()
+        owned_category_ids = set(
+            Category.objects.filter(user=user, pk__in=category_ids).values_list('id', flat=True)
+        )
+        
+        errors = {}
+        for index, item in enumerate(value):
+            item_errors = {}
+            
+            if item['wallet'] not in wallets:
+                item_errors['wallet'] = 'Вы не являетесь владельцем этого счета'
+            
+            if item.get('category') and item['category'] not in owned_category_ids:
+                item_errors['category'] = 'Вы не являетесь владельцем этой категории'
+            
+            if item['operation_type'] == 'transfer':
+                transfer_to_wallet = item.get('transfer_to_wallet')
+                if not transfer_to_wallet:
+                    item_errors['transfer_to_wallet'] = 'Для перевода необходимо указать счет назначения'
+                elif transfer_to_wallet not in wallets:
+                    item_errors['transfer_to_wallet'] = 'Вы не являетесь владельцем счета назначения'
+                elif transfer_to_wallet == item['wallet']:
+                    item_errors['transfer_to_wallet'] = 'Нельзя переводить на тот же счет'
+            
+            if item_errors:
+                errors[index] = item_errors
+        
+        if errors:
+            raise serializers.ValidationError(errors)
+        
+        # Итоговый баланс счетов с расходами и переводами не должен уйти в минус
+        expense_wallet_ids = set()
+        self._transfers, self._operations = self._build_operations(user, value, wallets)
+        self._wallet_deltas = {}
+        for operation in self._operations:
+            Wallet.add_deltas(self._wallet_deltas, Operation.get_wallet_deltas(operation))
+            if operation.operation_type != 'income':
+                expense_wallet_ids.add(operation.wallet_id)
+        
+        for wallet_id in expense_wallet_ids:
+            balance = Decimal(str(wallets[wallet_id].balance)) + self._wallet_deltas[wallet_id]['balance']
+            if balance < 0:
+                raise serializers.ValidationError(
+                    f'На счету "{wallets[wallet_id].name}" недостаточно средств'
+                )
+        
+        return value
+    
+    def _build_operations(self, user, items, wallets):
+        """
+        Операции из проверенных данных и записи переводов; пары операций
+        переводов строит WalletTransfer.build_operations
+        """
+        now = timezone.now()
+        transfers = []
+        operations = []
+        
+        for item in items:
+            operation = Operation(
+                user=user,
+                title=item['title'],
+                amount=item['amount'],
+                description=item.get('description'),
+                operation_type=item['operation_type'],
+                operation_date=item.get('operation_date') or now,
+                wallet_id=item['wallet'],
+                category_id=item.get('category')
+            )
+            
+            if operation.operation_type != 'transfer':
+                operations.append(operation)
+                continue
+            
+            transfer = WalletTransfer(
+                user=user,
+                from_wallet=wallets[item['wallet']],
+                to_wallet=wallets[item['transfer_to_wallet']],
+                amount=operation.amount,
+                description=operation.description,
+                transfer_date=operation.operation_date
+            )
+            transfers.append(transfer)
+            operations.extend(transfer.build_operations(operation))
+        
+        return transfers, operations
+    
+    def create(self, validated_data):
+        """
+        Массовое создание операций: bulk_create, один UPDATE баланса и счетчиков на счет,
+        обновление дневной сводки и версии данных аналитики в одной транзакции
+        """
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+        from api.sync.models import SyncSequence
+        
+        user = self.context['request'].user
+        # Операции и изменения счетов уже собраны при проверке баланса
+        operations = self._operations
+        
+        with transaction.atomic():
+            sync_seq = SyncSequence.next_value(user.id)
+            for operation in operations:
+                operation.sync_seq = sync_seq
+            
+            # Записи переводов создаются без save(): операции и балансы ниже
+            WalletTransfer.objects.bulk_create(self._transfers, batch_size=1000)
+            Operation.objects.bulk_create(operations, batch_size=1000)
+            Wallet.apply_deltas(self._wallet_deltas)
+            DailyOperationSummary.apply_operations(operations)
+            AnalyticsDataVersion.bump(user.id, operation_delta=len(operations))
+        
+        return operations
+
+
+class OperationBulkPatchSerializer(serializers.Serializer):
+    """
+    Изменения для массового редактирования операций
+    """
+    title = serializers.CharField(max_length=200, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    operation_date = serializers.DateTimeField(required=False)
+    amount = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=Decimal('0.01'), required=False
+    )
+    operation_type = serializers.ChoiceField(
+        choices=[('income', 'Доход'), ('expense', 'Расход')], required=False
+    )
+    wallet = serializers.IntegerField(required=False)
+    
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError('Не указаны изменения')
+        return data
+
+
+class OperationBulkUpdateSerializer(serializers.Serializer):
+    """
+    Сериализатор для массового изменения операций: выборка по списку id
+    или по фильтрам списка операций и набор изменений
+    """
+    operation_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False
+    )
+    filters = serializers.DictField(required=False)
+    patch = OperationBulkPatchSerializer()
+    
+    def validate(self, data):
+        """
+        Проверка выборки и владения счетом и категорией из изменений
+        """
+        from .filters import OperationFilter
+        
+        request = self.context['request']
+        user = request.user
+        
+        if 'operation_ids' not in data and not data.get('filters'):
+            raise serializers.ValidationError('Укажите operation_ids или filters')
+        
+        queryset = Operation.objects.filter(user=user)
+        if 'operation_ids' in data:
+            queryset = queryset.filter(id__in=data['operation_ids'])
+        if data.get('filters'):
+            filterset = OperationFilter(data=data['filters'], queryset=queryset, request=request)
+            if not filterset.is_valid():
+                raise serializers.ValidationError({'filters': filterset.errors})
+            queryset = filterset.qs
+        
+        patch = data['patch']
+        changes = {}
+        for field in ('title', 'description', 'operation_date', 'amount', 'operation_type'):
+            if field in patch:
+                changes[field] = patch[field]
+        
+        if 'category' in patch:
+            category_id = patch['category']
+            if category_id is not None and not Category.objects.filter(pk=category_id, user=user).exists():
+                raise serializers.ValidationError({'patch': {'category': 'Вы не являетесь владельцем этой категории'}})
+            changes['category_id'] = category_id
+        
+        if 'wallet' in patch:
+            if not Wallet.objects.filter(pk=patch['wallet'], user=user).exists():
+                raise serializers.ValidationError({'patch': {'wallet': 'Вы не являетесь владельцем этого счета'}})
+            changes['wallet_id'] = patch['wallet']
+        
+        # Операции переводов (обе операции пары и исходящие переводы старого формата)
+        # меняются только через перевод, иначе пара разойдется
+        transfer_fields = Operation.BULK_BALANCE_FIELDS | {'operation_date'}
+        if set(changes) & transfer_fields and queryset.filter(
+            Q(operation_type='transfer') | Q(transfer__isnull=False)
+        ).exists():
+            raise serializers.ValidationError(
+                'Сумму, тип, счет и дату операций переводов нельзя изменять массово, измените перевод'
+            )
+        
+        data['queryset'] = queryset
+        data['changes'] = changes
+        return data
+    
+    def save(self):
+        """
+        Применение изменений к выбранным операциям
+        """
+        from django.core.exceptions import ValidationError as DjangoValidationError
+        
+        try:
+            return Operation.bulk_patch(self.validated_data['queryset'], self.validated_data['changes'])
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.message_dict)
+
+
+class OperationExportSerializer(serializers.Serializer):
+    """
+    Параметры выгрузки операций
+    """
+    file_format = serializers.ChoiceField(
+        choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        default='csv'
+    )
+    compression = serializers.ChoiceField(
+        choices=[('none', 'Без сжатия'), ('gzip', 'Gzip')],
+        default='none'
+    )
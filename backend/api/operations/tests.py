@@ -1 +1,644 @@
 # evercoin/backend/api/operations/tests.py
+import csv
+import gzip
+import io
+import json
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.operations.models import Operation
+from api.wallets.models import Wallet
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    """Фикстура для API клиента."""
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_user(api_client):
+    """Фикстура для аутентифицированного пользователя."""
+    user = User.objects.create_user(
+        email='test@example.com',
+        username='testuser',
+        password='TestPassword123!'
+    )
+    refresh = RefreshToken.for_user(user)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    return user
+
+
+@pytest.fixture
+def wallet(authenticated_user):
+    """Фикстура для создания счета."""
+    return Wallet.objects.create(
+        user=authenticated_user,
+        name='Основной счет',
+        balance=Decimal('10000.00')
+    )
+
+
+@pytest.fixture
+def create_operation(authenticated_user, wallet):
+    """Фикстура для создания операции."""
+    def _create_operation(amount='100.00', operation_type='expense', **kwargs):
+        kwargs.setdefault('wallet', wallet)
+        kwargs.setdefault('title', 'Операция')
+        return Operation.objects.create(
+            user=authenticated_user,
+            amount=Decimal(amount),
+            operation_type=operation_type,
+            **kwargs
+        )
+    return _create_operation
+
+
+def get_balance(wallet):
+    """Баланс счета из базы."""
+    return Wallet.objects.get(pk=wallet.pk).balance
+
+
+def read_streaming_content(response):
+    """Содержимое потокового ответа."""
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+class TestOperationExportView:
+    """Тесты потоковой выгрузки операций."""
+
+    def test_export_csv(self, api_client, authenticated_user, create_operation):
+        """Выгрузка в CSV с заголовком и фильтром по типу."""
+        create_operation('100.00', title='Кофе')
+        create_operation('250.00', operation_type='income', title='Зарплата')
+
+        url = reverse('operations:operation-export')
+        response = api_client.get(url, {'operation_type': 'expense'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        rows = list(csv.DictReader(io.StringIO(read_streaming_content(response).decode())))
+        assert len(rows) == 1
+        assert rows[0]['title'] == 'Кофе'
+        assert rows[0]['wallet'] == 'Основной счет'
+        assert Decimal(rows[0]['amount']) == Decimal('100.00')
+
+    def test_export_jsonl_gzip(self, api_client, authenticated_user, create_operation):
+        """Выгрузка в JSON Lines со сжатием gzip."""
+        for _ in range(3):
+            create_operation('10.00')
+
+        url = reverse('operations:operation-export')
+        response = api_client.get(url, {'file_format': 'jsonl', 'compression': 'gzip'})
+
+        assert response['Content-Type'] == 'application/gzip'
+        assert response['Content-Disposition'].endswith('.jsonl.gz"')
+        lines = gzip.decompress(read_streaming_content(response)).decode().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])['amount'] == '10.00'
+
+    def test_export_only_own_operations(self, api_client, authenticated_user, create_operation):
+        """Чужие операции не попадают в выгрузку."""
+        other_user = User.objects.create_user(
+            email='other@example.com',
+            username='otheruser',
+            password='TestPassword123!'
+        )
+        other_wallet = Wallet.objects.create(user=other_user, name='Чужой счет', balance=Decimal('100.00'))
+        Operation.objects.create(
+            user=other_user, wallet=other_wallet, title='Чужая',
+            amount=Decimal('5.00'), operation_type='expense'
+        )
+
+        url = reverse('operations:operation-export')
+        response = api_client.get(url)
+
+        assert read_streaming_content(response).decode().strip().splitlines() == [
+            'id,operation_date,operation_type,title,amount,description,wallet,currency,category,transfer_to_wallet'
+        ]
+
+
+@pytest.mark.django_db
+class TestOperationBalance:
+    """Тесты атомарного обновления балансов счетов."""
+
+    def test_create_update_delete(self, wallet, create_operation):
+        """Баланс следует за созданием, изменением и удалением операции."""
+        operation = create_operation('100.00')
+        assert get_balance(wallet) == Decimal('9900.00')
+
+        operation.amount = Decimal('40.00')
+        operation.operation_type = 'income'
+        operation.save()
+        assert get_balance(wallet) == Decimal('10040.00')
+
+        operation.delete()
+        assert get_balance(wallet) == Decimal('10000.00')
+
+    def test_move_between_wallets(self, authenticated_user, wallet, create_operation):
+        """Перенос операции на другой счет откатывает ее на старом счете."""
+        other_wallet = Wallet.objects.create(
+            user=authenticated_user, name='Второй счет', balance=Decimal('500.00')
+        )
+        operation = create_operation('100.00')
+
+        operation = Operation.objects.get(pk=operation.pk)
+        operation.wallet = other_wallet
+        operation.save()
+
+        assert get_balance(wallet) == Decimal('10000.00')
+        assert get_balance(other_wallet) == Decimal('400.00')
+
+    def test_stale_wallet_instance_does_not_lose_updates(self, wallet, create_operation):
+        """Изменения через разные экземпляры не затирают друг друга."""
+        first = create_operation('100.00')
+        second = Operation.objects.get(pk=create_operation('50.00').pk)
+
+        first.amount = Decimal('10.00')
+        first.save()
+        second.delete()
+
+        assert get_balance(wallet) == Decimal('9990.00')
+
+    def test_update_without_refetch(self, wallet, create_operation):
+        """Изменение операции не перечитывает ее и не перезаписывает счет целиком."""
+        operation = create_operation('100.00')
+        operation.amount = Decimal('60.00')
+
+        with CaptureQueriesContext(connection) as context:
+            operation.save()
+
+        sql = [query['sql'] for query in context.captured_queries]
+        assert not any(query.startswith('SELECT') and 'FROM "operations_operation"' in query for query in sql)
+        assert sum(1 for query in sql if query.startswith('UPDATE "wallets_wallet"')) == 1
+        assert get_balance(wallet) == Decimal('9940.00')
+
+    def test_partial_update_funds_check(self, api_client, wallet, create_operation):
+        """Частичное изменение проверяет остаток с учетом текущей суммы операции."""
+        operation = create_operation('100.00')
+        url = reverse('operations:operation-update', kwargs={'pk': operation.pk})
+
+        response = api_client.patch(url, {'title': 'Продукты'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        response = api_client.patch(url, {'amount': '10000.00'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert get_balance(wallet) == Decimal('0.00')
+
+        response = api_client.patch(url, {'amount': '10000.01'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert get_balance(wallet) == Decimal('0.00')
+
+
+@pytest.mark.django_db
+class TestOperationBulkCreateView:
+    """Тесты массового создания операций."""
+
+    def test_bulk_create_updates_balances_and_analytics(self, api_client, authenticated_user, wallet):
+        """Операции создаются, балансы и сводка обновляются агрегированно."""
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+
+        other_wallet = Wallet.objects.create(
+            user=authenticated_user, name='Второй счет', balance=Decimal('0.00')
+        )
+        payload = {'operations': [
+            {'title': 'Кофе', 'amount': '100.00', 'operation_type': 'expense', 'wallet': wallet.id},
+            {'title': 'Зарплата', 'amount': '500.00', 'operation_type': 'income', 'wallet': wallet.id},
+            {'title': 'Накопления', 'amount': '200.00', 'operation_type': 'transfer',
+             'wallet': wallet.id, 'transfer_to_wallet': other_wallet.id},
+        ]}
+
+        url = reverse('operations:operation-bulk-create')
+        response = api_client.post(url, payload, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created_count'] == 4
+        assert get_balance(wallet) == Decimal('10200.00')
+        assert get_balance(other_wallet) == Decimal('200.00')
+        incoming = Operation.objects.get(operation_type='income', transfer__isnull=False)
+        assert incoming.title == f'Перевод с {wallet.name}'
+        assert AnalyticsDataVersion.get_state(authenticated_user)['operation_count'] == 4
+        assert DailyOperationSummary.objects.filter(user=authenticated_user).count() == 4
+
+    def test_bulk_create_rejects_foreign_wallet(self, api_client, authenticated_user, wallet):
+        """Чужой счет отклоняет весь набор с указанием индекса."""
+        other_user = User.objects.create_user(
+            email='other@example.com',
+            username='otheruser',
+            password='TestPassword123!'
+        )
+        other_wallet = Wallet.objects.create(user=other_user, name='Чужой счет', balance=Decimal('0.00'))
+        payload = {'operations': [
+            {'title': 'Кофе', 'amount': '100.00', 'operation_type': 'expense', 'wallet': wallet.id},
+            {'title': 'Чужая', 'amount': '100.00', 'operation_type': 'income', 'wallet': other_wallet.id},
+        ]}
+
+        url = reverse('operations:operation-bulk-create')
+        response = api_client.post(url, payload, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'wallet' in response.data['operations'][1]
+        assert not Operation.objects.exists()
+
+    def test_bulk_create_insufficient_funds(self, api_client, authenticated_user, wallet):
+        """Итоговый баланс проверяется по всему набору."""
+        payload = {'operations': [
+            {'title': 'Покупка', 'amount': '6000.00', 'operation_type': 'expense', 'wallet': wallet.id},
+            {'title': 'Покупка', 'amount': '6000.00', 'operation_type': 'expense', 'wallet': wallet.id},
+        ]}
+
+        url = reverse('operations:operation-bulk-create')
+        response = api_client.post(url, payload, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert get_balance(wallet) == Decimal('10000.00')
+
+    def test_bulk_create_single_balance_update(self, api_client, authenticated_user, wallet):
+        """Один UPDATE баланса на счет и одна строка сводки на день, без сохранения по одной."""
+        payload = {'operations': [
+            {'title': f'Доход {i}', 'amount': '1.00', 'operation_type': 'income', 'wallet': wallet.id}
+            for i in range(2000)
+        ]}
+
+        url = reverse('operations:operation-bulk-create')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(url, payload, format='json')
+
+        sql = [query['sql'] for query in context.captured_queries]
+        assert response.status_code == status.HTTP_201_CREATED
+        assert sum(1 for query in sql if query.startswith('UPDATE "wallets_wallet"')) == 1
+        assert sum(1 for query in sql if '"analytics_dailyoperationsummary"' in query) <= 3
+        assert get_balance(wallet) == Decimal('12000.00')
+
+
+@pytest.mark.django_db
+class TestOperationBulkDeleteView:
+    """Тесты массового удаления операций."""
+
+    def test_bulk_delete_restores_balances(self, api_client, authenticated_user, wallet, create_operation):
+        """Балансы, сводка и счетчик операций корректны после массового удаления."""
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+
+        other_wallet = Wallet.objects.create(
+            user=authenticated_user, name='Второй счет', balance=Decimal('1000.00')
+        )
+        expense = create_operation('100.00')
+        income = create_operation('300.00', operation_type='income')
+        other_expense = create_operation('50.00', wallet=other_wallet)
+        kept = create_operation('10.00')
+
+        url = reverse('operations:operation-bulk-delete')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(
+                url, {'operation_ids': [expense.id, income.id, other_expense.id]}, format='json'
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['deleted_count'] == 3
+        assert get_balance(wallet) == Decimal('9990.00')
+        assert get_balance(other_wallet) == Decimal('1000.00')
+        assert list(Operation.objects.values_list('id', flat=True)) == [kept.id]
+        assert AnalyticsDataVersion.get_state(authenticated_user)['operation_count'] == 1
+        assert DailyOperationSummary.objects.filter(user=authenticated_user).count() == 1
+        assert sum(1 for query in context.captured_queries if query['sql'].startswith('UPDATE "wallets_wallet"')) == 1
+
+    def test_bulk_delete_chunks_large_id_lists(self, authenticated_user, wallet, create_operation):
+        """Длинный список id удаляется пачками с одним UPDATE на счет."""
+        operations = [create_operation('1.00') for _ in range(7)]
+
+        with CaptureQueriesContext(connection) as context:
+            deleted_count = Operation.bulk_delete(
+                Operation.objects.filter(user=authenticated_user),
+                ids=[operation.id for operation in operations] + [10 ** 9],
+                chunk_size=3
+            )
+
+        sql = [query['sql'] for query in context.captured_queries]
+        assert deleted_count == 7
+        assert sum(1 for query in sql if query.startswith('DELETE FROM "operations_operation"')) == 3
+        assert sum(1 for query in sql if query.startswith('UPDATE "wallets_wallet"')) == 1
+        assert get_balance(wallet) == Decimal('10000.00')
+
+    def test_bulk_delete_ignores_foreign_operations(self, api_client, authenticated_user, create_operation):
+        """Чужие операции не удаляются."""
+        other_user = User.objects.create_user(
+            email='other@example.com',
+            username='otheruser',
+            password='TestPassword123!'
+        )
+        other_wallet = Wallet.objects.create(user=other_user, name='Чужой счет', balance=Decimal('100.00'))
+        foreign = Operation.objects.create(
+            user=other_user, wallet=other_wallet, title='Чужая',
+            amount=Decimal('5.00'), operation_type='expense'
+        )
+
+        url = reverse('operations:operation-bulk-delete')
+        response = api_client.post(url, {'operation_ids': [foreign.id]}, format='json')
+
+        assert response.data['deleted_count'] == 0
+        assert Operation.objects.filter(pk=foreign.pk).exists()
+        assert get_balance(other_wallet) == Decimal('95.00')
+
+
+@pytest.mark.django_db
+class TestOperationBulkUpdateView:
+    """Тесты массового изменения операций."""
+
+    def test_recategorize_by_filter(self, api_client, authenticated_user, create_operation):
+        """Смена категории по фильтру переносит операции и в дневной сводке."""
+        from api.analytics.models import DailyOperationSummary
+        from api.categories.models import Category
+
+        category = Category.objects.create(
+            user=authenticated_user, name='Кафе', icon='food', color='#00B894', category_type='expense'
+        )
+        create_operation('100.00', title='Кофе с собой')
+        create_operation('50.00', title='Кофе')
+        create_operation('30.00', title='Такси')
+
+        url = reverse('operations:operation-bulk-update')
+        response = api_client.post(url, {
+            'filters': {'search': 'Кофе'},
+            'patch': {'category': category.id},
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['updated_count'] == 2
+        assert Operation.objects.filter(category=category).count() == 2
+        summary = DailyOperationSummary.objects.get(user=authenticated_user, category=category)
+        assert (summary.total_amount, summary.operation_count) == (Decimal('150.00'), 2)
+
+    def test_title_change_single_update(self, api_client, authenticated_user, create_operation):
+        """Смена названия выполняется одним UPDATE без пересчета сводки."""
+        operations = [create_operation('10.00') for _ in range(3)]
+
+        url = reverse('operations:operation-bulk-update')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(url, {
+                'operation_ids': [operation.id for operation in operations],
+                'patch': {'title': 'Обед'},
+            }, format='json')
+
+        sql = [query['sql'] for query in context.captured_queries]
+        assert response.data['updated_count'] == 3
+        assert sum(1 for query in sql if query.startswith('UPDATE "operations_operation"')) == 1
+        assert not any('"analytics_dailyoperationsummary"' in query for query in sql)
+        assert set(Operation.objects.values_list('title', flat=True)) == {'Обед'}
+
+    def test_amount_and_wallet_change_reconciles_balances(self, api_client, authenticated_user, wallet, create_operation):
+        """Сумма и счет меняются с агрегированной сверкой балансов."""
+        other_wallet = Wallet.objects.create(
+            user=authenticated_user, name='Второй счет', balance=Decimal('1000.00')
+        )
+        operations = [create_operation('100.00') for _ in range(2)]
+
+        url = reverse('operations:operation-bulk-update')
+        response = api_client.post(url, {
+            'operation_ids': [operation.id for operation in operations],
+            'patch': {'amount': '40.00', 'wallet': other_wallet.id},
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert get_balance(wallet) == Decimal('10000.00')
+        assert get_balance(other_wallet) == Decimal('920.00')
+
+    def test_insufficient_funds_rolls_back(self, api_client, authenticated_user, wallet, create_operation):
+        """Изменение, уводящее счет в минус, отклоняется целиком."""
+        operation = create_operation('100.00')
+
+        url = reverse('operations:operation-bulk-update')
+        response = api_client.post(url, {
+            'operation_ids': [operation.id],
+            'patch': {'amount': '20000.00'},
+        }, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert get_balance(wallet) == Decimal('9900.00')
+        assert Operation.objects.get(pk=operation.pk).amount == Decimal('100.00')
+
+    def test_transfer_operations_rejected(self, api_client, authenticated_user, wallet, create_operation):
+        """Сумма и дата операций перевода массово не меняются, название - меняется."""
+        from api.wallets.models import WalletTransfer
+
+        other_wallet = Wallet.objects.create(user=authenticated_user, name='Второй счет')
+        transfer = WalletTransfer.objects.create(
+            user=authenticated_user, from_wallet=wallet, to_wallet=other_wallet, amount=Decimal('100.00')
+        )
+        incoming = transfer.operations.get(operation_type='income')
+        expense = create_operation('10.00')
+        url = reverse('operations:operation-bulk-update')
+
+        for patch in ({'amount': '50.00'}, {'operation_date': '2024-01-01T00:00:00Z'}):
+            response = api_client.post(url, {
+                'operation_ids': [incoming.id, expense.id], 'patch': patch
+            }, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = api_client.post(url, {
+            'operation_ids': [incoming.id, expense.id], 'patch': {'title': 'Новое'}
+        }, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert get_balance(other_wallet) == Decimal('100.00')
+        assert set(transfer.operations.values_list('amount', flat=True)) == {Decimal('100.00')}
+
+
+@pytest.mark.django_db
+class TestOperationSearch:
+    """Тесты полнотекстового поиска операций."""
+
+    def test_prefix_search_ranked(self, api_client, authenticated_user, create_operation):
+        """Поиск по началу слова в названии и комментарии с сортировкой по релевантности."""
+        create_operation('10.00', title='Такси')
+        in_description = create_operation('10.00', title='Завтрак', description='кофе и круассан')
+        in_title = create_operation('10.00', title='Кофе кофе')
+
+        url = reverse('operations:operation-list')
+        response = api_client.get(url, {'search': 'Коф'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [in_title.id, in_description.id]
+
+    def test_index_follows_updates_and_deletes(self, api_client, authenticated_user, create_operation):
+        """Индекс синхронизируется при изменении и удалении операций."""
+        renamed = create_operation('10.00', title='Кино')
+        deleted = create_operation('10.00', title='Кинотеатр')
+
+        renamed.title = 'Театр'
+        renamed.save()
+        deleted.delete()
+
+        url = reverse('operations:operation-list')
+        assert api_client.get(url, {'search': 'кино'}).data['count'] == 0
+        assert api_client.get(url, {'search': 'театр'}).data['count'] == 1
+
+    def test_search_with_explicit_ordering(self, api_client, authenticated_user, create_operation):
+        """Явная сортировка имеет приоритет над релевантностью."""
+        small = create_operation('5.00', title='Обед')
+        large = create_operation('50.00', title='Обед в ресторане')
+
+        url = reverse('operations:operation-list')
+        response = api_client.get(url, {'search': 'обед', 'ordering': '-amount'})
+
+        assert [item['id'] for item in response.data['results']] == [large.id, small.id]
+
+    def test_index_rebuilt_only_when_created(self, api_client, authenticated_user, create_operation):
+        """Переиндексация выполняется только при создании индекса, а не при каждом migrate."""
+        from api.operations.search import SQLITE_FTS_TABLE, setup_search_index
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('FTS5 используется только в SQLite')
+
+        create_operation('10.00', title='Кофе')
+        with CaptureQueriesContext(connection) as context:
+            setup_search_index()
+        assert not any('rebuild' in query['sql'] for query in context.captured_queries)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE {SQLITE_FTS_TABLE}')
+        setup_search_index()
+
+        url = reverse('operations:operation-list')
+        assert api_client.get(url, {'search': 'кофе'}).data['count'] == 1
+
+
+@pytest.mark.django_db
+class TestOperationDateFilters:
+    """Тесты фильтров по датам."""
+
+    def test_date_to_includes_whole_day(self, api_client, authenticated_user, create_operation):
+        """date_to включает операции до конца дня."""
+        from datetime import datetime, time, timedelta
+        from django.utils import timezone
+
+        day = timezone.localdate() - timedelta(days=2)
+        evening = create_operation('10.00', operation_date=timezone.make_aware(datetime.combine(day, time(23, 30))))
+        create_operation('10.00', operation_date=timezone.make_aware(datetime.combine(day + timedelta(days=1), time(0, 0))))
+
+        url = reverse('operations:operation-list')
+        response = api_client.get(url, {'date_from': day.isoformat(), 'date_to': day.isoformat()})
+
+        assert [item['id'] for item in response.data['results']] == [evening.id]
+
+    def test_date_range_lookup_uses_plain_column(self, authenticated_user):
+        """Фильтр периода не оборачивает колонку даты в функцию."""
+        from django.utils import timezone
+
+        today = timezone.localdate()
+        queryset = Operation.objects.filter(
+            user=authenticated_user, **Operation.get_date_range_lookup(today, today)
+        )
+
+        assert 'django_datetime_cast_date' not in str(queryset.query)
+        assert '"operations_operation"."operation_date" <' in str(queryset.query)
+
+
+@pytest.mark.django_db
+class TestOperationListFields:
+    """Тесты выбора полей и вложенных данных в списке операций."""
+
+    @pytest.fixture
+    def operations(self, authenticated_user, create_operation):
+        from api.categories.models import Category
+
+        category = Category.objects.create(user=authenticated_user, name='Еда', category_type='expense')
+        return [
+            create_operation('100.00', title='Обед', category=category),
+            create_operation('250.50', operation_type='income', title='Возврат'),
+        ]
+
+    def test_default_response_matches_list_serializer(self, api_client, authenticated_user, operations):
+        """Без параметров ответ совпадает с OperationListSerializer."""
+        from api.operations.serializers import OperationListSerializer
+
+        url = reverse('operations:operation-list')
+        response = api_client.get(url)
+
+        expected = OperationListSerializer(
+            Operation.objects.filter(user=authenticated_user).select_related('wallet', 'category'), many=True
+        ).data
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [dict(item) for item in expected]
+
+    def test_sparse_fields_skip_joins(self, api_client, operations):
+        """Только запрошенные поля, запрос без JOIN."""
+        url = reverse('operations:operation-list')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {'fields': 'id,amount,category'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0] == {
+            'id': operations[1].id, 'amount': '250.50', 'category': None
+        }
+        select = [query['sql'] for query in context.captured_queries if 'FROM "operations_operation"' in query['sql']]
+        assert select and not any('JOIN' in query for query in select)
+
+    def test_expand_category(self, api_client, operations):
+        """Вложенные данные категории по expand, пустая связь - None."""
+        url = reverse('operations:operation-list')
+        response = api_client.get(url, {'fields': 'id', 'expand': 'category', 'ordering': 'amount'})
+
+        assert response.data['results'] == [
+            {'id': operations[0].id, 'category_data': {
+                'id': operations[0].category_id, 'name': 'Еда', 'icon': 'shopping',
+                'color': '#4ECDC4', 'category_type': 'expense'
+            }},
+            {'id': operations[1].id, 'category_data': None},
+        ]
+
+    def test_unknown_field(self, api_client, operations):
+        """Неизвестное поле или связь отклоняются."""
+        url = reverse('operations:operation-list')
+
+        assert api_client.get(url, {'fields': 'id,user'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {'expand': 'user'}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestRenderers:
+    """Тесты рендереров и парсеров ответов API."""
+
+    def test_orjson_matches_json_renderer(self):
+        """orjson дает тот же JSON, что и стандартный рендерер, Decimal - строкой."""
+        from datetime import datetime, timezone as dt_timezone
+        from rest_framework.renderers import JSONRenderer
+        from api.core.renderers import DecimalJSONEncoder, ORJSONRenderer
+
+        data = {
+            'amount': Decimal('100.10'),
+            'date': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            0: {'title': 'Кофе\u2028'},
+        }
+        renderer = JSONRenderer()
+        renderer.encoder_class = DecimalJSONEncoder
+
+        rendered = ORJSONRenderer().render(data)
+        assert rendered == renderer.render(data)
+        assert json.loads(rendered)['amount'] == '100.10'
+
+    def test_msgpack_list_and_bulk_create(self, api_client, authenticated_user, wallet):
+        """Список и массовое создание в MessagePack."""
+        msgpack = pytest.importorskip('msgpack')
+
+        url = reverse('operations:operation-bulk-create')
+        payload = {'operations': [
+            {'title': 'Кофе', 'amount': '100.00', 'operation_type': 'expense', 'wallet': wallet.id},
+        ]}
+        response = api_client.post(
+            url, msgpack.packb(payload), content_type='application/msgpack', HTTP_ACCEPT='application/msgpack'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = api_client.get(reverse('operations:operation-list'), HTTP_ACCEPT='application/msgpack')
+        data = msgpack.unpackb(response.content)
+        assert response['Content-Type'] == 'application/msgpack'
+        assert data['results'][0]['wallet_data']['balance'] == '9900.00'
@@ -23,6 +23,15 @@ urlpatterns = [
     # Копирование операции
     path('operations/<int:pk>/copy/', views.OperationCopyView.as_view(), name='operation-copy'),
     
+    # Потоковая выгрузка операций (file_format=csv|jsonl, compression=none|gzip)
+    path('operations/export/', views.OperationExportView.as_view(), name='operation-export'),
+    
+    # Массовое создание операций
+    path('operations/bulk-create/', views.OperationBulkCreateView.as_view(), name='operation-bulk-create'),
+    
+    # Массовое изменение операций
+    path('operations/bulk-update/', views.OperationBulkUpdateView.as_view(), name='operation-bulk-update'),
+    
     # Массовое удаление операций
     path('operations/bulk-delete/', views.OperationBulkDeleteView.as_view(), name='operation-bulk-delete'),
 ]
@@ -4,8 +4,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter, SearchFilter
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
 
@@ -14,9 +14,14 @@ from .serializers import (
     OperationSerializer, 
     OperationCreateSerializer,
     OperationUpdateSerializer,
-    OperationListSerializer
+    OperationListSerializer,
+    OperationValuesSerializer,
+    OperationBulkCreateSerializer,
+    OperationBulkUpdateSerializer,
+    OperationExportSerializer
 )
-from .filters import OperationFilter
+from .filters import OperationFilter, OperationOrderingFilter
+from .export import EXPORT_FORMATS, stream_operations
 
 
 class OperationListView(generics.ListAPIView):
@@ -25,11 +30,10 @@ class OperationListView(generics.ListAPIView):
     """
     serializer_class = OperationListSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DjangoFilterBackend, OperationOrderingFilter]
     filterset_class = OperationFilter
     ordering_fields = ['operation_date', 'amount', 'created_at']
     ordering = ['-operation_date']
-    search_fields = ['title', 'description']
     
     def get_queryset(self):
         """
@@ -38,6 +42,20 @@ class OperationListView(generics.ListAPIView):
         return Operation.objects.filter(user=self.request.user).select_related(
             'wallet', 'category', 'transfer_to_wallet'
         )
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Список операций через values(): только запрошенные поля (?fields=)
+        и связанные объекты (?expand=) одним запросом без создания моделей
+        """
+        serializer = OperationValuesSerializer.from_query_params(request.query_params)
+        queryset = self.filter_queryset(self.get_queryset()).values(*serializer.get_values())
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        
+        return Response(serializer.to_representation(queryset))
 
 
 class OperationDetailView(generics.RetrieveAPIView):
@@ -146,6 +164,49 @@ class OperationCopyView(generics.CreateAPIView):
             )
 
 
+class OperationBulkCreateView(generics.GenericAPIView):
+    """
+    API endpoint для массового создания операций (синхронизация офлайн-очереди)
+    """
+    serializer_class = OperationBulkCreateSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        """
+        Массовое создание операций
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.save()
+        
+        return Response({
+            'message': f'Создано {len(operations)} операций',
+            'created_count': len(operations),
+            'operation_ids': [operation.id for operation in operations]
+        }, status=status.HTTP_201_CREATED)
+
+
+class OperationBulkUpdateView(generics.GenericAPIView):
+    """
+    API endpoint для массового изменения операций (смена категории, названия, даты и т.д.)
+    """
+    serializer_class = OperationBulkUpdateSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        """
+        Массовое изменение операций по списку id или фильтрам
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated_count = serializer.save()
+        
+        return Response({
+            'message': f'Изменено {updated_count} операций',
+            'updated_count': updated_count
+        }, status=status.HTTP_200_OK)
+
+
 class OperationBulkDeleteView(generics.GenericAPIView):
     """
     API endpoint для массового удаления операций
@@ -164,14 +225,21 @@ class OperationBulkDeleteView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        if not isinstance(operation_ids, list) or not all(
+            isinstance(operation_id, int) for operation_id in operation_ids
+        ):
+            return Response(
+                {'error': 'operation_ids должен быть списком целых чисел'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         try:
-            operations = Operation.objects.filter(
-                id__in=operation_ids, 
-                user=request.user
+            # Балансы, дневная сводка и счетчик операций обновляются агрегированно
+            deleted_count = Operation.bulk_delete(
+                Operation.objects.filter(user=request.user),
+                ids=operation_ids
             )
             
-            deleted_count, _ = operations.delete()
-            
             return Response({
                 'message': f'Удалено {deleted_count} операций',
                 'deleted_count': deleted_count
@@ -182,3 +250,43 @@ class OperationBulkDeleteView(generics.GenericAPIView):
                 {'error': f'Ошибка при удалении операций: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class OperationExportView(generics.GenericAPIView):
+    """
+    API endpoint для потоковой выгрузки операций в CSV или JSON Lines.
+    Поддерживает те же фильтры, что и список операций
+    """
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OperationFilter
+    
+    def get_queryset(self):
+        """
+        Возвращает операции только текущего пользователя
+        """
+        return Operation.objects.filter(user=self.request.user)
+    
+    def get(self, request, *args, **kwargs):
+        """
+        Выгрузка операций файлом без загрузки всей выборки в память
+        """
+        params = OperationExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        export_format = params.validated_data['file_format']
+        compress = params.validated_data['compression'] == 'gzip'
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        filename = f"operations_{timezone.now():%Y%m%d_%H%M%S}.{export_format}"
+        content_type = EXPORT_FORMATS[export_format]
+        if compress:
+            filename += '.gz'
+            content_type = 'application/gzip'
+        
+        response = StreamingHttpResponse(
+            stream_operations(queryset, export_format, compress=compress),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,35 @@
+# evercoin/backend/api/sync/admin.py
+from django.contrib import admin
+from .models import SyncTombstone
+
+
+@admin.register(SyncTombstone)
+class SyncTombstoneAdmin(admin.ModelAdmin):
+    """
+    Админ-панель для записей об удаленных объектах
+    """
+    list_display = [
+        'user',
+        'object_type',
+        'object_id',
+        'sync_seq',
+        'deleted_at'
+    ]
+    
+    list_filter = [
+        'object_type',
+        'deleted_at'
+    ]
+    
+    search_fields = [
+        'user__email',
+        'user__username'
+    ]
+    
+    readonly_fields = ['deleted_at']
+    
+    def get_queryset(self, request):
+        """
+        Оптимизация запроса для админки
+        """
+        return super().get_queryset(request).select_related('user')
@@ -0,0 +1,71 @@
+# evercoin/backend/api/sync/apps.py
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api.sync'
+    verbose_name = 'Синхронизация'
+    
+    def ready(self):
+        from django.db.models.signals import pre_delete
+        
+        pre_delete.connect(record_category_delete, sender='categories.Category')
+        pre_delete.connect(record_wallet_delete, sender='wallets.Wallet')
+
+
+def is_user_delete(origin):
+    """
+    Удаление вместе с пользователем: его данные синхронизации удаляются тоже
+    """
+    from django.contrib.auth import get_user_model
+    
+    model = getattr(origin, 'model', type(origin))
+    return issubclass(model, get_user_model())
+
+
+def record_category_delete(sender, instance, origin=None, **kwargs):
+    """
+    Запись удаления категории для синхронизации, в том числе при удалении
+    через queryset и админку. Операции, с которых снимается категория,
+    получают тот же номер изменения
+    """
+    from django.utils import timezone
+    from api.operations.models import Operation
+    from .models import SyncTombstone
+    
+    if is_user_delete(origin):
+        return
+    
+    sequences = SyncTombstone.record('category', [(instance.pk, instance.user_id)])
+    Operation.objects.filter(category_id=instance.pk).update(
+        sync_seq=sequences[instance.user_id],
+        updated_at=timezone.now()
+    )
+
+
+def record_wallet_delete(sender, instance, origin=None, **kwargs):
+    """
+    Запись удаления счета и его операций (удаляются каскадом) для синхронизации.
+    Операции других счетов, которые теряют счет назначения или запись
+    перевода, получают новый номер изменения
+    """
+    from django.db.models import Q
+    from django.utils import timezone
+    from api.operations.models import Operation
+    from .models import SyncTombstone
+    
+    if is_user_delete(origin):
+        return
+    
+    operations = Operation.objects.filter(wallet_id=instance.pk)
+    SyncTombstone.record('operation', list(operations.values_list('pk', 'user_id')))
+    sequences = SyncTombstone.record('wallet', [(instance.pk, instance.user_id)])
+    Operation.objects.filter(
+        Q(transfer_to_wallet_id=instance.pk)
+        | Q(transfer__from_wallet_id=instance.pk)
+        | Q(transfer__to_wallet_id=instance.pk)
+    ).exclude(wallet_id=instance.pk).update(
+        sync_seq=sequences[instance.user_id],
+        updated_at=timezone.now()
+    )
@@ -0,0 +1,149 @@
+# evercoin/backend/api/sync/models.py
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class SyncSequence(models.Model):
+    """
+    Счетчик изменений пользователя для дельта-синхронизации.
+    Каждое изменение операций, счетов и категорий получает следующее
+    значение счетчика и записывает его в поле sync_seq измененных строк
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='sync_sequence',
+        verbose_name='Пользователь'
+    )
+    
+    value = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер последнего изменения'
+    )
+    
+    class Meta:
+        verbose_name = 'Счетчик изменений'
+        verbose_name_plural = 'Счетчики изменений'
+    
+    def __str__(self):
+        return f"{self.user} - {self.value}"
+    
+    @classmethod
+    def next_value(cls, user_id):
+        """
+        Атомарное получение следующего номера изменения пользователя.
+        UPDATE блокирует строку счетчика до конца транзакции, поэтому
+        номера выдаются в порядке фиксации изменений
+        """
+        from django.db import IntegrityError, transaction
+        
+        updated = cls.objects.filter(user_id=user_id).update(value=models.F('value') + 1)
+        
+        if not updated:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id, value=1)
+                    return 1
+            except IntegrityError:
+                # Запись успела создать параллельная транзакция
+                cls.objects.filter(user_id=user_id).update(value=models.F('value') + 1)
+        
+        return cls.objects.filter(user_id=user_id).values_list('value', flat=True).get()
+    
+    @classmethod
+    def get_value(cls, user_id, lock=False):
+        """
+        Текущий номер изменения пользователя. С lock=True дожидается
+        завершения транзакций, которые уже получили номер, но еще не зафиксированы
+        """
+        queryset = cls.objects.filter(user_id=user_id)
+        if lock:
+            queryset = queryset.select_for_update()
+        return queryset.values_list('value', flat=True).first() or 0
+    
+    @classmethod
+    def current_value_expression(cls, user_field='user_id'):
+        """
+        Текущий номер изменения владельца строки для queryset.update(sync_seq=...),
+        когда один UPDATE затрагивает строки разных пользователей.
+        Номер должен быть заранее получен через next_value в той же транзакции
+        """
+        return Coalesce(
+            models.Subquery(
+                cls.objects.filter(user_id=models.OuterRef(user_field)).values('value')[:1]
+            ),
+            0
+        )
+
+
+class SyncTombstone(models.Model):
+    """
+    Запись об удаленном объекте для дельта-синхронизации
+    """
+    
+    OBJECT_TYPES = [
+        ('operation', 'Операция'),
+        ('wallet', 'Счет'),
+        ('category', 'Категория'),
+    ]
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='sync_tombstones',
+        verbose_name='Пользователь'
+    )
+    
+    object_type = models.CharField(
+        max_length=20,
+        choices=OBJECT_TYPES,
+        verbose_name='Тип объекта'
+    )
+    
+    object_id = models.BigIntegerField(
+        verbose_name='ID объекта'
+    )
+    
+    sync_seq = models.PositiveBigIntegerField(
+        verbose_name='Номер изменения'
+    )
+    
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Удаленный объект'
+        verbose_name_plural = 'Удаленные объекты'
+        ordering = ['sync_seq']
+        indexes = [
+            models.Index(fields=['user', 'sync_seq']),
+        ]
+    
+    def __str__(self):
+        return f"{self.object_type} #{self.object_id} ({self.sync_seq})"
+    
+    @classmethod
+    def record(cls, object_type, rows):
+        """
+        Запись удаленных объектов: rows - пары (id объекта, id пользователя).
+        На каждого пользователя выдается один номер изменения.
+        Возвращает {user_id: номер изменения}
+        """
+        sequences = {}
+        tombstones = []
+        
+        for object_id, user_id in rows:
+            if user_id not in sequences:
+                sequences[user_id] = SyncSequence.next_value(user_id)
+            tombstones.append(cls(
+                user_id=user_id,
+                object_type=object_type,
+                object_id=object_id,
+                sync_seq=sequences[user_id]
+            ))
+        
+        cls.objects.bulk_create(tombstones, batch_size=1000)
+        return sequences
@@ -0,0 +1,92 @@
+# evercoin/backend/api/sync/serializers.py
+from rest_framework import serializers
+from api.operations.models import Operation
+from api.wallets.models import Wallet
+from api.categories.models import Category
+
+
+class SyncParametersSerializer(serializers.Serializer):
+    """
+    Параметры запроса синхронизации
+    """
+    since = serializers.IntegerField(
+        min_value=0,
+        default=0,
+        help_text='Номер последнего полученного изменения (0 - полная выгрузка)'
+    )
+
+
+class SyncOperationSerializer(serializers.ModelSerializer):
+    """
+    Строка операции для синхронизации: поля модели без вложенных объектов
+    """
+    
+    class Meta:
+        model = Operation
+        fields = [
+            'id',
+            'title',
+            'amount',
+            'description',
+            'operation_type',
+            'operation_date',
+            'wallet',
+            'category',
+            'transfer_to_wallet',
+            'transfer',
+            'created_at',
+            'updated_at',
+            'sync_seq'
+        ]
+        read_only_fields = fields
+
+
+class SyncWalletSerializer(serializers.ModelSerializer):
+    """
+    Строка счета для синхронизации со счетчиками операций
+    """
+    
+    class Meta:
+        model = Wallet
+        fields = [
+            'id',
+            'name',
+            'balance',
+            'currency',
+            'icon',
+            'color',
+            'is_default',
+            'is_hidden',
+            'description',
+            'initial_balance',
+            'income_total',
+            'expense_total',
+            'operation_count',
+            'created_at',
+            'updated_at',
+            'sync_seq'
+        ]
+        read_only_fields = fields
+
+
+class SyncCategorySerializer(serializers.ModelSerializer):
+    """
+    Строка категории для синхронизации без вычисляемых полей
+    """
+    
+    class Meta:
+        model = Category
+        fields = [
+            'id',
+            'name',
+            'icon',
+            'color',
+            'category_type',
+            'description',
+            'is_default',
+            'is_active',
+            'created_at',
+            'updated_at',
+            'sync_seq'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,264 @@
+# evercoin/backend/api/sync/tests.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.categories.models import Category
+from api.operations.models import Operation
+from api.sync.models import SyncSequence, SyncTombstone
+from api.wallets.models import Wallet
+
+User = get_user_model()
+
+
+@pytest.fixture
+def api_client():
+    """Фикстура для API клиента."""
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_user(api_client):
+    """Фикстура для аутентифицированного пользователя."""
+    user = User.objects.create_user(
+        email='test@example.com',
+        username='testuser',
+        password='TestPassword123!'
+    )
+    refresh = RefreshToken.for_user(user)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    return user
+
+
+@pytest.fixture
+def wallet(authenticated_user):
+    """Фикстура для создания счета."""
+    return Wallet.objects.create(
+        user=authenticated_user,
+        name='Основной счет',
+        balance=Decimal('1000.00')
+    )
+
+
+@pytest.fixture
+def category(authenticated_user):
+    """Фикстура для создания категории."""
+    return Category.objects.create(
+        user=authenticated_user,
+        name='Продукты',
+        category_type='expense'
+    )
+
+
+@pytest.fixture
+def create_operation(authenticated_user, wallet, category):
+    """Фикстура для создания операции."""
+    def _create_operation(amount='100.00', **kwargs):
+        kwargs.setdefault('operation_type', 'expense')
+        kwargs.setdefault('category', category)
+        return Operation.objects.create(
+            user=authenticated_user,
+            wallet=wallet,
+            title='Операция',
+            amount=Decimal(amount),
+            **kwargs
+        )
+    return _create_operation
+
+
+def get_sync(api_client, since=None):
+    """Ответ endpoint синхронизации."""
+    params = {} if since is None else {'since': since}
+    response = api_client.get(reverse('sync:sync'), params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+@pytest.mark.django_db
+class TestSyncView:
+    """Тесты дельта-синхронизации."""
+
+    def test_full_sync(self, api_client, authenticated_user, wallet, category, create_operation):
+        """Без since возвращаются все объекты пользователя."""
+        operation = create_operation()
+
+        data = get_sync(api_client)
+
+        assert data['full_sync'] is True
+        assert data['sequence'] == SyncSequence.get_value(authenticated_user.id)
+        assert [item['id'] for item in data['operations']] == [operation.id]
+        assert [item['id'] for item in data['wallets']] == [wallet.id]
+        assert [item['id'] for item in data['categories']] == [category.id]
+        assert data['deleted'] == {'operations': [], 'wallets': [], 'categories': []}
+
+    def test_incremental_sync_returns_only_changes(self, api_client, wallet, create_operation):
+        """После since возвращаются только измененные строки."""
+        changed = create_operation('100.00')
+        create_operation('50.00')
+        since = get_sync(api_client)['sequence']
+
+        changed.amount = Decimal('300.00')
+        changed.save()
+
+        data = get_sync(api_client, since)
+
+        assert data['full_sync'] is False
+        assert [item['id'] for item in data['operations']] == [changed.id]
+        # Баланс счета изменился вместе с операцией
+        assert [item['id'] for item in data['wallets']] == [wallet.id]
+        assert Decimal(data['wallets'][0]['balance']) == Decimal('650.00')
+        assert data['categories'] == []
+
+        assert get_sync(api_client, data['sequence'])['operations'] == []
+
+    def test_deletes_are_returned_as_tombstones(self, api_client, create_operation):
+        """Удаленные операции, в том числе массово, попадают в deleted."""
+        deleted = create_operation()
+        bulk_deleted = [create_operation(), create_operation()]
+        since = get_sync(api_client)['sequence']
+        deleted_id = deleted.id
+
+        deleted.delete()
+        response = api_client.post(
+            reverse('operations:operation-bulk-delete'),
+            {'operation_ids': [operation.id for operation in bulk_deleted]},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        data = get_sync(api_client, since)
+
+        assert sorted(data['deleted']['operations']) == sorted(
+            [deleted_id] + [operation.id for operation in bulk_deleted]
+        )
+        assert data['operations'] == []
+
+    def test_bulk_update_marks_operations(self, api_client, create_operation):
+        """Массовое изменение операций попадает в синхронизацию."""
+        operations = [create_operation(), create_operation()]
+        untouched = create_operation()
+        since = get_sync(api_client)['sequence']
+
+        response = api_client.post(
+            reverse('operations:operation-bulk-update'),
+            {'operation_ids': [operation.id for operation in operations], 'patch': {'title': 'Новое'}},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        data = get_sync(api_client, since)
+
+        synced_ids = {item['id'] for item in data['operations']}
+        assert synced_ids == {operation.id for operation in operations}
+        assert untouched.id not in synced_ids
+
+    def test_deleted_wallet_and_category(self, api_client, authenticated_user):
+        """Удаление счета и категории записывается для синхронизации."""
+        wallet = Wallet.objects.create(user=authenticated_user, name='Наличные', balance=Decimal('0.00'))
+        category = Category.objects.create(user=authenticated_user, name='Такси', category_type='expense')
+        since = get_sync(api_client)['sequence']
+
+        wallet_id, category_id = wallet.id, category.id
+        wallet.delete()
+        category.delete()
+
+        data = get_sync(api_client, since)
+
+        assert data['deleted']['wallets'] == [wallet_id]
+        assert data['deleted']['categories'] == [category_id]
+
+    def test_category_queryset_delete_marks_operations(self, api_client, category, create_operation):
+        """Удаление категории через queryset (как в админке) попадает в синхронизацию вместе с операциями."""
+        operation = create_operation()
+        since = get_sync(api_client)['sequence']
+        category_id = category.id
+
+        Category.objects.filter(pk=category_id).delete()
+
+        data = get_sync(api_client, since)
+
+        assert data['deleted']['categories'] == [category_id]
+        assert [item['id'] for item in data['operations']] == [operation.id]
+        assert data['operations'][0]['category'] is None
+
+    def test_wallet_queryset_delete_marks_cascades(self, api_client, authenticated_user, wallet):
+        """Каскадное удаление счета записывает его операции и помечает парные операции переводов."""
+        from api.wallets.models import WalletTransfer
+
+        savings = Wallet.objects.create(user=authenticated_user, name='Накопления')
+        transfer = WalletTransfer.objects.create(
+            user=authenticated_user, from_wallet=wallet, to_wallet=savings, amount=Decimal('100.00')
+        )
+        outgoing = transfer.operations.get(operation_type='transfer')
+        incoming = transfer.operations.get(operation_type='income')
+        expense = Operation.objects.create(
+            user=authenticated_user, wallet=savings, title='Кафе', amount=Decimal('30.00'), operation_type='expense'
+        )
+        since = get_sync(api_client)['sequence']
+        savings_id = savings.id
+
+        Wallet.objects.filter(pk=savings_id).delete()
+
+        data = get_sync(api_client, since)
+
+        assert data['deleted']['wallets'] == [savings_id]
+        assert sorted(data['deleted']['operations']) == sorted([incoming.id, expense.id])
+        assert [item['id'] for item in data['operations']] == [outgoing.id]
+
+    def test_user_delete_does_not_record(self, authenticated_user, wallet, category, create_operation):
+        """Удаление пользователя удаляет его данные без записей синхронизации."""
+        create_operation()
+
+        authenticated_user.delete()
+
+        assert not SyncTombstone.objects.exists()
+        assert not Operation.objects.exists()
+
+    def test_since_ahead_of_server_returns_full_sync(self, api_client, create_operation):
+        """Номер клиента больше серверного - полная выгрузка."""
+        create_operation()
+
+        data = get_sync(api_client, 10 ** 9)
+
+        assert data['full_sync'] is True
+        assert len(data['operations']) == 1
+
+    def test_full_sync_includes_rows_before_sync(self, api_client, wallet, category, create_operation):
+        """Полная выгрузка включает строки, созданные до включения синхронизации (номер 0)."""
+        operation = create_operation()
+        Operation.objects.filter(pk=operation.pk).update(sync_seq=0)
+        Wallet.objects.filter(pk=wallet.pk).update(sync_seq=0)
+        Category.objects.filter(pk=category.pk).update(sync_seq=0)
+
+        for since in (None, 10 ** 9):
+            data = get_sync(api_client, since)
+
+            assert data['full_sync'] is True
+            assert [item['id'] for item in data['operations']] == [operation.id]
+            assert [item['id'] for item in data['wallets']] == [wallet.id]
+            assert [item['id'] for item in data['categories']] == [category.id]
+
+    def test_other_user_changes_are_not_returned(self, api_client, authenticated_user, create_operation):
+        """Изменения других пользователей не попадают в ответ."""
+        since = get_sync(api_client)['sequence']
+        other_user = User.objects.create_user(
+            email='other@example.com', username='other', password='TestPassword123!'
+        )
+        other_wallet = Wallet.objects.create(user=other_user, name='Чужой', balance=Decimal('100.00'))
+        other_wallet.delete()
+
+        data = get_sync(api_client, since)
+
+        assert data['wallets'] == []
+        assert data['deleted']['wallets'] == []
+        assert SyncTombstone.objects.filter(user=other_user).count() == 1
+
+    def test_invalid_since(self, api_client, authenticated_user):
+        """Отрицательный since отклоняется."""
+        response = api_client.get(reverse('sync:sync'), {'since': -1})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
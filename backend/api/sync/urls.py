@@ -0,0 +1,10 @@
+# evercoin/backend/api/sync/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'sync'
+
+urlpatterns = [
+    # Изменения после номера since
+    path('', views.SyncView.as_view(), name='sync'),
+]
@@ -0,0 +1,82 @@
+# evercoin/backend/api/sync/views.py
+from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+
+from .models import SyncSequence, SyncTombstone
+from .serializers import (
+    SyncParametersSerializer,
+    SyncOperationSerializer,
+    SyncWalletSerializer,
+    SyncCategorySerializer
+)
+from api.operations.models import Operation
+from api.wallets.models import Wallet
+from api.categories.models import Category
+
+
+class SyncView(generics.GenericAPIView):
+    """
+    API endpoint дельта-синхронизации для офлайн-клиентов:
+    операции, счета и категории, измененные после номера since,
+    и id удаленных объектов
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = SyncParametersSerializer
+    
+    # Тип объекта -> (модель, сериализатор, ключ ответа)
+    SYNC_MODELS = [
+        ('operation', Operation, SyncOperationSerializer, 'operations'),
+        ('wallet', Wallet, SyncWalletSerializer, 'wallets'),
+        ('category', Category, SyncCategorySerializer, 'categories'),
+    ]
+    
+    def get(self, request, *args, **kwargs):
+        """
+        Изменения пользователя с номерами в интервале (since, sequence]
+        """
+        parameters = self.get_serializer(data=request.query_params)
+        parameters.is_valid(raise_exception=True)
+        since = parameters.validated_data['since']
+        user = request.user
+        
+        with transaction.atomic():
+            # Блокировка счетчика дожидается незафиксированных изменений
+            # с уже выданными номерами, иначе клиент мог бы их пропустить
+            sequence = SyncSequence.get_value(user.id, lock=True)
+            
+            # Номер клиента больше текущего (например, после восстановления базы) -
+            # отдаем полную выгрузку
+            full_sync = since == 0 or since > sequence
+            if full_sync:
+                since = 0
+            
+            data = {
+                'sequence': sequence,
+                'full_sync': full_sync,
+                'deleted': {},
+            }
+            
+            for object_type, model, serializer_class, key in self.SYNC_MODELS:
+                changed = model.objects.filter(user=user, sync_seq__lte=sequence)
+                # Полная выгрузка без нижней границы: у строк, созданных
+                # до включения синхронизации, номер изменения равен 0
+                if not full_sync:
+                    changed = changed.filter(sync_seq__gt=since)
+                changed = changed.order_by('sync_seq', 'id')
+                data[key] = serializer_class(changed, many=True).data
+                
+                if full_sync:
+                    data['deleted'][key] = []
+                else:
+                    data['deleted'][key] = list(
+                        SyncTombstone.objects.filter(
+                            user=user,
+                            object_type=object_type,
+                            sync_seq__gt=since,
+                            sync_seq__lte=sequence
+                        ).values_list('object_id', flat=True)
+                    )
+        
+        return Response(data)
@@ -1,6 +1,6 @@
 # evercoin/backend/api/wallets/admin.py
 from django.contrib import admin
-from .models import Wallet, WalletTransfer
+from .models import Wallet, WalletTransfer, WalletBalanceSnapshot
 
 
 @admin.register(Wallet)
@@ -121,4 +121,34 @@ class WalletTransferAdmin(admin.ModelAdmin):
         """
         Оптимизация запроса для админки
         """
-        return super().get_queryset(request).select_related('user', 'from_wallet', 'to_wallet')
\ No newline at end of file
+        return super().get_queryset(request).select_related('user', 'from_wallet', 'to_wallet')
+
+
+@admin.register(WalletBalanceSnapshot)
+class WalletBalanceSnapshotAdmin(admin.ModelAdmin):
+    """
+    Админ-панель для снимков балансов счетов
+    """
+    list_display = [
+        'wallet',
+        'month_end',
+        'balance',
+        'created_at'
+    ]
+    
+    list_filter = [
+        'month_end'
+    ]
+    
+    search_fields = [
+        'wallet__name',
+        'wallet__user__email'
+    ]
+    
+    readonly_fields = ['created_at']
+    
+    def get_queryset(self, request):
+        """
+        Оптимизация запроса для админки
+        """
+        return super().get_queryset(request).select_related('wallet')
@@ -0,0 +1,29 @@
+# evercoin/backend/api/wallets/management/commands/backfill_initial_operations.py
+from django.core.management.base import BaseCommand
+
+from api.wallets.models import Wallet
+
+
+class Command(BaseCommand):
+    """
+    Создание операций начального баланса для счетов, созданных до их
+    появления, и пересчет балансов этих счетов. Выполняется один раз
+    после обновления, повторный запуск ничего не меняет
+    """
+    help = 'Создает недостающие операции начального баланса и пересчитывает балансы счетов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID пользователя (можно указать несколько раз)'
+        )
+
+    def handle(self, *args, **options):
+        created, wallets = Wallet.backfill_initial_operations(options['user_ids'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено счетов: {wallets}, создано операций начального баланса: {created}'
+        ))
@@ -0,0 +1,51 @@
+# evercoin/backend/api/wallets/management/commands/build_balance_snapshots.py
+from django.core.management.base import BaseCommand
+
+from api.wallets.models import Wallet, WalletBalanceSnapshot
+
+
+class Command(BaseCommand):
+    """
+    Построение снимков балансов счетов на конец завершенных месяцев.
+    Запускается раз в месяц: дописывает снимки только после последнего
+    существующего, правки задним числом исправляются при изменении операций
+    """
+    help = 'Строит снимки балансов счетов на конец месяца (--rebuild - пересчет с нуля)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID пользователя (можно указать несколько раз)'
+        )
+        parser.add_argument(
+            '--wallet-id',
+            type=int,
+            action='append',
+            dest='wallet_ids',
+            help='ID счета (можно указать несколько раз)'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Удалить существующие снимки и построить заново'
+        )
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.all().order_by('pk')
+        if options['user_ids']:
+            wallets = wallets.filter(user_id__in=options['user_ids'])
+        if options['wallet_ids']:
+            wallets = wallets.filter(pk__in=options['wallet_ids'])
+
+        processed = 0
+        created = 0
+        for wallet in wallets.iterator():
+            processed += 1
+            created += WalletBalanceSnapshot.build_for_wallet(wallet, rebuild=options['rebuild'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано счетов: {processed}, создано снимков: {created}'
+        ))
@@ -0,0 +1,30 @@
+# evercoin/backend/api/wallets/management/commands/link_legacy_transfers.py
+from django.core.management.base import BaseCommand
+
+from api.wallets.models import WalletTransfer
+
+
+class Command(BaseCommand):
+    """
+    Связывание переводов старого формата (исходящая операция и парный доход
+    без записи перевода) в пары с WalletTransfer и пересчет балансов счетов
+    отправителей. Запускается вручную один раз после обновления, повторный
+    запуск ничего не меняет
+    """
+    help = 'Связывает переводы старого формата с записями переводов и пересчитывает балансы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID пользователя (можно указать несколько раз)'
+        )
+
+    def handle(self, *args, **options):
+        paired, unpaired = WalletTransfer.link_legacy_operations(options['user_ids'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Связано пар: {paired}, исходящих операций без парного дохода: {unpaired}'
+        ))
@@ -0,0 +1,130 @@
+# evercoin/backend/api/wallets/management/commands/reconcile_balances.py
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from api.wallets.models import Wallet, WalletBalanceSnapshot
+
+
+def initialize_worker():
+    """
+    Инициализация процесса пула: Django и собственные подключения к БД
+    """
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def check_users(user_ids):
+    """
+    Сверка балансов счетов одной пачки пользователей (выполняется в пуле)
+    """
+    return Wallet.find_balance_drift(user_ids)
+
+
+class Command(BaseCommand):
+    """
+    Сверка балансов счетов с операциями: баланс должен быть равен
+    доходам (включая операцию начального баланса) минус расходы и исходящие переводы.
+    Для старых счетов без такой операции начальный баланс прибавляется отдельно
+    (до запуска backfill_initial_operations).
+    Пользователи обрабатываются пачками, пачки - параллельно в пуле
+    процессов (--workers)
+    """
+    help = 'Проверяет и при --fix исправляет балансы счетов по операциям'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID пользователя (можно указать несколько раз)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Количество пользователей в пачке'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для сверки (1 - без пула)'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Пересчитать балансы счетов с расхождениями'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        if not user_ids:
+            user_ids = list(
+                get_user_model().objects.filter(wallets__isnull=False)
+                .order_by('pk').values_list('pk', flat=True).distinct()
+            )
+
+        chunk_size = max(options['chunk_size'], 1)
+        chunks = [user_ids[index:index + chunk_size] for index in range(0, len(user_ids), chunk_size)]
+
+        if options['workers'] > 1 and len(chunks) > 1:
+            # Подключения родителя не должны наследоваться процессами пула
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=initialize_worker) as executor:
+                results = list(executor.map(check_users, chunks))
+        else:
+            results = [check_users(chunk) for chunk in chunks]
+
+        checked = sum(count for count, drift in results)
+        drift = [wallet for count, drift in results for wallet in drift]
+
+        for wallet in drift:
+            self.stdout.write(
+                f'Счет #{wallet["pk"]} {wallet["name"]} (пользователь #{wallet["user_id"]}): '
+                f'{wallet["balance"]} -> {wallet["expected_balance"]} '
+                f'(расхождение {wallet["balance"] - wallet["expected_balance"]})'
+            )
+
+        if drift and options['fix']:
+            self.fix_balances(drift)
+            self.stdout.write(self.style.SUCCESS(
+                f'Проверено счетов: {checked}, исправлено: {len(drift)}'
+            ))
+        elif drift:
+            self.stdout.write(self.style.WARNING(
+                f'Проверено счетов: {checked}, с расхождениями: {len(drift)} '
+                f'(запустите с --fix для исправления)'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Проверено счетов: {checked}, расхождений нет'))
+
+    def fix_balances(self, drift):
+        """
+        Пересчет балансов по операциям в БД (а не по значениям отчета),
+        чтобы не потерять изменения, сделанные во время сверки.
+        Снимки баланса исправленных счетов перестраиваются
+        """
+        from django.utils import timezone
+        from api.analytics.models import AnalyticsDataVersion
+        from api.sync.models import SyncSequence
+
+        wallet_ids_by_user = {}
+        for wallet in drift:
+            wallet_ids_by_user.setdefault(wallet['user_id'], []).append(wallet['pk'])
+
+        for user_id, wallet_ids in wallet_ids_by_user.items():
+            wallets = Wallet.objects.filter(pk__in=wallet_ids)
+            with transaction.atomic():
+                Wallet.recalculate_balances(
+                    wallets,
+                    updated_at=timezone.now(),
+                    sync_seq=SyncSequence.next_value(user_id)
+                )
+                for wallet in wallets:
+                    WalletBalanceSnapshot.build_for_wallet(wallet, rebuild=True)
+            AnalyticsDataVersion.bump(user_id)
@@ -0,0 +1,68 @@
+# evercoin/backend/api/wallets/management/commands/verify_wallet_counters.py
+from django.core.management.base import BaseCommand
+
+from api.wallets.models import Wallet
+
+
+class Command(BaseCommand):
+    """
+    Сверка счетчиков счетов (сумма доходов, сумма расходов, количество операций)
+    с пересчетом по операциям и исправление расхождений
+    """
+    help = 'Проверяет и при --fix исправляет счетчики операций счетов'
+
+    COUNTER_FIELDS = ('income_total', 'expense_total', 'operation_count')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID пользователя (можно указать несколько раз)'
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Записать пересчитанные значения для счетов с расхождениями'
+        )
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.all().order_by('pk')
+        if options['user_ids']:
+            wallets = wallets.filter(user_id__in=options['user_ids'])
+
+        # Ожидаемые значения считаются в том же запросе, что и выборка счетов
+        expected = {
+            f'expected_{field}': expression
+            for field, expression in Wallet.get_counter_expressions().items()
+        }
+        rows = wallets.annotate(**expected).values(
+            'pk', 'name', *self.COUNTER_FIELDS, *expected
+        )
+
+        mismatched_ids = []
+        checked = 0
+        for row in rows.iterator():
+            checked += 1
+            differences = [
+                f'{field}: {row[field]} -> {row[f"expected_{field}"]}'
+                for field in self.COUNTER_FIELDS
+                if row[field] != row[f'expected_{field}']
+            ]
+            if differences:
+                mismatched_ids.append(row['pk'])
+                self.stdout.write(f'Счет #{row["pk"]} {row["name"]}: ' + ', '.join(differences))
+
+        if mismatched_ids and options['fix']:
+            Wallet.recalculate_counters(Wallet.objects.filter(pk__in=mismatched_ids))
+            self.stdout.write(self.style.SUCCESS(
+                f'Проверено счетов: {checked}, исправлено: {len(mismatched_ids)}'
+            ))
+        elif mismatched_ids:
+            self.stdout.write(self.style.WARNING(
+                f'Проверено счетов: {checked}, с расхождениями: {len(mismatched_ids)} '
+                f'(запустите с --fix для исправления)'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Проверено счетов: {checked}, расхождений нет'))
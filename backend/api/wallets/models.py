@@ -79,6 +79,39 @@ class Wallet(models.Model):
         verbose_name='Начальный баланс'
     )
     
+    # Счета, созданные до операции начального баланса, учитывают его
+    # в балансе отдельно, пока команда backfill_initial_operations не создаст операцию
+    initial_balance_in_operations = models.BooleanField(
+        default=False,
+        verbose_name='Начальный баланс внесен операцией'
+    )
+    
+    # Счетчики операций счета, поддерживаются при каждом изменении операций
+    income_total = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        verbose_name='Сумма доходов'
+    )
+    
+    expense_total = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        verbose_name='Сумма расходов'
+    )
+    
+    operation_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество операций'
+    )
+    
+    # Номер последнего изменения для дельта-синхронизации
+    sync_seq = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер изменения'
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -91,24 +124,82 @@ class Wallet(models.Model):
             models.Index(fields=['user', 'is_default']),
             models.Index(fields=['user', 'is_hidden']),
             models.Index(fields=['currency']),
+            models.Index(fields=['user', 'sync_seq']),
         ]
     
+    # Баланс и счетчики меняются только атомарными UPDATE (apply_deltas),
+    # обычное сохранение счета их не перезаписывает
+    DERIVED_FIELDS = ('balance', 'income_total', 'expense_total', 'operation_count')
+    
     def __str__(self):
         return f"{self.name} - {self.balance} {self.currency}"
     
+    def get_save_update_fields(self, update_fields=None):
+        """
+        Поля для сохранения существующего счета: переданные явно или все,
+        кроме баланса и счетчиков. Номер изменения и время обновления пишутся всегда
+        """
+        if update_fields is None:
+            deferred_fields = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DERIVED_FIELDS
+                and field.attname not in deferred_fields
+            ]
+        return set(update_fields) | {'sync_seq', 'updated_at'}
+    
     def save(self, *args, **kwargs):
         """
         Переопределение сохранения для обработки счета по умолчанию
         """
-        # Если этот счет помечен как default, снимаем флаг с других счетов пользователя
-        if self.is_default:
-            Wallet.objects.filter(user=self.user, is_default=True).exclude(pk=self.pk).update(is_default=False)
+        from django.db import transaction
+        from api.sync.models import SyncSequence
+        
+        adding = self._state.adding
+        if not adding:
+            kwargs['update_fields'] = self.get_save_update_fields(kwargs.get('update_fields'))
         
-        # При первом создании счета устанавливаем начальный баланс
-        if not self.pk and self.initial_balance != 0:
-            self.balance = self.initial_balance
+        if adding:
+            self.initial_balance_in_operations = True
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            self.sync_seq = SyncSequence.next_value(self.user_id)
+            
+            # Если этот счет помечен как default, снимаем флаг с других счетов пользователя
+            if self.is_default:
+                Wallet.objects.filter(user=self.user, is_default=True).exclude(pk=self.pk).update(
+                    is_default=False,
+                    sync_seq=self.sync_seq
+                )
+            
+            super().save(*args, **kwargs)
+            
+            # Начальный баланс вносится операцией дохода, как и любое другое
+            # изменение баланса, поэтому сверка с операциями его не учитывает отдельно
+            if adding and self.initial_balance != 0:
+                self._create_initial_operation()
+        
+        # Инвалидируем кеш аналитики пользователя
+        from api.analytics.models import AnalyticsDataVersion
+        AnalyticsDataVersion.bump(self.user_id)
+    
+    def _create_initial_operation(self):
+        """
+        Операция дохода на сумму начального баланса нового счета
+        """
+        from api.operations.models import Operation
+        
+        Operation.objects.create(
+            user_id=self.user_id,
+            title=f"Начальный баланс счета {self.name}",
+            amount=self.initial_balance,
+            operation_type='income',
+            wallet=self,
+            description=f"Инициализация счета с начальным балансом {self.initial_balance} {self.currency}"
+        )
+        # Баланс и счетчики обновлены в базе атомарным UPDATE
+        self.refresh_from_db(fields=[*self.DERIVED_FIELDS, 'sync_seq'])
     
     def delete(self, *args, **kwargs):
         """
@@ -136,29 +227,262 @@ class Wallet(models.Model):
                 new_default.is_default = True
                 new_default.save()
         
+        # Удаление записывается для синхронизации в api.sync (pre_delete)
         super().delete(*args, **kwargs)
+        
+        # Инвалидируем кеш аналитики пользователя
+        from api.analytics.models import AnalyticsDataVersion
+        AnalyticsDataVersion.bump(self.user_id)
+    
+    # Поля, изменяемые операциями: баланс и счетчики
+    DELTA_FIELDS = ('balance', 'income_total', 'expense_total', 'operation_count')
+    
+    @staticmethod
+    def add_deltas(total, deltas):
+        """
+        Суммирование изменений счетов {wallet_id: {поле: изменение}} в total
+        """
+        for wallet_id, fields in deltas.items():
+            wallet_total = total.setdefault(wallet_id, {})
+            for field, delta in fields.items():
+                wallet_total[field] = wallet_total.get(field, 0) + delta
+        return total
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Атомарное изменение балансов и счетчиков счетов: {wallet_id: {поле: изменение}}.
+        Один UPDATE field = field + CASE id WHEN ... END на все счета, без чтения
+        и перезаписи строк. Счет получает текущий номер изменения владельца:
+        вызывающий код выдает его для своей операции в той же транзакции
+        """
+        from api.sync.models import SyncSequence
+        
+        deltas = {
+            wallet_id: {field: delta for field, delta in fields.items() if delta}
+            for wallet_id, fields in deltas.items()
+        }
+        deltas = {wallet_id: fields for wallet_id, fields in deltas.items() if fields}
+        if not deltas:
+            return
+        
+        changes = {}
+        for field in {field for fields in deltas.values() for field in fields}:
+            output_field = cls._meta.get_field(field)
+            changes[field] = models.F(field) + models.Case(
+                *[
+                    models.When(pk=wallet_id, then=models.Value(fields[field], output_field=output_field))
+                    for wallet_id, fields in deltas.items() if field in fields
+                ],
+                default=models.Value(0, output_field=output_field),
+                output_field=output_field
+            )
+        
+        cls.objects.filter(pk__in=list(deltas)).update(
+            updated_at=timezone.now(),
+            sync_seq=SyncSequence.current_value_expression(),
+            **changes
+        )
+    
+    @staticmethod
+    def get_counter_expressions():
+        """
+        Выражения для пересчета счетчиков счета по его операциям
+        (для annotate и update над queryset счетов)
+        """
+        from django.db.models.functions import Coalesce
+        from api.operations.models import Operation
+        
+        operations = Operation.objects.filter(wallet=models.OuterRef('pk')).order_by().values('wallet')
+        
+        return {
+            'income_total': Wallet.get_operation_total_expression('income'),
+            'expense_total': Wallet.get_operation_total_expression('expense'),
+            'operation_count': Coalesce(
+                models.Subquery(operations.annotate(count=models.Count('id')).values('count')),
+                0
+            ),
+        }
+    
+    @staticmethod
+    def get_operation_total_expression(operation_type):
+        """
+        Сумма операций счета одного типа (подзапрос для annotate и update)
+        """
+        from decimal import Decimal
+        from django.db.models.functions import Coalesce
+        from api.operations.models import Operation
+        
+        money_field = models.DecimalField(max_digits=15, decimal_places=2)
+        return Coalesce(
+            models.Subquery(
+                Operation.objects.filter(wallet=models.OuterRef('pk'), operation_type=operation_type)
+                .order_by().values('wallet')
+                .annotate(total=models.Sum('amount')).values('total'),
+                output_field=money_field
+            ),
+            models.Value(Decimal('0.00')),
+            output_field=money_field
+        )
+    
+    @classmethod
+    def recalculate_counters(cls, queryset, **fields):
+        """
+        Пересчет счетчиков счетов по операциям одним UPDATE.
+        fields - дополнительные поля для того же UPDATE
+        """
+        return queryset.update(**cls.get_counter_expressions(), **fields)
+    
+    @staticmethod
+    def get_initial_balance_expression():
+        """
+        Начальный баланс, не внесенный операцией (для старых счетов)
+        """
+        from decimal import Decimal
+        
+        return models.Case(
+            models.When(initial_balance_in_operations=False, then=models.F('initial_balance')),
+            default=models.Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        )
+    
+    @classmethod
+    def recalculate_balances(cls, queryset, **fields):
+        """
+        Пересчет балансов (и счетчиков) счетов по операциям одним UPDATE:
+        баланс = доходы - расходы - исходящие переводы
+        (начальный баланс входит в доходы операцией при создании счета,
+        у старых счетов без такой операции он прибавляется отдельно)
+        """
+        counters = cls.get_counter_expressions()
+        return queryset.update(
+            balance=(
+                cls.get_initial_balance_expression()
+                + counters['income_total'] - counters['expense_total']
+                - cls.get_operation_total_expression('transfer')
+            ),
+            **counters,
+            **fields
+        )
+    
+    @classmethod
+    def find_balance_drift(cls, user_ids):
+        """
+        Сверка балансов счетов пользователей с операциями.
+        Суммы операций считаются одним групповым запросом (счет, тип),
+        ожидаемый баланс - в Decimal. Возвращает количество проверенных
+        счетов и список расхождений
+        """
+        from decimal import Decimal
+        from api.operations.models import Operation
+        
+        wallets = list(
+            cls.objects.filter(user_id__in=user_ids)
+            .order_by('pk')
+            .values('pk', 'user_id', 'name', 'balance', 'initial_balance', 'initial_balance_in_operations')
+        )
+        totals = (
+            Operation.objects.filter(wallet__user_id__in=user_ids)
+            .order_by()
+            .values('wallet_id', 'operation_type')
+            .annotate(total=models.Sum('amount'))
+        )
+        
+        changes = {}
+        for row in totals:
+            amount = Decimal(str(row['total']))
+            if row['operation_type'] != 'income':
+                amount = -amount
+            changes[row['wallet_id']] = changes.get(row['wallet_id'], Decimal('0.00')) + amount
+        
+        drift = []
+        for wallet in wallets:
+            initial_balance = wallet.pop('initial_balance')
+            balance = Decimal(str(wallet['balance']))
+            expected = changes.get(wallet['pk'], Decimal('0.00'))
+            if not wallet.pop('initial_balance_in_operations'):
+                expected += Decimal(str(initial_balance))
+            if balance != expected:
+                drift.append({**wallet, 'balance': balance, 'expected_balance': expected})
+        
+        return len(wallets), drift
+    
+    @classmethod
+    def backfill_initial_operations(cls, user_ids=None):
+        """
+        Операции начального баланса для счетов, созданных до их появления.
+        Счета, созданные через API, такую операцию уже имеют, им только
+        ставится отметка. Балансы счетов пересчитываются по операциям,
+        снимки перестраиваются. Повторный запуск ничего не меняет.
+        Возвращает (количество созданных операций, количество счетов)
+        """
+        from django.db import transaction
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+        from api.operations.models import Operation
+        from api.sync.models import SyncSequence
+        
+        legacy = cls.objects.filter(initial_balance_in_operations=False)
+        if user_ids is not None:
+            legacy = legacy.filter(user_id__in=user_ids)
+        
+        created_count = wallet_count = 0
+        for user_id in list(legacy.order_by('user_id').values_list('user_id', flat=True).distinct()):
+            with transaction.atomic():
+                wallets = list(legacy.filter(user_id=user_id).select_for_update().order_by('pk'))
+                if not wallets:
+                    continue
+                
+                existing_wallet_ids = set(
+                    Operation.objects.filter(
+                        wallet__in=wallets, operation_type='income',
+                        description__startswith='Инициализация счета с начальным балансом'
+                    ).values_list('wallet_id', flat=True)
+                )
+                sync_seq = SyncSequence.next_value(user_id)
+                operations = Operation.objects.bulk_create([
+                    Operation(
+                        user_id=user_id,
+                        title=f"Начальный баланс счета {wallet.name}",
+                        amount=wallet.initial_balance,
+                        operation_type='income',
+                        wallet=wallet,
+                        operation_date=wallet.created_at,
+                        description=(
+                            f"Инициализация счета с начальным балансом {wallet.initial_balance} {wallet.currency}"
+                        ),
+                        sync_seq=sync_seq
+                    )
+                    for wallet in wallets
+                    if wallet.initial_balance != 0 and wallet.pk not in existing_wallet_ids
+                ])
+                DailyOperationSummary.apply_operations(operations)
+                
+                # Сначала отметка, чтобы пересчет уже не прибавлял начальный баланс отдельно
+                queryset = cls.objects.filter(pk__in=[wallet.pk for wallet in wallets])
+                queryset.update(initial_balance_in_operations=True)
+                cls.recalculate_balances(queryset, updated_at=timezone.now(), sync_seq=sync_seq)
+                for wallet in queryset.filter(balance_snapshots__isnull=False).distinct():
+                    WalletBalanceSnapshot.build_for_wallet(wallet, rebuild=True)
+            
+            AnalyticsDataVersion.bump(user_id)
+            created_count += len(operations)
+            wallet_count += len(wallets)
+        
+        return created_count, wallet_count
     
     @property
     def total_income(self):
         """
         Общая сумма доходов по счету
         """
-        from django.db.models import Sum
-        result = self.operations.filter(operation_type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        return result
+        return self.income_total
     
     @property
     def total_expense(self):
         """
         Общая сумма расходов по счету
         """
-        from django.db.models import Sum
-        result = self.operations.filter(operation_type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        return result
+        return self.expense_total
     
     @property
     def net_flow(self):
@@ -167,31 +491,130 @@ class Wallet(models.Model):
         """
         return self.total_income - self.total_expense
     
-    def get_balance_history(self, days=30):
+    @staticmethod
+    def get_balance_change_expression():
         """
-        Получение истории баланса за указанное количество дней
+        Изменение баланса по строке дневной сводки: доход +, расход
+        и исходящий перевод -
         """
+        return models.Case(
+            models.When(operation_type='income', then=models.F('total_amount')),
+            default=-models.F('total_amount'),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        )
+    
+    def get_balance_on(self, day):
+        """
+        Баланс счета на конец дня. Отсчет от ближайшего снимка на конец месяца
+        не позже day плюс изменения за несколько дней после него; без снимка -
+        текущий баланс за вычетом изменений после day
+        """
+        from decimal import Decimal
         from django.db.models import Sum
-        from api.operations.models import Operation
+        from api.analytics.models import DailyOperationSummary
+        
+        summaries = DailyOperationSummary.objects.filter(user_id=self.user_id, wallet=self)
+        snapshot = self.balance_snapshots.filter(month_end__lte=day).order_by('-month_end').first()
+        
+        if snapshot is not None:
+            changes = summaries.filter(day__gt=snapshot.month_end, day__lte=day).aggregate(
+                total=Sum(self.get_balance_change_expression())
+            )['total'] or 0
+            return Decimal(str(snapshot.balance)) + Decimal(str(changes))
+        
+        changes = summaries.filter(day__gt=day).aggregate(
+            total=Sum(self.get_balance_change_expression())
+        )['total'] or 0
+        return Decimal(str(self.balance)) - Decimal(str(changes))
+    
+    def get_balance_history(self, start_date, end_date, granularity='day'):
+        """
+        Баланс счета на конец каждого дня, недели или месяца периода
+        с доходами и расходами за интервал.
+        Нарастающий итог считается оконной функцией SUM() OVER (ORDER BY интервал)
+        по дневной сводке операций: строки одного интервала - равные по порядку,
+        поэтому каждая получает итог на конец интервала. Точка отсчета - баланс
+        на день перед началом периода (см. get_balance_on). Интервалы без
+        операций заполняются последним известным балансом
+        """
         from datetime import timedelta
+        from decimal import Decimal
+        from dateutil.relativedelta import relativedelta
+        from django.db.models import Case, F, Sum, Value, When, Window
+        from django.db.models.functions import TruncMonth, TruncWeek
+        from api.analytics.models import DailyOperationSummary
+        
+        money_field = models.DecimalField(max_digits=15, decimal_places=2)
+        zero = Value(Decimal('0.00'))
         
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
+        def amount_of(operation_type):
+            return Case(
+                When(operation_type=operation_type, then=F('total_amount')),
+                default=zero,
+                output_field=money_field
+            )
+        
+        balance_change = self.get_balance_change_expression()
+        
+        summaries = DailyOperationSummary.objects.filter(user_id=self.user_id, wallet=self)
         
-        # Получаем ежедневные изменения баланса
-        daily_changes = (
-            Operation.objects
-            .filter(wallet=self, operation_date__range=[start_date, end_date])
-            .extra({'date': "date(operation_date)"})
-            .values('date')
+        # Баланс на начало периода
+        opening_balance = self.get_balance_on(start_date - timedelta(days=1))
+        
+        if granularity == 'week':
+            bucket = TruncWeek('day', output_field=models.DateField())
+        elif granularity == 'month':
+            bucket = TruncMonth('day', output_field=models.DateField())
+        else:
+            bucket = F('day')
+        
+        rows = (
+            summaries.filter(day__range=[start_date, end_date])
+            .annotate(bucket=bucket)
             .annotate(
-                income=Sum('amount', filter=models.Q(operation_type='income')),
-                expense=Sum('amount', filter=models.Q(operation_type='expense'))
+                balance_change=Window(Sum(balance_change), order_by=F('bucket').asc()),
+                income=Window(Sum(amount_of('income')), partition_by=F('bucket')),
+                expense=Window(Sum(amount_of('expense')), partition_by=F('bucket'))
             )
-            .order_by('date')
+            .values('bucket', 'balance_change', 'income', 'expense')
+            .distinct()
+            .order_by('bucket')
         )
+        rows_by_bucket = {row['bucket']: row for row in rows}
+        
+        def quantize(value):
+            return Decimal(str(value or 0)).quantize(Decimal('0.01'))
         
-        return list(daily_changes)
+        if granularity == 'week':
+            current = start_date - timedelta(days=start_date.weekday())
+        elif granularity == 'month':
+            current = start_date.replace(day=1)
+        else:
+            current = start_date
+        
+        history = []
+        balance = opening_balance
+        while current <= end_date:
+            row = rows_by_bucket.get(current)
+            income = expense = Decimal('0.00')
+            if row:
+                balance = opening_balance + Decimal(str(row['balance_change']))
+                income, expense = row['income'], row['expense']
+            history.append({
+                'date': current,
+                'balance': quantize(balance),
+                'income': quantize(income),
+                'expense': quantize(expense),
+            })
+            
+            if granularity == 'week':
+                current += timedelta(weeks=1)
+            elif granularity == 'month':
+                current += relativedelta(months=1)
+            else:
+                current += timedelta(days=1)
+        
+        return history
 
 
 class WalletTransfer(models.Model):
@@ -261,4 +684,304 @@ class WalletTransfer(models.Model):
             raise ValidationError('Переводы между счетами в разных валютах не поддерживаются')
         
         if self.amount > self.from_wallet.balance:
-            raise ValidationError('На счете отправителя недостаточно средств')
\ No newline at end of file
+            raise ValidationError('На счете отправителя недостаточно средств')
+    
+    def save(self, *args, outgoing_operation=None, **kwargs):
+        """
+        Сохранение перевода вместе с двумя связанными операциями:
+        исходящей (перевод) на счете отправителя и доходом на счете получателя.
+        outgoing_operation - несохраненная операция перевода, созданная
+        напрямую, которая записывается исходящей операцией пары
+        """
+        from django.db import transaction
+        
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                self._create_operations(outgoing_operation)
+            else:
+                self._update_operations()
+    
+    def delete(self, *args, **kwargs):
+        """
+        Удаление перевода вместе с обеими операциями и откатом балансов
+        """
+        from django.db import transaction
+        from api.operations.models import Operation
+        
+        # Сначала обе операции (с откатом балансов), затем сама запись
+        with transaction.atomic():
+            Operation.bulk_delete(Operation.objects.filter(transfer=self), delete_transfers=False)
+            return super().delete(*args, **kwargs)
+    
+    def build_operations(self, outgoing_operation=None):
+        """
+        Пара операций перевода (без сохранения): исходящая и входящая.
+        Переданная исходящая операция сохраняет свое название и категорию
+        """
+        from api.operations.models import Operation
+        
+        outgoing = outgoing_operation or Operation(title=f"Перевод на {self.to_wallet.name}")
+        outgoing.user_id = self.user_id
+        outgoing.amount = self.amount
+        outgoing.description = self.description
+        outgoing.operation_type = 'transfer'
+        outgoing.operation_date = self.transfer_date
+        outgoing.wallet_id = self.from_wallet_id
+        outgoing.transfer_to_wallet_id = self.to_wallet_id
+        outgoing.transfer = self
+        
+        return [
+            outgoing,
+            # Для счета получателя перевод - это доход
+            Operation(
+                user_id=self.user_id,
+                title=f"Перевод с {self.from_wallet.name}",
+                amount=self.amount,
+                description=self.description,
+                operation_type='income',
+                operation_date=self.transfer_date,
+                wallet_id=self.to_wallet_id,
+                transfer=self
+            ),
+        ]
+    
+    def _create_operations(self, outgoing_operation=None):
+        """
+        Запись обеих операций одним bulk_create и перенос средств
+        одним UPDATE ... CASE по двум счетам
+        """
+        from api.analytics.models import AnalyticsDataVersion, DailyOperationSummary
+        from api.operations.models import Operation
+        from api.sync.models import SyncSequence
+        
+        operations = self.build_operations(outgoing_operation)
+        sync_seq = SyncSequence.next_value(self.user_id)
+        deltas = {}
+        for operation in operations:
+            operation.sync_seq = sync_seq
+            Wallet.add_deltas(deltas, Operation.get_wallet_deltas(operation))
+        
+        Operation.objects.bulk_create(operations)
+        Wallet.apply_deltas(deltas)
+        DailyOperationSummary.apply_operations(operations)
+        AnalyticsDataVersion.bump(self.user_id, operation_delta=len(operations))
+    
+    def _update_operations(self):
+        """
+        Перенос изменений перевода на его операции массовыми изменениями
+        без чтения операций по одной
+        """
+        from api.operations.models import Operation
+        
+        operations = Operation.objects.filter(transfer=self)
+        Operation.bulk_patch(operations, {
+            'amount': self.amount,
+            'operation_date': self.transfer_date,
+            'description': self.description,
+        })
+        
+        # Смена счетов затрагивает только операции со старыми счетами
+        Operation.bulk_patch(
+            operations.filter(operation_type='transfer').exclude(
+                wallet_id=self.from_wallet_id,
+                transfer_to_wallet_id=self.to_wallet_id
+            ),
+            {'wallet_id': self.from_wallet_id, 'transfer_to_wallet_id': self.to_wallet_id}
+        )
+        Operation.bulk_patch(
+            operations.filter(operation_type='income').exclude(wallet_id=self.to_wallet_id),
+            {'wallet_id': self.to_wallet_id}
+        )
+    
+    @classmethod
+    def link_legacy_operations(cls, user_ids=None):
+        """
+        Перевод старого формата (исходящая операция перевода без записи перевода
+        и парный доход "Перевод: <название>") в связанную пару с WalletTransfer.
+        Старые исходящие переводы не списывали средства со счета отправителя,
+        поэтому балансы этих счетов пересчитываются по операциям, а их снимки
+        перестраиваются. Исходящая операция без найденного дохода связывается
+        одна. Повторный запуск ничего не меняет.
+        Возвращает (количество связанных пар, количество операций без пары)
+        """
+        from django.db import transaction
+        from api.analytics.models import AnalyticsDataVersion
+        from api.operations.models import Operation
+        from api.sync.models import SyncSequence
+        
+        legacy = Operation.objects.filter(
+            operation_type='transfer', transfer__isnull=True, transfer_to_wallet__isnull=False
+        )
+        if user_ids is not None:
+            legacy = legacy.filter(user_id__in=user_ids)
+        
+        paired_count = unpaired_count = 0
+        for user_id in list(legacy.order_by('user_id').values_list('user_id', flat=True).distinct()):
+            with transaction.atomic():
+                outgoing = list(legacy.filter(user_id=user_id).select_for_update().order_by('pk'))
+                if not outgoing:
+                    continue
+                
+                # Кандидаты в парные доходы по счету, сумме, дате и названию
+                incoming = {}
+                for operation in Operation.objects.filter(
+                    user_id=user_id, operation_type='income', transfer__isnull=True,
+                    title__startswith='Перевод: '
+                ).order_by('pk'):
+                    key = (operation.wallet_id, operation.amount, operation.operation_date, operation.title)
+                    incoming.setdefault(key, []).append(operation)
+                
+                transfers = cls.objects.bulk_create([
+                    cls(
+                        user_id=user_id,
+                        from_wallet_id=operation.wallet_id,
+                        to_wallet_id=operation.transfer_to_wallet_id,
+                        amount=operation.amount,
+                        description=operation.description,
+                        transfer_date=operation.operation_date
+                    )
+                    for operation in outgoing
+                ])
+                
+                sync_seq = SyncSequence.next_value(user_id)
+                linked = []
+                for transfer, operation in zip(transfers, outgoing):
+                    key = (
+                        operation.transfer_to_wallet_id, operation.amount,
+                        operation.operation_date, f"Перевод: {operation.title}"
+                    )
+                    candidates = incoming.get(key)
+                    legs = [operation]
+                    if candidates:
+                        legs.append(candidates.pop(0))
+                        paired_count += 1
+                    else:
+                        unpaired_count += 1
+                    for leg in legs:
+                        leg.transfer = transfer
+                        leg.sync_seq = sync_seq
+                    linked.extend(legs)
+                Operation.objects.bulk_update(linked, ['transfer', 'sync_seq'])
+                
+                wallets = Wallet.objects.filter(pk__in={operation.wallet_id for operation in outgoing})
+                Wallet.recalculate_balances(wallets, updated_at=timezone.now(), sync_seq=sync_seq)
+                for wallet in wallets.filter(balance_snapshots__isnull=False).distinct():
+                    WalletBalanceSnapshot.build_for_wallet(wallet, rebuild=True)
+            
+            AnalyticsDataVersion.bump(user_id)
+        
+        return paired_count, unpaired_count
+
+
+class WalletBalanceSnapshot(models.Model):
+    """
+    Баланс счета на конец месяца. Точка отсчета для исторических запросов
+    вместо суммирования всех операций с создания счета.
+    Заполняется командой build_balance_snapshots и исправляется
+    при изменении операций задним числом
+    """
+    
+    wallet = models.ForeignKey(
+        Wallet,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+        verbose_name='Счет'
+    )
+    
+    month_end = models.DateField(
+        verbose_name='Последний день месяца'
+    )
+    
+    balance = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        verbose_name='Баланс на конец месяца'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Снимок баланса счета'
+        verbose_name_plural = 'Снимки балансов счетов'
+        ordering = ['wallet', 'month_end']
+        unique_together = ['wallet', 'month_end']
+    
+    def __str__(self):
+        return f"{self.wallet_id} {self.month_end}: {self.balance}"
+    
+    @staticmethod
+    def get_month_end(day):
+        """
+        Последний день месяца, в который попадает дата
+        """
+        from dateutil.relativedelta import relativedelta
+        return day.replace(day=1) + relativedelta(months=1, days=-1)
+    
+    @staticmethod
+    def get_last_closed_month_end():
+        """
+        Конец последнего завершенного месяца: снимки есть только для них
+        """
+        from datetime import timedelta
+        return timezone.localdate().replace(day=1) - timedelta(days=1)
+    
+    @classmethod
+    def shift(cls, wallet_id, day, delta):
+        """
+        Исправление снимков после изменения баланса задним числом:
+        все снимки на конец месяца не раньше day сдвигаются на delta одним UPDATE.
+        Операции текущего месяца снимков не касаются и запросов не делают
+        """
+        if not delta or day > cls.get_last_closed_month_end():
+            return 0
+        return cls.objects.filter(wallet_id=wallet_id, month_end__gte=day).update(
+            balance=models.F('balance') + delta
+        )
+    
+    @classmethod
+    def build_for_wallet(cls, wallet, rebuild=False):
+        """
+        Дописывание снимков на конец завершенных месяцев после последнего
+        снимка счета (rebuild=True - пересчет с первого месяца).
+        Балансы считаются одним оконным запросом по дневной сводке.
+        Возвращает количество созданных снимков
+        """
+        from datetime import timedelta
+        from django.db import transaction
+        from django.db.models import Min
+        from api.analytics.models import DailyOperationSummary
+        
+        last_month_end = cls.get_last_closed_month_end()
+        
+        with transaction.atomic():
+            snapshots = cls.objects.filter(wallet=wallet)
+            if rebuild:
+                snapshots.delete()
+                last_snapshot = None
+            else:
+                last_snapshot = snapshots.order_by('-month_end').values_list('month_end', flat=True).first()
+            
+            if last_snapshot is not None:
+                start_date = last_snapshot + timedelta(days=1)
+            else:
+                first_day = DailyOperationSummary.objects.filter(wallet=wallet).aggregate(
+                    first_day=Min('day')
+                )['first_day']
+                start_date = timezone.localtime(wallet.created_at).date()
+                if first_day is not None:
+                    start_date = min(start_date, first_day)
+                start_date = start_date.replace(day=1)
+            
+            if start_date > last_month_end:
+                return 0
+            
+            history = wallet.get_balance_history(start_date, last_month_end, granularity='month')
+            created = cls.objects.bulk_create([
+                cls(wallet=wallet, month_end=cls.get_month_end(item['date']), balance=item['balance'])
+                for item in history
+            ])
+        
+        return len(created)
+
@@ -1,6 +1,6 @@
 # evercoin/backend/api/wallets/serializers.py
 from rest_framework import serializers
-from django.db import transaction
+from datetime import date
 from .models import Wallet, WalletTransfer
 from api.operations.models import Operation
 
@@ -12,7 +12,6 @@ class WalletSerializer(serializers.ModelSerializer):
     total_income = serializers.ReadOnlyField()
     total_expense = serializers.ReadOnlyField()
     net_flow = serializers.ReadOnlyField()
-    operation_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Wallet
@@ -39,12 +38,6 @@ class WalletSerializer(serializers.ModelSerializer):
             'total_income', 'total_expense', 'net_flow', 'operation_count'
         ]
     
-    def get_operation_count(self, obj):
-        """
-        Получение количества операций по счету
-        """
-        return obj.operations.count()
-    
     def validate(self, data):
         """
         Валидация данных счета
@@ -83,30 +76,9 @@ class WalletSerializer(serializers.ModelSerializer):
 
 class WalletCreateSerializer(WalletSerializer):
     """
-    Сериализатор для создания счета с начальным балансом
+    Сериализатор для создания счета с начальным балансом.
+    Операция начального баланса создается в Wallet.save
     """
-    
-    def create(self, validated_data):
-        """
-        Создание счета с обработкой начального баланса
-        """
-        initial_balance = validated_data.get('initial_balance', 0)
-        
-        with transaction.atomic():
-            wallet = super().create(validated_data)
-            
-            # Если указан начальный баланс, создаем операцию дохода
-            if initial_balance != 0:
-                Operation.objects.create(
-                    user=wallet.user,
-                    title=f"Начальный баланс счета {wallet.name}",
-                    amount=initial_balance,
-                    operation_type='income',
-                    wallet=wallet,
-                    description=f"Инициализация счета с начальным балансом {initial_balance} {wallet.currency}"
-                )
-        
-        return wallet
 
 
 class WalletUpdateSerializer(WalletSerializer):
@@ -126,7 +98,8 @@ class WalletUpdateSerializer(WalletSerializer):
         # Если изменилось название, обновляем связанные операции
         if old_name != wallet.name:
             Operation.objects.filter(wallet=wallet).update(
-                description=f"Операция по счету {wallet.name}"
+                description=f"Операция по счету {wallet.name}",
+                sync_seq=wallet.sync_seq
             )
         
         return wallet
@@ -206,9 +179,10 @@ class WalletTransferSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         user = request.user if request else None
         
-        from_wallet = data.get('from_wallet')
-        to_wallet = data.get('to_wallet')
-        amount = data.get('amount')
+        # При изменении перевода недостающие поля берутся из него
+        from_wallet = data.get('from_wallet', getattr(self.instance, 'from_wallet', None))
+        to_wallet = data.get('to_wallet', getattr(self.instance, 'to_wallet', None))
+        amount = data.get('amount', getattr(self.instance, 'amount', None))
         
         # Проверка владения счетами
         if from_wallet and from_wallet.user != user:
@@ -233,8 +207,12 @@ class WalletTransferSerializer(serializers.ModelSerializer):
                 'to_wallet': 'Переводы между счетами в разных валютах не поддерживаются'
             })
         
-        # Проверка баланса счета отправителя
-        if from_wallet and amount and amount > from_wallet.balance:
+        # Проверка баланса счета отправителя (сумма изменяемого перевода
+        # уже списана с него и возвращается в доступный остаток)
+        available = from_wallet.balance if from_wallet else None
+        if self.instance is not None and from_wallet and self.instance.from_wallet_id == from_wallet.pk:
+            available += self.instance.amount
+        if from_wallet and amount and amount > available:
             raise serializers.ValidationError({
                 'amount': 'На счете отправителя недостаточно средств'
             })
@@ -249,22 +227,8 @@ class WalletTransferSerializer(serializers.ModelSerializer):
         if request and hasattr(request, 'user'):
             validated_data['user'] = request.user
         
-        with transaction.atomic():
-            transfer = super().create(validated_data)
-            
-            # Создаем операции перевода
-            Operation.objects.create(
-                user=transfer.user,
-                title=f"Перевод на {transfer.to_wallet.name}",
-                amount=transfer.amount,
-                description=transfer.description,
-                operation_type='transfer',
-                wallet=transfer.from_wallet,
-                transfer_to_wallet=transfer.to_wallet,
-                operation_date=transfer.transfer_date
-            )
-        
-        return transfer
+        # Обе операции перевода и балансы счетов записываются в save()
+        return super().create(validated_data)
 
 
 class WalletBalanceSerializer(serializers.Serializer):
@@ -278,6 +242,72 @@ class WalletBalanceSerializer(serializers.Serializer):
     currency = serializers.CharField()
 
 
+class WalletHistoryParametersSerializer(serializers.Serializer):
+    """
+    Параметры истории баланса: последние days дней или период start_date - end_date
+    """
+    # Не более 10 лет: иначе timedelta(days) выходит за границы дат
+    MAX_DAYS = 3650
+    # Границы дат периода, в пределах которых история не выходит за date.min/date.max
+    MIN_DATE = date(1970, 1, 1)
+    MAX_DATE = date(2100, 12, 31)
+    
+    days = serializers.IntegerField(min_value=1, max_value=MAX_DAYS, default=30)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(
+        choices=[('day', 'День'), ('week', 'Неделя'), ('month', 'Месяц')],
+        required=False,
+        help_text="Шаг истории (по умолчанию выбирается по длине периода)"
+    )
+    
+    def validate_date(self, value):
+        """
+        Дата периода в допустимых границах
+        """
+        if not self.MIN_DATE <= value <= self.MAX_DATE:
+            raise serializers.ValidationError(
+                f'Дата должна быть в пределах {self.MIN_DATE.isoformat()} - {self.MAX_DATE.isoformat()}'
+            )
+        return value
+    
+    validate_start_date = validate_date
+    validate_end_date = validate_date
+    
+    def validate(self, data):
+        """
+        Проверка границ периода
+        """
+        start_date, end_date = self.get_date_range(data)
+        if start_date > end_date:
+            raise serializers.ValidationError('Дата начала не может быть позже даты окончания')
+        if (end_date - start_date).days > self.MAX_DAYS:
+            raise serializers.ValidationError(f'Период не может быть длиннее {self.MAX_DAYS} дней')
+        return data
+    
+    def get_date_range(self, data=None):
+        """
+        Получение границ периода (включительно)
+        """
+        from datetime import timedelta
+        from django.utils import timezone
+        
+        data = self.validated_data if data is None else data
+        end_date = data.get('end_date') or timezone.localdate()
+        start_date = data.get('start_date') or end_date - timedelta(days=data['days'])
+        return start_date, end_date
+
+
+class WalletHistoryItemSerializer(serializers.Serializer):
+    """
+    Точка истории баланса счета
+    """
+    date = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+    income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
 class WalletDeleteSerializer(serializers.Serializer):
     """
     Сериализатор для обработки удаления счета
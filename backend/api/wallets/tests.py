@@ -546,4 +546,719 @@ class TestIntegration:
         
         # 8. Удаляем кошелек
         delete_response = api_client.delete(detail_url)
-        assert delete_response.status_code == status.HTTP_204_NO_CONTENT
\ No newline at end of file
+        assert delete_response.status_code == status.HTTP_204_NO_CONTENT
+
+@pytest.mark.django_db
+class TestWalletCounters:
+    """Тесты счетчиков операций счета."""
+
+    @pytest.fixture
+    def counter_wallet(self, authenticated_user):
+        from decimal import Decimal
+        return Wallet.objects.create(user=authenticated_user, name='Счетчики', balance=Decimal('1000.00'))
+
+    def assert_counters_consistent(self, wallet):
+        """Счетчики совпадают с пересчетом по операциям."""
+        expected = {
+            f'expected_{field}': expression
+            for field, expression in Wallet.get_counter_expressions().items()
+        }
+        row = Wallet.objects.filter(pk=wallet.pk).annotate(**expected).values().get()
+        for field in ('income_total', 'expense_total', 'operation_count'):
+            assert row[field] == row[f'expected_{field}'], field
+
+    def test_counters_follow_operation_writes(self, authenticated_user, counter_wallet):
+        """Создание, изменение и удаление операций обновляют счетчики."""
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        income = Operation.objects.create(
+            user=authenticated_user, wallet=counter_wallet, title='Зарплата',
+            amount=Decimal('500.00'), operation_type='income'
+        )
+        expense = Operation.objects.create(
+            user=authenticated_user, wallet=counter_wallet, title='Кафе',
+            amount=Decimal('120.00'), operation_type='expense'
+        )
+        counter_wallet.refresh_from_db()
+        assert counter_wallet.total_income == Decimal('500.00')
+        assert counter_wallet.total_expense == Decimal('120.00')
+        assert counter_wallet.net_flow == Decimal('380.00')
+        assert counter_wallet.operation_count == 2
+
+        expense.amount = Decimal('200.00')
+        expense.operation_type = 'income'
+        expense.save()
+        income.delete()
+
+        counter_wallet.refresh_from_db()
+        assert counter_wallet.total_income == Decimal('200.00')
+        assert counter_wallet.total_expense == Decimal('0.00')
+        assert counter_wallet.operation_count == 1
+        self.assert_counters_consistent(counter_wallet)
+
+    def test_counters_follow_bulk_writes(self, authenticated_user, counter_wallet):
+        """Массовое изменение и удаление обновляют счетчики."""
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        operations = [
+            Operation.objects.create(
+                user=authenticated_user, wallet=counter_wallet, title='Покупка',
+                amount=Decimal('10.00'), operation_type='expense'
+            )
+            for _ in range(4)
+        ]
+        queryset = Operation.objects.filter(pk__in=[operation.pk for operation in operations])
+
+        Operation.bulk_patch(queryset, {'amount': Decimal('15.00')})
+        self.assert_counters_consistent(counter_wallet)
+
+        Operation.bulk_delete(queryset, ids=[operations[0].pk, operations[1].pk])
+        counter_wallet.refresh_from_db()
+        assert counter_wallet.total_expense == Decimal('30.00')
+        assert counter_wallet.operation_count == 2
+        self.assert_counters_consistent(counter_wallet)
+
+    def test_stale_wallet_save_keeps_balance_and_counters(self, api_client, authenticated_user, counter_wallet):
+        """Сохранение устаревшего экземпляра счета не перезаписывает баланс и счетчики."""
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        stale_wallet = Wallet.objects.get(pk=counter_wallet.pk)
+        Operation.objects.create(
+            user=authenticated_user, wallet=counter_wallet, title='Кафе',
+            amount=Decimal('120.00'), operation_type='expense'
+        )
+
+        stale_wallet.name = 'Переименованный'
+        stale_wallet.save()
+        response = api_client.post(reverse('wallets:wallet-set-default', args=[counter_wallet.pk]))
+
+        assert response.status_code == status.HTTP_200_OK
+        counter_wallet.refresh_from_db()
+        assert counter_wallet.name == 'Переименованный'
+        assert counter_wallet.is_default
+        assert counter_wallet.balance == Decimal('880.00')
+        assert counter_wallet.operation_count == 1
+        self.assert_counters_consistent(counter_wallet)
+
+    def test_merge_moves_balance_to_target(self, api_client, authenticated_user):
+        """Перенос операций при удалении счета переносит баланс и счетчики."""
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        target = Wallet.objects.create(user=authenticated_user, name='Целевой', initial_balance=Decimal('1000.00'))
+        source = Wallet.objects.create(user=authenticated_user, name='Закрываемый')
+        Operation.objects.create(
+            user=authenticated_user, wallet=source, title='Зарплата',
+            amount=Decimal('100.00'), operation_type='income'
+        )
+
+        response = api_client.delete(
+            reverse('wallets:wallet-delete', args=[source.pk]),
+            {'transfer_operations_to': target.pk},
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        target.refresh_from_db()
+        assert target.balance == Decimal('1100.00')
+        assert target.income_total == Decimal('1100.00')
+        assert target.operation_count == 2
+        self.assert_counters_consistent(target)
+        assert Wallet.find_balance_drift([authenticated_user.id])[1] == []
+
+    def test_list_wallets_query_count_does_not_grow(self, api_client, authenticated_user):
+        """Количество запросов списка счетов не зависит от числа счетов."""
+        from decimal import Decimal
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('wallets:wallet-list')
+        Wallet.objects.create(user=authenticated_user, name='Первый', balance=Decimal('0.00'))
+        with CaptureQueriesContext(connection) as single:
+            api_client.get(url)
+
+        for index in range(5):
+            Wallet.objects.create(user=authenticated_user, name=f'Счет {index}', balance=Decimal('0.00'))
+        with CaptureQueriesContext(connection) as many:
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(many) == len(single)
+
+    def test_verify_command_fixes_counters(self, authenticated_user, counter_wallet):
+        """Команда сверки находит и исправляет расхождения."""
+        import io
+        from decimal import Decimal
+        from django.core.management import call_command
+        from api.operations.models import Operation
+
+        Operation.objects.create(
+            user=authenticated_user, wallet=counter_wallet, title='Зарплата',
+            amount=Decimal('500.00'), operation_type='income'
+        )
+        Wallet.objects.filter(pk=counter_wallet.pk).update(income_total=0, operation_count=7)
+
+        output = io.StringIO()
+        call_command('verify_wallet_counters', stdout=output)
+        assert 'с расхождениями: 1' in output.getvalue()
+
+        call_command('verify_wallet_counters', '--fix', stdout=io.StringIO())
+        counter_wallet.refresh_from_db()
+        assert counter_wallet.income_total == Decimal('500.00')
+        assert counter_wallet.operation_count == 1
+
+
+@pytest.mark.django_db
+class TestWalletBalanceHistory:
+    """Тесты истории баланса счета."""
+
+    @pytest.fixture
+    def history_wallet(self, authenticated_user):
+        from datetime import timedelta
+        from decimal import Decimal
+        from django.utils import timezone
+        from api.operations.models import Operation
+
+        wallet = Wallet.objects.create(user=authenticated_user, name='История', balance=Decimal('1000.00'))
+        now = timezone.now()
+        for days_ago, amount, operation_type in ((3, '200.00', 'income'), (1, '50.00', 'expense'), (400, '30.00', 'expense')):
+            Operation.objects.create(
+                user=authenticated_user, wallet=wallet, title='Операция', amount=Decimal(amount),
+                operation_type=operation_type, operation_date=now - timedelta(days=days_ago)
+            )
+        return wallet
+
+    def test_daily_end_of_day_balance(self, api_client, history_wallet):
+        """Баланс на конец каждого дня, дни без операций заполнены."""
+        url = reverse('wallets:wallet-history', kwargs={'pk': history_wallet.pk})
+        response = api_client.get(url, {'days': 3})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['granularity'] == 'day'
+        assert [item['balance'] for item in response.data['history']] == [
+            '1170.00', '1170.00', '1120.00', '1120.00'
+        ]
+        assert response.data['history'][0]['income'] == '200.00'
+        assert response.data['history'][2]['expense'] == '50.00'
+
+    def test_multi_year_range_is_downsampled(self, api_client, history_wallet):
+        """Длинный период укрупняется до месяцев, последняя точка - текущий баланс."""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=3 * 365)
+        url = reverse('wallets:wallet-history', kwargs={'pk': history_wallet.pk})
+        response = api_client.get(url, {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['granularity'] == 'month'
+        history = response.data['history']
+        assert len(history) == (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+        assert history[0]['balance'] == '1000.00'
+        assert history[-1]['balance'] == '1120.00'
+        assert sum(1 for item in history if item['expense'] == '30.00') == 1
+
+    def test_too_many_points(self, api_client, history_wallet):
+        """Слишком мелкий шаг для длинного периода отклоняется."""
+        url = reverse('wallets:wallet-history', kwargs={'pk': history_wallet.pk})
+        response = api_client.get(url, {'days': 800, 'granularity': 'day'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_period(self, api_client, history_wallet):
+        """Дата начала позже даты окончания."""
+        url = reverse('wallets:wallet-history', kwargs={'pk': history_wallet.pk})
+        response = api_client.get(url, {'start_date': '2024-05-01', 'end_date': '2024-04-01'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_days_limit(self, api_client, history_wallet):
+        """Слишком большое days отклоняется, а не приводит к ошибке сервера."""
+        url = reverse('wallets:wallet-history', kwargs={'pk': history_wallet.pk})
+
+        assert api_client.get(url, {'days': 10 ** 7}).status_code == status.HTTP_400_BAD_REQUEST
+        assert api_client.get(url, {'days': 3650}).status_code == status.HTTP_200_OK
+
+    def test_date_limits(self, api_client, history_wallet):
+        """Даты за пределами допустимых и слишком длинный период отклоняются."""
+        url = reverse('wallets:wallet-history', kwargs={'pk': history_wallet.pk})
+
+        for params in (
+            {'start_date': '0001-01-01'},
+            {'end_date': '0001-01-05'},
+            {'start_date': '2024-01-01', 'end_date': '9999-12-31'},
+            {'start_date': '1990-01-01', 'end_date': '2024-01-01'},
+        ):
+            assert api_client.get(url, params).status_code == status.HTTP_400_BAD_REQUEST, params
+
+
+@pytest.mark.django_db
+class TestWalletBalanceSnapshots:
+    """Тесты снимков баланса на конец месяца."""
+
+    @pytest.fixture
+    def snapshot_wallet(self, authenticated_user):
+        from datetime import timedelta
+        from decimal import Decimal
+        from django.utils import timezone
+        from api.operations.models import Operation
+
+        wallet = Wallet.objects.create(user=authenticated_user, name='Снимки', balance=Decimal('1000.00'))
+        now = timezone.now()
+        for days_ago, amount, operation_type in ((200, '300.00', 'income'), (100, '80.00', 'expense'), (1, '20.00', 'expense')):
+            Operation.objects.create(
+                user=authenticated_user, wallet=wallet, title='Операция', amount=Decimal(amount),
+                operation_type=operation_type, operation_date=now - timedelta(days=days_ago)
+            )
+        return wallet
+
+    def test_build_snapshots(self, snapshot_wallet):
+        """Снимки строятся для завершенных месяцев, повторный запуск ничего не дописывает."""
+        from django.core.management import call_command
+        from api.wallets.models import WalletBalanceSnapshot
+
+        call_command('build_balance_snapshots')
+        snapshots = list(WalletBalanceSnapshot.objects.filter(wallet=snapshot_wallet))
+
+        assert snapshots
+        assert snapshots[-1].month_end == WalletBalanceSnapshot.get_last_closed_month_end()
+        for snapshot in snapshots:
+            assert snapshot.balance == snapshot_wallet.get_balance_on(snapshot.month_end)
+        assert WalletBalanceSnapshot.build_for_wallet(snapshot_wallet) == 0
+
+    def test_balance_on_uses_snapshot(self, snapshot_wallet):
+        """Баланс на дату одинаков со снимками и без них."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.wallets.models import WalletBalanceSnapshot
+
+        today = timezone.localdate()
+        days = [today - timedelta(days=days_ago) for days_ago in (150, 90, 30, 0)]
+        expected = [snapshot_wallet.get_balance_on(day) for day in days]
+
+        WalletBalanceSnapshot.build_for_wallet(snapshot_wallet)
+
+        assert [snapshot_wallet.get_balance_on(day) for day in days] == expected
+        assert expected[-1] == snapshot_wallet.balance
+
+    def test_backdated_operation_shifts_snapshots(self, snapshot_wallet):
+        """Операция задним числом сдвигает снимки после ее даты, удаление возвращает их."""
+        from datetime import timedelta
+        from decimal import Decimal
+        from django.utils import timezone
+        from api.operations.models import Operation
+        from api.wallets.models import WalletBalanceSnapshot
+
+        WalletBalanceSnapshot.build_for_wallet(snapshot_wallet)
+        before = dict(
+            WalletBalanceSnapshot.objects.filter(wallet=snapshot_wallet).values_list('month_end', 'balance')
+        )
+
+        operation_date = timezone.now() - timedelta(days=150)
+        operation = Operation.objects.create(
+            user=snapshot_wallet.user, wallet=snapshot_wallet, title='Задним числом', amount=Decimal('40.00'),
+            operation_type='income', operation_date=operation_date
+        )
+        day = timezone.localtime(operation_date).date()
+        after = dict(
+            WalletBalanceSnapshot.objects.filter(wallet=snapshot_wallet).values_list('month_end', 'balance')
+        )
+        for month_end, balance in before.items():
+            assert after[month_end] == balance + (Decimal('40.00') if month_end >= day else 0)
+
+        operation.delete()
+        assert dict(
+            WalletBalanceSnapshot.objects.filter(wallet=snapshot_wallet).values_list('month_end', 'balance')
+        ) == before
+
+    def test_history_with_snapshots(self, api_client, snapshot_wallet):
+        """История баланса не меняется после построения снимков."""
+        from api.wallets.models import WalletBalanceSnapshot
+
+        url = reverse('wallets:wallet-history', kwargs={'pk': snapshot_wallet.pk})
+        expected = api_client.get(url, {'days': 365}).data['history']
+
+        WalletBalanceSnapshot.build_for_wallet(snapshot_wallet)
+
+        assert api_client.get(url, {'days': 365}).data['history'] == expected
+        assert expected[-1]['balance'] == '1200.00'
+
+
+@pytest.mark.django_db
+class TestReconcileBalances:
+    """Тесты сверки балансов счетов с операциями."""
+
+    @pytest.fixture
+    def reconcile_wallet(self, authenticated_user):
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        wallet = Wallet.objects.create(
+            user=authenticated_user, name='Сверка', initial_balance=Decimal('100.00')
+        )
+        for amount, operation_type in (('500.00', 'income'), ('120.00', 'expense')):
+            Operation.objects.create(
+                user=authenticated_user, wallet=wallet, title='Операция',
+                amount=Decimal(amount), operation_type=operation_type
+            )
+        return wallet
+
+    def test_no_drift(self, reconcile_wallet):
+        """Баланс, поддерживаемый операциями, совпадает с пересчетом."""
+        checked, drift = Wallet.find_balance_drift([reconcile_wallet.user_id])
+
+        assert checked == 1
+        assert drift == []
+
+    def test_initial_balance_counted_once(self, api_client, authenticated_user):
+        """Начальный баланс при создании счета через API учитывается один раз."""
+        from decimal import Decimal
+        from io import StringIO
+        from django.core.management import call_command
+
+        response = api_client.post(reverse('wallets:wallet-create'), {
+            'name': 'Накопления', 'initial_balance': '250.00'
+        }, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Decimal(response.data['balance']) == Decimal('250.00')
+        wallet = Wallet.objects.get(pk=response.data['id'])
+        assert wallet.balance == Decimal('250.00')
+        assert wallet.operations.get().amount == Decimal('250.00')
+        assert Wallet.find_balance_drift([authenticated_user.id])[1] == []
+
+        call_command('reconcile_balances', '--fix', stdout=StringIO())
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal('250.00')
+
+    def test_report_and_fix_drift(self, reconcile_wallet):
+        """Расхождение выводится в отчет и исправляется с --fix."""
+        from decimal import Decimal
+        from io import StringIO
+        from django.core.management import call_command
+
+        Wallet.objects.filter(pk=reconcile_wallet.pk).update(balance=Decimal('1.00'))
+
+        output = StringIO()
+        call_command('reconcile_balances', stdout=output)
+        assert f'Счет #{reconcile_wallet.pk}' in output.getvalue()
+        assert '1.00 -> 480.00' in output.getvalue()
+
+        call_command('reconcile_balances', '--fix', '--chunk-size', '1', stdout=StringIO())
+        reconcile_wallet.refresh_from_db()
+        assert reconcile_wallet.balance == Decimal('480.00')
+        assert Wallet.find_balance_drift([reconcile_wallet.user_id])[1] == []
+
+    def test_fix_rebuilds_snapshots(self, authenticated_user):
+        """После исправления снимки баланса совпадают с операциями."""
+        from datetime import timedelta
+        from decimal import Decimal
+        from io import StringIO
+        from django.core.management import call_command
+        from django.db.models import F
+        from django.utils import timezone
+        from api.operations.models import Operation
+        from api.wallets.models import WalletBalanceSnapshot
+
+        wallet = Wallet.objects.create(user=authenticated_user, name='Снимки сверки')
+        now = timezone.now()
+        changes = []
+        for days_ago, amount, operation_type in ((70, '500.00', 'income'), (40, '120.00', 'expense'), (0, '30.00', 'expense')):
+            operation = Operation.objects.create(
+                user=authenticated_user, wallet=wallet, title='Операция', amount=Decimal(amount),
+                operation_type=operation_type, operation_date=now - timedelta(days=days_ago)
+            )
+            sign = 1 if operation_type == 'income' else -1
+            changes.append((timezone.localdate(operation.operation_date), sign * Decimal(amount)))
+        call_command('build_balance_snapshots')
+        Wallet.objects.filter(pk=wallet.pk).update(balance=Decimal('1.00'))
+        WalletBalanceSnapshot.objects.filter(wallet=wallet).update(balance=F('balance') + 999)
+
+        call_command('reconcile_balances', '--fix', stdout=StringIO())
+
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal('350.00')
+        snapshots = list(WalletBalanceSnapshot.objects.filter(wallet=wallet))
+        assert snapshots
+        for snapshot in snapshots:
+            assert snapshot.balance == sum(
+                (change for day, change in changes if day <= snapshot.month_end), Decimal('0.00')
+            )
+
+    def test_legacy_wallet_keeps_initial_balance(self, authenticated_user):
+        """Старый счет без операции начального баланса учитывает его до заполнения."""
+        from decimal import Decimal
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from api.operations.models import Operation
+
+        wallet = Wallet.objects.create(user=authenticated_user, name='Старый')
+        Operation.objects.create(
+            user=authenticated_user, wallet=wallet, title='Кафе',
+            amount=Decimal('30.00'), operation_type='expense'
+        )
+        # Счет в состоянии до появления операции начального баланса
+        Wallet.objects.filter(pk=wallet.pk).update(
+            initial_balance=Decimal('200.00'), balance=Decimal('170.00'), initial_balance_in_operations=False
+        )
+        assert Wallet.find_balance_drift([authenticated_user.id])[1] == []
+
+        Wallet.recalculate_balances(Wallet.objects.filter(pk=wallet.pk))
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal('170.00')
+
+        output = StringIO()
+        call_command('backfill_initial_operations', stdout=output)
+        assert 'создано операций начального баланса: 1' in output.getvalue()
+
+        wallet.refresh_from_db()
+        assert wallet.initial_balance_in_operations
+        assert wallet.balance == Decimal('170.00')
+        assert wallet.income_total == Decimal('200.00')
+        assert wallet.operation_count == 2
+        assert wallet.get_balance_on(timezone.localdate()) == Decimal('170.00')
+        assert Wallet.find_balance_drift([authenticated_user.id])[1] == []
+
+        call_command('backfill_initial_operations', stdout=StringIO())
+        assert wallet.operations.count() == 2
+
+    def test_backfill_keeps_existing_initial_operation(self, api_client, authenticated_user):
+        """Счет, у которого операция начального баланса уже есть, получает только отметку."""
+        from decimal import Decimal
+
+        response = api_client.post(reverse('wallets:wallet-create'), {
+            'name': 'Накопления', 'initial_balance': '250.00'
+        }, format='json')
+        wallet = Wallet.objects.get(pk=response.data['id'])
+        Wallet.objects.filter(pk=wallet.pk).update(initial_balance_in_operations=False)
+
+        assert Wallet.backfill_initial_operations() == (0, 1)
+        wallet.refresh_from_db()
+        assert wallet.initial_balance_in_operations
+        assert wallet.balance == Decimal('250.00')
+        assert wallet.operations.count() == 1
+
+
+@pytest.mark.django_db
+class TestWalletTransferEngine:
+    """Тесты переводов между счетами со связанной парой операций."""
+
+    @pytest.fixture
+    def wallets(self, authenticated_user):
+        from decimal import Decimal
+
+        return (
+            Wallet.objects.create(user=authenticated_user, name='Отправитель', balance=Decimal('1000.00')),
+            Wallet.objects.create(user=authenticated_user, name='Получатель', balance=Decimal('500.00')),
+        )
+
+    @pytest.fixture
+    def transfer(self, authenticated_user, wallets):
+        from decimal import Decimal
+
+        return WalletTransfer.objects.create(
+            user=authenticated_user, from_wallet=wallets[0], to_wallet=wallets[1], amount=Decimal('300.00')
+        )
+
+    def test_create_transfer_writes_linked_pair(self, api_client, wallets):
+        """Обе операции создаются одним INSERT, балансы - одним UPDATE."""
+        from decimal import Decimal
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('wallets:wallet-transfer')
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(
+                url, {'from_wallet': wallets[0].id, 'to_wallet': wallets[1].id, 'amount': '300.00'}, format='json'
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        sql = [query['sql'] for query in context.captured_queries]
+        assert sum(1 for query in sql if query.startswith('INSERT INTO "operations_operation"')) == 1
+        assert sum(1 for query in sql if query.startswith('UPDATE "wallets_wallet"')) == 1
+
+        transfer = WalletTransfer.objects.get(pk=response.data['id'])
+        assert sorted(transfer.operations.values_list('operation_type', 'wallet_id')) == sorted([
+            ('transfer', wallets[0].id), ('income', wallets[1].id)
+        ])
+        for wallet in wallets:
+            wallet.refresh_from_db()
+        assert wallets[0].balance == Decimal('700.00')
+        assert wallets[1].balance == Decimal('800.00')
+
+    def test_update_transfer_moves_balances(self, transfer, wallets):
+        """Изменение суммы перевода меняет обе операции и оба баланса."""
+        from decimal import Decimal
+
+        transfer.amount = Decimal('100.00')
+        transfer.save()
+
+        for wallet in wallets:
+            wallet.refresh_from_db()
+        assert wallets[0].balance == Decimal('900.00')
+        assert wallets[1].balance == Decimal('600.00')
+        assert set(transfer.operations.values_list('amount', flat=True)) == {Decimal('100.00')}
+
+    def test_deleting_one_operation_deletes_pair(self, transfer, wallets):
+        """Удаление одной операции перевода удаляет пару и сам перевод."""
+        from decimal import Decimal
+        from api.analytics.models import DailyOperationSummary
+        from api.operations.models import Operation
+
+        transfer.operations.get(operation_type='income').delete()
+
+        assert not Operation.objects.filter(user=transfer.user).exists()
+        assert not WalletTransfer.objects.filter(pk=transfer.pk).exists()
+        assert not DailyOperationSummary.objects.filter(user=transfer.user).exists()
+        for wallet in wallets:
+            wallet.refresh_from_db()
+        assert wallets[0].balance == Decimal('1000.00')
+        assert wallets[1].balance == Decimal('500.00')
+        assert wallets[0].operation_count == wallets[1].operation_count == 0
+
+    def test_bulk_delete_removes_pair(self, transfer, wallets):
+        """Массовое удаление одной операции перевода удаляет и вторую."""
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        outgoing = transfer.operations.get(operation_type='transfer')
+        deleted_count = Operation.bulk_delete(Operation.objects.filter(pk=outgoing.pk))
+
+        assert deleted_count == 2
+        assert not WalletTransfer.objects.filter(pk=transfer.pk).exists()
+        wallets[1].refresh_from_db()
+        assert wallets[1].balance == Decimal('500.00')
+
+    def test_update_transfer_through_api(self, api_client, transfer, wallets):
+        """Изменение перевода через API переносит сумму с учетом уже списанной."""
+        from decimal import Decimal
+
+        url = reverse('wallets:wallet-transfer-detail', kwargs={'pk': transfer.pk})
+        response = api_client.patch(url, {'amount': '1000.00'}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        for wallet in wallets:
+            wallet.refresh_from_db()
+        assert wallets[0].balance == Decimal('0.00')
+        assert wallets[1].balance == Decimal('1500.00')
+        assert api_client.patch(url, {'amount': '1000.01'}, format='json').status_code == (
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_direct_transfer_operation_is_linked(self, authenticated_user, wallets):
+        """Операция перевода, созданная напрямую, получает запись перевода и связанный доход."""
+        from decimal import Decimal
+        from api.operations.models import Operation
+
+        outgoing = Operation.objects.create(
+            user=authenticated_user, wallet=wallets[0], transfer_to_wallet=wallets[1],
+            title='Накопления', amount=Decimal('200.00'), operation_type='transfer'
+        )
+
+        transfer = WalletTransfer.objects.get()
+        assert outgoing.transfer == transfer
+        assert sorted(transfer.operations.values_list('operation_type', 'wallet_id')) == sorted([
+            ('transfer', wallets[0].id), ('income', wallets[1].id)
+        ])
+        assert outgoing.title == 'Накопления'
+        assert transfer.operations.get(operation_type='income').title == f'Перевод с {wallets[0].name}'
+        assert wallets[0].balance == Decimal('800.00')
+        for wallet in wallets:
+            wallet.refresh_from_db()
+        assert wallets[0].balance == Decimal('800.00')
+        assert wallets[1].balance == Decimal('700.00')
+
+    def test_direct_transfer_operation_uses_transfer_engine(self, authenticated_user, wallets):
+        """Прямое создание операции перевода стоит столько же запросов, сколько запись перевода."""
+        from decimal import Decimal
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.operations.models import Operation
+
+        def create_transfer():
+            WalletTransfer.objects.create(
+                user=authenticated_user, from_wallet=wallets[0], to_wallet=wallets[1], amount=Decimal('100.00')
+            )
+
+        # Первый перевод за день создает строки сводки
+        create_transfer()
+        with CaptureQueriesContext(connection) as engine:
+            create_transfer()
+        with CaptureQueriesContext(connection) as direct:
+            Operation.objects.create(
+                user=authenticated_user, wallet=wallets[0], transfer_to_wallet=wallets[1],
+                title='Накопления', amount=Decimal('100.00'), operation_type='transfer'
+            )
+
+        assert len(direct) == len(engine)
+
+    def test_delete_transfer_deletes_row_once(self, transfer, wallets):
+        """Удаление перевода удаляет операции, затем одну запись перевода."""
+        from decimal import Decimal
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            transfer.delete()
+
+        sql = [query['sql'] for query in context.captured_queries]
+        assert sum(1 for query in sql if query.startswith('DELETE FROM "wallets_wallettransfer"')) == 1
+        assert not WalletTransfer.objects.exists()
+        for wallet in wallets:
+            wallet.refresh_from_db()
+        assert wallets[0].balance == Decimal('1000.00')
+        assert wallets[1].balance == Decimal('500.00')
+
+    def test_link_legacy_transfers(self, authenticated_user):
+        """Переводы старого формата связываются в пары, баланс отправителя пересчитывается."""
+        from decimal import Decimal
+        from io import StringIO
+        from django.core.management import call_command
+        from django.db.models import F
+        from django.utils import timezone
+        from api.operations.models import Operation
+
+        source = Wallet.objects.create(user=authenticated_user, name='Источник', initial_balance=Decimal('1000.00'))
+        target = Wallet.objects.create(user=authenticated_user, name='Цель', initial_balance=Decimal('500.00'))
+        now = timezone.now()
+        # Старый формат: две несвязанные операции, исходящая не списывала средства
+        outgoing, incoming, unpaired = Operation.objects.bulk_create([
+            Operation(
+                user=authenticated_user, wallet=source, transfer_to_wallet=target, title='Накопления',
+                amount=Decimal('200.00'), operation_type='transfer', operation_date=now
+            ),
+            Operation(
+                user=authenticated_user, wallet=target, title='Перевод: Накопления',
+                amount=Decimal('200.00'), operation_type='income', operation_date=now
+            ),
+            Operation(
+                user=authenticated_user, wallet=source, transfer_to_wallet=target, title='Без пары',
+                amount=Decimal('50.00'), operation_type='transfer', operation_date=now
+            ),
+        ])
+        Wallet.objects.filter(pk=target.pk).update(balance=F('balance') + Decimal('200.00'))
+
+        output = StringIO()
+        call_command('link_legacy_transfers', stdout=output)
+
+        assert 'Связано пар: 1, исходящих операций без парного дохода: 1' in output.getvalue()
+        outgoing.refresh_from_db()
+        incoming.refresh_from_db()
+        assert outgoing.transfer_id == incoming.transfer_id is not None
+        assert Operation.objects.get(pk=unpaired.pk).transfer_id is not None
+        source.refresh_from_db()
+        target.refresh_from_db()
+        assert source.balance == Decimal('750.00')
+        assert target.balance == Decimal('700.00')
+        assert WalletTransfer.link_legacy_operations() == (0, 0)
+
+        outgoing.delete()
+        source.refresh_from_db()
+        target.refresh_from_db()
+        assert source.balance == Decimal('950.00')
+        assert target.balance == Decimal('500.00')
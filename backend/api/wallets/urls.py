@@ -23,6 +23,9 @@ urlpatterns = [
     # Перевод между счетами
     path('wallets/transfer/', views.WalletTransferView.as_view(), name='wallet-transfer'),
     
+    # Просмотр, изменение и удаление перевода
+    path('wallets/transfer/<int:pk>/', views.WalletTransferDetailView.as_view(), name='wallet-transfer-detail'),
+    
     # Общий баланс
     path('wallets/balance/', views.WalletBalanceView.as_view(), name='wallet-balance'),
     
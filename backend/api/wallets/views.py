@@ -2,6 +2,7 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
@@ -16,9 +17,12 @@ from .serializers import (
     WalletListSerializer,
     WalletTransferSerializer,
     WalletBalanceSerializer,
-    WalletDeleteSerializer
+    WalletDeleteSerializer,
+    WalletHistoryParametersSerializer,
+    WalletHistoryItemSerializer
 )
 from .filters import WalletFilter
+from api.sync.models import SyncSequence
 
 
 class WalletListView(generics.ListAPIView):
@@ -125,9 +129,11 @@ class WalletDeleteView(generics.DestroyAPIView):
                     )
                 
                 if delete_operations:
-                    # Удаляем все операции счета
-                    wallet.operations.all().delete()
-                    wallet.transfer_operations.all().delete()
+                    # Удаляем все операции счета и переводы на него
+                    # (с обновлением сводки и счетчиков других счетов)
+                    Operation.bulk_delete(
+                        Operation.objects.filter(models.Q(wallet=wallet) | models.Q(transfer_to_wallet=wallet))
+                    )
                     wallet.delete()
                     return Response(
                         {'message': f'Счет и {total_operations} операций успешно удалены'}, 
@@ -138,9 +144,17 @@ class WalletDeleteView(generics.DestroyAPIView):
                     # Переносим операции на другой счет
                     transfer_to_wallet = Wallet.objects.get(pk=transfer_to_id, user=self.request.user)
                     
-                    # Обновляем операции
-                    Operation.objects.filter(wallet=wallet).update(wallet=transfer_to_wallet)
-                    Operation.objects.filter(transfer_to_wallet=wallet).update(transfer_to_wallet=transfer_to_wallet)
+                    # Переносим операции вместе со сводкой, балансом и счетчиками
+                    Operation.bulk_patch(
+                        Operation.objects.filter(wallet=wallet),
+                        {'wallet_id': transfer_to_wallet.id}
+                    )
+                    Operation.objects.filter(transfer_to_wallet=wallet).update(
+                        transfer_to_wallet=transfer_to_wallet,
+                        sync_seq=SyncSequence.current_value_expression()
+                    )
+                    WalletTransfer.objects.filter(from_wallet=wallet).update(from_wallet=transfer_to_wallet)
+                    WalletTransfer.objects.filter(to_wallet=wallet).update(to_wallet=transfer_to_wallet)
                     
                     wallet.delete()
                     return Response(
@@ -176,6 +190,23 @@ class WalletTransferView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
 
+class WalletTransferDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    API endpoint для просмотра, изменения и удаления перевода.
+    Обе операции перевода меняются только через него
+    """
+    serializer_class = WalletTransferSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """
+        Возвращает только переводы текущего пользователя
+        """
+        return WalletTransfer.objects.filter(user=self.request.user).select_related(
+            'from_wallet', 'to_wallet'
+        )
+
+
 class WalletBalanceView(generics.GenericAPIView):
     """
     API endpoint для получения общего баланса по всем счетам
@@ -238,10 +269,13 @@ class WalletSetDefaultView(generics.GenericAPIView):
         
         with transaction.atomic():
             # Снимаем флаг default со всех счетов
-            Wallet.objects.filter(user=request.user, is_default=True).update(is_default=False)
+            Wallet.objects.filter(user=request.user, is_default=True).update(
+                is_default=False,
+                sync_seq=SyncSequence.next_value(request.user.id)
+            )
             # Устанавливаем флаг default для выбранного счета
             wallet.is_default = True
-            wallet.save()
+            wallet.save(update_fields=['is_default'])
         
         serializer = WalletSerializer(wallet)
         return Response(serializer.data)
@@ -249,28 +283,71 @@ class WalletSetDefaultView(generics.GenericAPIView):
 
 class WalletHistoryView(generics.GenericAPIView):
     """
-    API endpoint для получения истории баланса счета
+    API endpoint для получения истории баланса счета.
+    Длинные периоды автоматически укрупняются: по дням до 3 месяцев,
+    по неделям до 2 лет, дальше по месяцам
     """
     permission_classes = [IsAuthenticated]
+    serializer_class = WalletHistoryParametersSerializer
+    
+    # Пороги автоматического выбора шага (в днях)
+    DAILY_MAX_DAYS = 92
+    WEEKLY_MAX_DAYS = 731
+    
+    # Максимальное количество точек в ответе
+    MAX_POINTS = 400
     
     def get(self, request, pk, *args, **kwargs):
         """
-        Получение истории баланса счета за указанный период
+        Получение баланса счета на конец каждого интервала периода
         """
         wallet = get_object_or_404(Wallet, pk=pk, user=request.user)
         
-        # Получаем количество дней из параметра запроса
-        days = int(request.query_params.get('days', 30))
-        days = min(days, 365)  # Ограничиваем максимальный период
+        parameters = self.get_serializer(data=request.query_params)
+        parameters.is_valid(raise_exception=True)
+        start_date, end_date = parameters.get_date_range()
+        period_days = (end_date - start_date).days
         
-        history = wallet.get_balance_history(days=days)
+        granularity = parameters.validated_data.get('granularity') or self.get_granularity(period_days)
+        if self.count_points(start_date, end_date, granularity) > self.MAX_POINTS:
+            raise ValidationError({
+                'granularity': (
+                    f'Слишком много точек для шага {granularity}: '
+                    f'максимум {self.MAX_POINTS}, укрупните шаг или сократите период'
+                )
+            })
+        
+        history = wallet.get_balance_history(start_date, end_date, granularity=granularity)
         
         return Response({
             'wallet_id': wallet.id,
             'wallet_name': wallet.name,
-            'period_days': days,
-            'history': history
+            'start_date': start_date,
+            'end_date': end_date,
+            'period_days': period_days,
+            'granularity': granularity,
+            'history': WalletHistoryItemSerializer(history, many=True).data
         })
+    
+    def get_granularity(self, period_days):
+        """
+        Автоматический выбор шага по длине периода
+        """
+        if period_days <= self.DAILY_MAX_DAYS:
+            return 'day'
+        if period_days <= self.WEEKLY_MAX_DAYS:
+            return 'week'
+        return 'month'
+    
+    def count_points(self, start_date, end_date, granularity):
+        """
+        Количество интервалов периода
+        """
+        if granularity == 'month':
+            return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+        if granularity == 'week':
+            return ((end_date - start_date).days + start_date.weekday()) // 7 + 1
+        return (end_date - start_date).days + 1
 
 
 @api_view(['GET'])
@@ -295,10 +372,7 @@ def wallet_statistics(request):
     
     # Самые активные счета (по количеству операций)
     from api.operations.models import Operation
-    active_wallets = (
-        wallets.annotate(operation_count=models.Count('operations'))
-        .order_by('-operation_count')[:5]
-    )
+    active_wallets = wallets.order_by('-operation_count')[:5]
     
     active_wallets_data = [
         {
@@ -1,4 +1,5 @@
 # evercoin/backend/config/settings.py
+import importlib.util
 import os
 import sys
 from pathlib import Path
@@ -52,6 +53,7 @@ LOCAL_APPS = [
     'api.wallets',
     'api.categories',
     'api.analytics',
+    'api.sync',
 ]
 
 # Полный список установленных приложений
@@ -143,7 +145,22 @@ DATABASES = {
 
 # ==================== REST FRAMEWORK ====================
 
+# Рендереры и парсеры: JSON через orjson (без него - стандартный модуль json),
+# MessagePack - если установлен msgpack
+REST_RENDERER_CLASSES = ['api.core.renderers.ORJSONRenderer']
+REST_PARSER_CLASSES = ['api.core.parsers.ORJSONParser']
+if importlib.util.find_spec('msgpack') is not None:
+    REST_RENDERER_CLASSES.append('api.core.renderers.MessagePackRenderer')
+    REST_PARSER_CLASSES.append('api.core.parsers.MessagePackParser')
+REST_RENDERER_CLASSES.append('rest_framework.renderers.BrowsableAPIRenderer')
+REST_PARSER_CLASSES += [
+    'rest_framework.parsers.FormParser',
+    'rest_framework.parsers.MultiPartParser',
+]
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': REST_RENDERER_CLASSES,
+    'DEFAULT_PARSER_CLASSES': REST_PARSER_CLASSES,
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -213,11 +230,30 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    # Общий для процессов уровень кеша аналитики
+    'analytics': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('ANALYTICS_CACHE_LOCATION', default=str(BASE_DIR / 'cache' / 'analytics')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
 CACHE_TTL = 60 * 15  # 15 минут
 
+# Кеш аналитики инвалидируется версией данных пользователя, поэтому живет долго
+ANALYTICS_CACHE_TTL = config('ANALYTICS_CACHE_TTL', default=60 * 60 * 24 * 7, cast=int)  # 7 дней
+
+# Уровни кеша аналитики: LRU процесса -> CACHES[BACKEND] -> таблица CachedAnalytics
+ANALYTICS_CACHE = {
+    'LOCAL_MAX_ENTRIES': config('ANALYTICS_CACHE_LOCAL_MAX_ENTRIES', default=1000, cast=int),
+    'BACKEND': 'analytics',
+    'USE_DATABASE_TIER': config('ANALYTICS_CACHE_USE_DATABASE_TIER', default=False, cast=bool),
+    'COMPRESS_MIN_SIZE': 4096,  # байт
+}
+
 # ==================== ТЕСТИРОВАНИЕ НАСТРОЙКИ ====================
 
 if 'test' in sys.argv or 'pytest' in sys.modules:
@@ -234,7 +270,11 @@ if 'test' in sys.argv or 'pytest' in sys.modules:
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        }
+        },
+        'analytics': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'analytics',
+        },
     }
     
     # Отключаем миграции для скорости
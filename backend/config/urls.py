@@ -24,6 +24,9 @@ urlpatterns = [
     # Аналитика
     path('api/analytics/', include('api.analytics.urls')),
 
+    # Дельта-синхронизация
+    path('api/sync/', include('api.sync.urls')),
+
     # Документация API
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),